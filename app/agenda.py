@@ -0,0 +1,80 @@
+from datetime import datetime, time, timedelta
+
+# Cálculo de huecos libres: horario de atención menos citas ocupadas.
+# Las citas llegan ordenadas por veterinario e inicio, así que basta un solo
+# recorrido (barrido) por veterinario: O(ventanas + citas).
+
+
+def _hora(valor) -> time:
+    return valor if isinstance(valor, time) else time.fromisoformat(valor)
+
+
+def _fecha_hora(valor) -> datetime:
+    return valor if isinstance(valor, datetime) else datetime.fromisoformat(valor)
+
+
+def _ventanas(horarios, desde: datetime, hasta: datetime):
+    """
+    Ventanas de atención [inicio, fin) entre desde y hasta, en orden
+    """
+    por_dia = {}
+    for h in horarios:
+        por_dia.setdefault(h["dia_semana"], []).append((_hora(h["hora_inicio"]), _hora(h["hora_fin"])))
+
+    ventanas = []
+    dia = desde.date()
+    while dia <= hasta.date():
+        for inicio, fin in sorted(por_dia.get(dia.isoweekday(), [])):
+            inicio = max(datetime.combine(dia, inicio), desde)
+            fin = min(datetime.combine(dia, fin), hasta)
+            if inicio < fin:
+                ventanas.append((inicio, fin))
+        dia += timedelta(days=1)
+    return ventanas
+
+
+def _barrido(ventanas, ocupadas, minimo: timedelta):
+    libres = []
+    j = 0
+    for inicio, fin in ventanas:
+        cursor = inicio
+        # Citas que terminaron antes de esta ventana
+        while j < len(ocupadas) and ocupadas[j][1] <= cursor:
+            j += 1
+        k = j
+        while k < len(ocupadas) and ocupadas[k][0] < fin:
+            if ocupadas[k][0] > cursor and ocupadas[k][0] - cursor >= minimo:
+                libres.append((cursor, ocupadas[k][0]))
+            cursor = max(cursor, ocupadas[k][1])
+            k += 1
+        if fin > cursor and fin - cursor >= minimo:
+            libres.append((cursor, fin))
+    return libres
+
+
+def calcular_disponibilidad(agenda: dict, desde: datetime, hasta: datetime, duracion_minutos: int):
+    """
+    agenda es lo que devuelve fn_agenda_veterinarios.
+    Devuelve, por veterinario, los intervalos libres de al menos duracion_minutos.
+    """
+    minimo = timedelta(minutes=duracion_minutos)
+
+    generales = [h for h in agenda["horarios"] if h["veterinario_id"] is None]
+    propios = {}
+    for h in agenda["horarios"]:
+        if h["veterinario_id"] is not None:
+            propios.setdefault(h["veterinario_id"], []).append(h)
+
+    ocupadas = {}
+    for c in agenda["citas"]:
+        ocupadas.setdefault(c["veterinario_id"], []).append((_fecha_hora(c["inicio"]), _fecha_hora(c["fin"])))
+
+    resultado = []
+    for vet in agenda["veterinarios"]:
+        ventanas = _ventanas(propios.get(vet["id"], generales), desde, hasta)
+        libres = _barrido(ventanas, ocupadas.get(vet["id"], []), minimo)
+        resultado.append({
+            "veterinario": vet,
+            "libres": [{"inicio": i, "fin": f} for i, f in libres],
+        })
+    return resultado
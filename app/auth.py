@@ -1,26 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
-from passlib.context import CryptContext
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from collections import OrderedDict
+import hashlib
 import os
-from app.database import get_connection
+import time
+from app.database import transaccion
+from app.seguridad import verificar_password
+from app.trazas import span
 from app.models.usuarios import LoginRequest, TokenData
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 auth_scheme = HTTPBearer()
 
-
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto"
-)
-
 SECRET = os.environ["JWT_SECRET"]
 ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
 EXPIRES = int(os.getenv("JWT_EXPIRES", "60"))
 
+# Caché LRU de tokens ya verificados: sha256(token) -> (exp, usuario)
+TOKEN_CACHE_MAX = int(os.getenv("TOKEN_CACHE_MAX", "10000"))
+_cache_tokens = OrderedDict()
+_cache_estadisticas = {"aciertos": 0, "fallos": 0, "expulsados": 0}
+
 # ---------------------------------------
 #      GENERAR TOKEN
 # ---------------------------------------
@@ -38,33 +41,19 @@ def crear_token(data: dict):
 # ---------------------------------------
 
 @router.post("/login")
-def login(credentials: LoginRequest):
+async def login(credentials: LoginRequest):
     # Conectarse como administrador o superuser
-    conn = get_connection("administrador")
-    cur = conn.cursor()
-
-    cur.execute("SELECT * FROM usuarios WHERE email = %s", (credentials.email,))
-    row = cur.fetchone()
+    async with transaccion("administrador") as tx:
+        user = await tx.fila("SELECT * FROM usuarios WHERE email = %s", credentials.email)
 
-    if not row:
-        conn.close()
+    if not user:
         raise HTTPException(status_code=401, detail="Usuario no encontrado")
 
-    # Convertir la tupla de resultado en un dict usando los nombres de columna
-    if cur.description:
-        columns = [col[0] for col in cur.description]
-        user = dict(zip(columns, row))
-    else:
-        # Ajusta esta lista si el orden de columnas de la tabla es distinto.
-        fallback_columns = ["id", "nombre", "email", "password_hash", "rol"]
-        user = dict(zip(fallback_columns, row))
-
-    conn.close()
-
     stored_hash = user.get("password_hash") or user.get("password")
     if not stored_hash:
         raise HTTPException(status_code=500, detail="Hash de contraseña no disponible")
-    if not pwd_context.verify(credentials.password, stored_hash):
+    # argon2 es costoso: se verifica en el pool de procesos de app/seguridad.py
+    if not await verificar_password(credentials.password, stored_hash):
         raise HTTPException(status_code=401, detail="Contraseña incorrecta")
 
     token = crear_token({
@@ -88,11 +77,45 @@ def login(credentials: LoginRequest):
 # ---------------------------------------
 #      OBTENER USUARIO DESDE TOKEN
 # ---------------------------------------
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(auth_scheme)):
+def estadisticas_cache_tokens() -> dict:
+    return {
+        "tamano": len(_cache_tokens),
+        "maximo": TOKEN_CACHE_MAX,
+        **_cache_estadisticas,
+    }
+
+
+def _guardar_en_cache(clave: bytes, exp, usuario: dict):
+    if not exp or TOKEN_CACHE_MAX <= 0:
+        return
+    _cache_tokens[clave] = (float(exp), usuario)
+    _cache_tokens.move_to_end(clave)
+    while len(_cache_tokens) > TOKEN_CACHE_MAX:
+        _cache_tokens.popitem(last=False)
+        _cache_estadisticas["expulsados"] += 1
+
+
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(auth_scheme)):
     token = credentials.credentials 
 
+    # Si el token ya se verificó y no ha expirado, no se vuelve a decodificar
+    clave = hashlib.sha256(token.encode()).digest()
+    entrada = _cache_tokens.get(clave)
+    if entrada is not None:
+        exp, usuario = entrada
+        if exp > time.time():
+            _cache_tokens.move_to_end(clave)
+            _cache_estadisticas["aciertos"] += 1
+            # Para las métricas por rol (app/metricas.py)
+            request.state.rol = usuario["role"]
+            return dict(usuario)
+        del _cache_tokens[clave]
+    _cache_estadisticas["fallos"] += 1
+
     try:
-        payload = jwt.decode(token, SECRET, algorithms=[ALGORITHM])
+        # Solo en un fallo de la caché: la verificación de la firma es lo que cuesta
+        with span("auth.jwt"):
+            payload = jwt.decode(token, SECRET, algorithms=[ALGORITHM])
 
         id_val = payload.get("id")
         email = payload.get("email")
@@ -113,7 +136,11 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(auth_sc
             role=role
         )
 
-        return user_data.dict()
+        usuario = user_data.dict()
+        _guardar_en_cache(clave, payload.get("exp"), usuario)
+
+        request.state.rol = usuario["role"]
+        return dict(usuario)
 
     except JWTError:
         raise HTTPException(status_code=401, detail="Token inválido o expirado")
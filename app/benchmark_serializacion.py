@@ -0,0 +1,164 @@
+"""
+Compara el costo de responder los datos típicos de la API con cada forma de
+ruta que usa (o usaba) la app, pasando por FastAPI completo con TestClient:
+
+    antes     response_model=dict + JSONResponse: pydantic + jsonable + json.dumps (antes de orjson)
+    modelo    response_model=dict + RespuestaORJSON: pydantic sigue serializando primero
+    sin       sin response_model + RespuestaORJSON: jsonable_encoder + orjson (obtener-*, crear-*)
+    directa   la ruta devuelve RespuestaORJSON(...): solo orjson (páginas de los /listar-*)
+    texto     RespuestaJSON con el texto de PostgreSQL (app/json_crudo.py), listados completos
+
+Uso:
+    python -m app.benchmark_serializacion [--filas 2000] [--repeticiones 50]
+
+No necesita base de datos: las rutas devuelven datos ya armados con la misma
+forma que las funciones, así que la diferencia entre columnas es el ruteo más
+la serialización. La consulta a PostgreSQL no está incluida.
+"""
+import argparse
+import json
+import sys
+import timeit
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.json_crudo import RespuestaJSON
+from app.respuestas import RespuestaORJSON
+
+
+def _citas(n):
+    # Como llega de fn_listar_citas (json → dict/list, fechas como texto)
+    inicio = datetime(2026, 1, 5, 8, 0)
+    return [
+        {
+            "id": i,
+            "fecha": (inicio + timedelta(minutes=30 * i)).date().isoformat(),
+            "hora": (inicio + timedelta(minutes=30 * i)).time().isoformat(),
+            "duracion_minutos": 30,
+            "estado": "pendiente",
+            "veterinario": {"id": i % 7 + 1, "nombre": f"Veterinario {i % 7 + 1}"},
+        }
+        for i in range(n)
+    ]
+
+
+def _filas_bd(n):
+    # Como llega de tx.filas (psycopg2 o asyncpg): Decimal, date, time, datetime
+    return [
+        {
+            "id": i,
+            "fecha": date(2026, 1, 1) + timedelta(days=i % 365),
+            "hora": time(8 + i % 10, 0),
+            "total": Decimal("1250.50") + i,
+            "created_at": datetime(2026, 1, 1, 10, 0, 0, 123456),
+        }
+        for i in range(n)
+    ]
+
+
+def _ficha(n):
+    mascotas = []
+    for m in range(max(1, n // 100)):
+        historial = [
+            {
+                "id": m * 1000 + i,
+                "cita_id": m * 1000 + i,
+                "veterinario_id": 3,
+                "diagnostico": "Control general, vacunas al día",
+                "total": 350.0,
+                "created_at": "2026-01-01T10:00:00.123456",
+                "factura": {"id": i, "total": 350.0, "fecha": "2026-01-01T10:30:00"},
+            }
+            for i in range(10)
+        ]
+        mascotas.append({
+            "id": m, "nombre": f"Mascota {m}", "edad": 3, "peso": 12.5, "raza": "Mestizo",
+            "historial": {"data": historial, "next_cursor": "eyJpZCI6MX0"},
+        })
+    return {"cliente": {"id": 1, "nombre": "Ana", "telefono": "555", "direccion": "Calle 1"}, "mascotas": mascotas}
+
+
+def _app(casos: dict) -> TestClient:
+    """
+    Una ruta por caso y forma de respuesta: /<forma>/<n> con n = posición del caso
+    """
+    antes = FastAPI()
+    app = FastAPI(default_response_class=RespuestaORJSON)
+    app.mount("/antes", antes)
+
+    for n, datos in enumerate(casos.values()):
+        devolver, directa = _rutas(datos)
+        antes.add_api_route(f"/{n}", devolver, response_model=dict, response_class=JSONResponse)
+        app.add_api_route(f"/modelo/{n}", devolver, response_model=dict)
+        app.add_api_route(f"/sin/{n}", devolver)
+        app.add_api_route(f"/directa/{n}", directa)
+
+    return TestClient(app)
+
+
+def _rutas(datos):
+    # Sin parámetros: con datos=datos FastAPI lo tomaría como body y copiaría el default
+    async def devolver():
+        return datos
+
+    async def directa():
+        return RespuestaORJSON(datos)
+
+    return devolver, directa
+
+
+def _medir(cliente, url, repeticiones) -> float:
+    # Mejor de 3 corridas, en milisegundos por petición
+    assert cliente.get(url).status_code == 200
+    return min(timeit.repeat(lambda: cliente.get(url), number=repeticiones, repeat=3)) / repeticiones * 1000
+
+
+def medir(filas: int, repeticiones: int):
+    # Todos con la forma { data, next_cursor } de una página (o la ficha)
+    casos = {
+        "listar-citas": {"data": _citas(filas), "next_cursor": None},
+        "filas con Decimal/fechas": {"data": _filas_bd(filas), "next_cursor": None},
+        "ficha del cliente": _ficha(filas),
+    }
+    cliente = _app(casos)
+
+    crudo = json.dumps(casos["listar-citas"])
+
+    async def texto():
+        return RespuestaJSON(crudo)
+
+    cliente.app.add_api_route("/texto/0", texto)
+
+    resultados = []
+    for n, nombre in enumerate(casos):
+        tiempos = {
+            forma: _medir(cliente, f"/{forma}/{n}", repeticiones)
+            for forma in ("antes", "modelo", "sin", "directa")
+        }
+        tiempos["texto"] = _medir(cliente, "/texto/0", repeticiones) if nombre == "listar-citas" else None
+        resultados.append((nombre, tiempos))
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.benchmark_serializacion")
+    parser.add_argument("--filas", type=int, default=2000, help="filas por listado")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    formas = ("antes", "modelo", "sin", "directa", "texto")
+    print(f"{'ms por petición':<26}" + "".join(f"{f:>10}" for f in formas))
+    for nombre, tiempos in medir(args.filas, args.repeticiones):
+        columnas = "".join(
+            f"{tiempos[f]:>10.3f}" if tiempos[f] is not None else f"{'-':>10}" for f in formas
+        )
+        print(f"{nombre:<26}{columnas}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
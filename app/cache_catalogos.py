@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from app.database import iniciar_escucha
+
+# Catálogos que cambian pocas veces al mes y se leen en cada formulario.
+# Se invalidan:
+#   - en este worker, desde los endpoints que crean/actualizan/eliminan
+#   - en los demás workers, con el NOTIFY que envían los triggers de
+#     migraciones/0002_notificar_catalogos.sql
+#   - como respaldo, al vencer CATALOGO_TTL segundos
+CATALOGO_TTL = float(os.getenv("CATALOGO_TTL", "300"))
+CANAL = "catalogos"
+CATALOGOS = ("razas", "medicamentos")
+
+# El listener de psycopg2 invalida desde otro hilo
+_lock = threading.Lock()
+_entradas = {}
+_generacion = {catalogo: 0 for catalogo in CATALOGOS}
+_estadisticas = {
+    "aciertos": 0,
+    "fallos": 0,
+    "invalidaciones": 0,
+    "reconexiones": 0,
+}
+
+
+async def obtener(catalogo: str, clave, cargar):
+    """
+    Devuelve el valor en caché o lo carga con await cargar().
+    El valor se comparte entre peticiones: no modificarlo.
+    """
+    with _lock:
+        entrada = _entradas.get((catalogo, clave))
+        if entrada is not None and entrada[0] > time.monotonic():
+            _estadisticas["aciertos"] += 1
+            return entrada[1]
+        _estadisticas["fallos"] += 1
+        generacion = _generacion[catalogo]
+
+    valor = await cargar()
+
+    if valor is not None and CATALOGO_TTL > 0:
+        with _lock:
+            # Si hubo una escritura mientras se cargaba, el valor puede ser viejo
+            if _generacion[catalogo] == generacion:
+                _entradas[(catalogo, clave)] = (time.monotonic() + CATALOGO_TTL, valor)
+    return valor
+
+
+def invalidar(catalogo: str = None):
+    # El payload del NOTIFY llega como texto: se ignoran nombres desconocidos
+    catalogos = CATALOGOS if catalogo is None else [c for c in CATALOGOS if c == catalogo]
+    if not catalogos:
+        return
+    with _lock:
+        for nombre in catalogos:
+            _generacion[nombre] += 1
+            for clave in [c for c in _entradas if c[0] == nombre]:
+                del _entradas[clave]
+        _estadisticas["invalidaciones"] += 1
+
+
+def _al_conectar():
+    # Mientras no había LISTEN se pudieron perder avisos
+    with _lock:
+        _estadisticas["reconexiones"] += 1
+    invalidar()
+
+
+async def iniciar_cache_catalogos():
+    await iniciar_escucha(CANAL, invalidar, _al_conectar)
+
+
+def estadisticas_cache_catalogos() -> dict:
+    with _lock:
+        return {
+            "ttl": CATALOGO_TTL,
+            "entradas": len(_entradas),
+            **_estadisticas,
+        }
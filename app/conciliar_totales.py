@@ -0,0 +1,60 @@
+"""
+Compara consultas.total con el total calculado desde consulta_medicamentos
+(lo mismo que hace fn_recalcular_total_consulta) y lista las diferencias.
+
+Uso:
+    python -m app.conciliar_totales              solo informa
+    python -m app.conciliar_totales --corregir   recalcula las consultas con diferencias
+
+Solo se revisan consultas con al menos un medicamento: las demás tienen el
+total cargado a mano al crearlas. Un cambio de precio en medicamentos también
+aparece como diferencia, porque el total guardado usa el precio de ese momento.
+"""
+import argparse
+import sys
+
+from app.database import conexion
+
+CONSULTA_DIFERENCIAS = """
+    SELECT c.id, c.total, SUM(m.precio * cm.cantidad) AS calculado
+    FROM consultas c
+    JOIN consulta_medicamentos cm ON cm.consulta_id = c.id
+    JOIN medicamentos m ON m.id = cm.medicamento_id
+    GROUP BY c.id, c.total
+    HAVING c.total IS DISTINCT FROM SUM(m.precio * cm.cantidad)
+    ORDER BY c.id
+"""
+
+
+def conciliar(corregir: bool = False) -> int:
+    with conexion("administrador") as conn:
+        cur = conn.cursor()
+        cur.execute(CONSULTA_DIFERENCIAS)
+        diferencias = cur.fetchall()
+
+        for consulta_id, total, calculado in diferencias:
+            print(f"consulta {consulta_id}: guardado {total} / calculado {calculado}")
+
+        if corregir and diferencias:
+            for consulta_id, _, _ in diferencias:
+                cur.execute("SELECT fn_recalcular_total_consulta(%s)", (consulta_id,))
+            conn.commit()
+            print(f"{len(diferencias)} consulta(s) corregida(s)")
+        elif not diferencias:
+            print("Todos los totales coinciden")
+
+    return len(diferencias)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.conciliar_totales")
+    parser.add_argument("--corregir", action="store_true", help="recalcula las consultas con diferencias")
+    args = parser.parse_args(argv)
+
+    diferencias = conciliar(args.corregir)
+    # Código 1 si hubo diferencias sin corregir (útil en tareas programadas)
+    return 1 if diferencias and not args.corregir else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
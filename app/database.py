@@ -1,13 +1,44 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import extensions, sql
 import os
+import re
+import select
+import threading
+import time
+import weakref
+from contextlib import contextmanager, asynccontextmanager
 from dotenv import load_dotenv
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.metricas import BD_CONEXION_ESPERA, BD_FUNCION_DURACION, BD_FUNCION_ERRORES
+from app.trazas import span
 
 load_dotenv()
 
-def get_connection(role: str):
+ROLES = ("administrador", "veterinario", "secretaria")
+
+# "roles": un pool por cada login de rol (ADMIN_USER, VETERINARIO_USER, SECRETARIA_USER)
+# "compartido": un solo pool con el login DB_AUTH_USER; cada transacción hace SET LOCAL ROLE
+POOL_MODO = os.getenv("DB_POOL_MODE", "roles")
+POOL_COMPARTIDO = "compartido"
+
+# "psycopg2": las consultas corren en el threadpool usando los pools de este módulo
+# "asyncpg": las consultas corren en el event loop (ver app/database_async.py)
+DB_DRIVER = os.getenv("DB_DRIVER", "psycopg2")
+ASYNC = DB_DRIVER == "asyncpg"
+
+
+def _config_pool(clave: str, role: str, defecto: str) -> float:
     """
-    Abre una conexión usando el rol PostgreSQL correcto
+    Lee un parámetro del pool. Permite sobreescribirlo por rol,
+    por ejemplo DB_POOL_MAX_VETERINARIO tiene prioridad sobre DB_POOL_MAX.
+    """
+    return float(os.getenv(f"{clave}_{role.upper()}", os.getenv(clave, defecto)))
+
+
+def _credenciales(role: str):
+    """
+    Devuelve (usuario, contraseña) del rol PostgreSQL correspondiente
     """
     if role == "administrador":
         user = os.getenv("ADMIN_USER")
@@ -20,13 +51,892 @@ def get_connection(role: str):
         password = os.getenv("SECRETARIA_PASSWORD")
     else:
         raise Exception("Rol inválido")
-    
-    conn = psycopg2.connect(
+    return user, password
+
+
+def _abrir_conexion(user: str, password: str):
+    return psycopg2.connect(
         host=os.getenv("DB_HOST"),
         port=os.getenv("DB_PORT"),
         dbname=os.getenv("DB_NAME"),
         user=user,
         password=password,
-        # cursor_factory=RealDictCursor
     )
-    return conn
+
+
+# ---------------------------------------
+#      POOL DE CONEXIONES
+# ---------------------------------------
+class PoolConexiones:
+    """
+    Pool de conexiones de un rol PostgreSQL.
+
+    Mantiene entre `minimo` y `maximo` conexiones, verifica con SELECT 1 las
+    que llevan un rato sin usarse antes de entregarlas y cierra las que superan
+    `max_inactiva` segundos libres (sin bajar del mínimo).
+    """
+
+    def __init__(self, nombre, abrir, minimo, maximo, timeout, max_inactiva, verificar_tras):
+        self.nombre = nombre
+        self._abrir = abrir
+        self.minimo = int(minimo)
+        self.maximo = max(int(maximo), 1)
+        self.timeout = timeout
+        self.max_inactiva = max_inactiva
+        self.verificar_tras = verificar_tras
+
+        self._cond = threading.Condition()
+        self._libres = []  # (conexión, momento en que se liberó); la última es la más reciente
+        self._en_uso = 0
+        self._esperando = 0
+
+        # Estadísticas acumuladas
+        self.prestamos = 0
+        self.esperas = 0
+        self.tiempo_espera_total = 0.0
+        self.tiempo_espera_max = 0.0
+        self.timeouts = 0
+        self.descartadas = 0
+        self.recicladas = 0
+
+    def iniciar(self):
+        """
+        Abre las conexiones mínimas por adelantado
+        """
+        with self._cond:
+            faltantes = self.minimo - (self._en_uso + len(self._libres))
+        for _ in range(max(faltantes, 0)):
+            conn = self._abrir()
+            with self._cond:
+                self._libres.insert(0, (conn, time.monotonic()))
+
+    def obtener(self):
+        inicio = time.monotonic()
+        limite = inicio + self.timeout
+        conn = None
+        liberada = None
+        espero = False
+
+        with self._cond:
+            viejas = self._reciclar_inactivas()
+            while True:
+                if self._libres:
+                    conn, liberada = self._libres.pop()
+                    break
+                if self._en_uso + len(self._libres) < self.maximo:
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self.timeouts += 1
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Servidor ocupado, intenta nuevamente.",
+                        headers={"Retry-After": "1"}
+                    )
+                espero = True
+                self._esperando += 1
+                try:
+                    self._cond.wait(restante)
+                finally:
+                    self._esperando -= 1
+
+            self._en_uso += 1
+            espera = time.monotonic() - inicio
+            self.prestamos += 1
+            if espero:
+                self.esperas += 1
+            self.tiempo_espera_total += espera
+            self.tiempo_espera_max = max(self.tiempo_espera_max, espera)
+
+        for vieja in viejas:
+            self._cerrar(vieja)
+
+        # Abrir o validar fuera del lock para no bloquear a los demás hilos
+        try:
+            if conn is None:
+                conn = self._abrir()
+            elif not self._sana(conn, liberada):
+                self._cerrar(conn)
+                with self._cond:
+                    self.descartadas += 1
+                conn = self._abrir()
+        except Exception:
+            with self._cond:
+                self._en_uso -= 1
+                self._cond.notify()
+            raise
+
+        return conn
+
+    def devolver(self, conn):
+        descartar = conn.closed != 0
+        if not descartar:
+            try:
+                # Nunca devolver una transacción abierta o abortada al pool
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except psycopg2.Error:
+                descartar = True
+
+        with self._cond:
+            self._en_uso -= 1
+            if descartar:
+                self.descartadas += 1
+            else:
+                self._libres.append((conn, time.monotonic()))
+            self._cond.notify()
+
+        if descartar:
+            self._cerrar(conn)
+
+    def cerrar(self):
+        with self._cond:
+            libres, self._libres = self._libres, []
+        for conn, _ in libres:
+            self._cerrar(conn)
+
+    def estadisticas(self) -> dict:
+        with self._cond:
+            return {
+                "en_uso": self._en_uso,
+                "libres": len(self._libres),
+                "esperando": self._esperando,
+                "minimo": self.minimo,
+                "maximo": self.maximo,
+                "prestamos": self.prestamos,
+                "esperas": self.esperas,
+                "tiempo_espera_total": round(self.tiempo_espera_total, 6),
+                "tiempo_espera_max": round(self.tiempo_espera_max, 6),
+                "timeouts": self.timeouts,
+                "descartadas": self.descartadas,
+                "recicladas": self.recicladas,
+            }
+
+    def _reciclar_inactivas(self):
+        """
+        Saca del pool las conexiones libres que superan max_inactiva.
+        Se llama con el lock tomado; el cierre lo hace quien llama.
+        """
+        viejas = []
+        ahora = time.monotonic()
+        # Las más antiguas están al inicio de la lista
+        while (
+            self._libres
+            and self._en_uso + len(self._libres) > self.minimo
+            and ahora - self._libres[0][1] > self.max_inactiva
+        ):
+            viejas.append(self._libres.pop(0)[0])
+            self.recicladas += 1
+        return viejas
+
+    def _sana(self, conn, liberada) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - liberada < self.verificar_tras:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _cerrar(conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+
+class ConexionPool:
+    """
+    Conexión prestada por el pool. Se usa igual que una conexión de psycopg2,
+    pero close() la devuelve al pool en lugar de cerrarla.
+
+    En modo compartido recibe el rol a asumir: antes del primer cursor de cada
+    transacción ejecuta SET LOCAL ROLE, que se deshace solo con commit/rollback.
+    """
+
+    _conn = None
+    _pool = None
+
+    def __init__(self, conn, pool, rol=None):
+        self._conn = conn
+        self._pool = pool
+        self._rol = rol
+        self._rol_pendiente = rol is not None
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion(), nombre)
+
+    def _conexion(self):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("La conexión ya fue devuelta al pool")
+        return self._conn
+
+    def cursor(self, *args, **kwargs):
+        conn = self._conexion()
+        if self._rol_pendiente:
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("SET LOCAL ROLE {}").format(sql.Identifier(self._rol)))
+            self._rol_pendiente = False
+        return conn.cursor(*args, **kwargs)
+
+    def commit(self):
+        self._conexion().commit()
+        self._rol_pendiente = self._rol is not None
+
+    def rollback(self):
+        self._conexion().rollback()
+        self._rol_pendiente = self._rol is not None
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.devolver(conn)
+
+    def __del__(self):
+        # Red de seguridad: si un handler sale por una excepción sin cerrar,
+        # la conexión vuelve al pool cuando se libera la envoltura.
+        self.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(role: str) -> PoolConexiones:
+    """
+    Devuelve el pool que atiende al rol. En modo compartido todos los roles
+    usan el mismo pool, autenticado con DB_AUTH_USER.
+    """
+    if POOL_MODO == POOL_COMPARTIDO:
+        if role not in ROLES:
+            raise Exception("Rol inválido")
+        clave = POOL_COMPARTIDO
+    else:
+        clave = role
+
+    pool = _pools.get(clave)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(clave)
+            if pool is None:
+                if clave == POOL_COMPARTIDO:
+                    user, password = os.getenv("DB_AUTH_USER"), os.getenv("DB_AUTH_PASSWORD")
+                else:
+                    user, password = _credenciales(role)
+                pool = PoolConexiones(
+                    clave,
+                    lambda: _abrir_conexion(user, password),
+                    minimo=_config_pool("DB_POOL_MIN", clave, "1"),
+                    maximo=_config_pool("DB_POOL_MAX", clave, "10"),
+                    timeout=_config_pool("DB_POOL_TIMEOUT", clave, "10"),
+                    max_inactiva=_config_pool("DB_POOL_MAX_IDLE", clave, "300"),
+                    verificar_tras=_config_pool("DB_POOL_CHECK_AFTER", clave, "30"),
+                )
+                _pools[clave] = pool
+    return pool
+
+
+def get_connection(role: str):
+    """
+    Entrega una conexión del pool del rol PostgreSQL correcto.
+    Al llamar close() la conexión vuelve al pool.
+    """
+    pool = _pool(role)
+    rol = role if pool.nombre == POOL_COMPARTIDO else None
+    with span("bd.conexion", pool=pool.nombre), BD_CONEXION_ESPERA.medir(pool.nombre):
+        conn = pool.obtener()
+    return ConexionPool(conn, pool, rol)
+
+
+@contextmanager
+def conexion(role: str):
+    """
+    Uso:
+        with conexion(user["role"]) as conn:
+            ...
+    Si no se hizo commit, la transacción se revierte al devolver la conexión.
+    """
+    conn = get_connection(role)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def iniciar_pools():
+    roles = ROLES[:1] if POOL_MODO == POOL_COMPARTIDO else ROLES
+    for role in roles:
+        _pool(role).iniciar()
+
+
+def cerrar_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.cerrar()
+
+
+def estadisticas_pool() -> dict:
+    return {role: pool.estadisticas() for role, pool in list(_pools.items())}
+
+
+# ---------------------------------------
+#      ACCESO A DATOS DESDE LOS ROUTERS
+# ---------------------------------------
+_NOMBRE_FN = re.compile(r"^fn_[a-z0-9_]+$")
+
+
+class ErrorBD(Exception):
+    """
+    Error de PostgreSQL con la misma forma para psycopg2 y asyncpg
+    """
+
+    def __init__(self, mensaje, sqlstate=None, restriccion=None):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.sqlstate = sqlstate
+        self.restriccion = restriccion
+
+
+def _error_psycopg2(e) -> ErrorBD:
+    diag = e.diag
+    return ErrorBD(diag.message_primary or str(e), e.pgcode, diag.constraint_name)
+
+
+def error_http(e: ErrorBD) -> HTTPException:
+    """
+    Respuesta para un ErrorBD que el handler no atrapó (registrado en app/main.py).
+    Los handlers siguen pudiendo dar un mensaje más específico antes de llegar aquí.
+    """
+    estado = e.sqlstate or ""
+    # 409: choca con el estado actual (reintentar igual vuelve a fallar)
+    if estado == "23505":
+        return HTTPException(409, "El registro ya existe")
+    if estado == "23P01":
+        return HTTPException(409, "El registro se cruza con otro existente")
+    # 422: los datos enviados no son válidos para la base
+    if estado == "23503":
+        return HTTPException(422, "Referencia a un registro que no existe")
+    if estado.startswith("23") or estado.startswith("22"):
+        return HTTPException(422, "Datos inválidos")
+    if estado == "42501":
+        return HTTPException(403, "No autorizado")
+    if estado in ("40001", "40P01", "57014"):
+        return HTTPException(503, "Servidor ocupado, intenta nuevamente.", headers={"Retry-After": "1"})
+    return HTTPException(500, "Error en la base de datos")
+
+
+# ---------------------------------------
+#      TIEMPO POR FUNCIÓN fn_*
+# ---------------------------------------
+# Se actualiza desde el event loop (llamar_fn y tx.llamar_fn), sin hilos de por medio
+_tiempos_fn = {}
+
+
+@contextmanager
+def cronometro_fn(nombre: str):
+    inicio = time.perf_counter()
+    error = False
+    try:
+        with span("bd.fn", funcion=nombre):
+            yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        duracion = time.perf_counter() - inicio
+        stats = _tiempos_fn.get(nombre)
+        if stats is None:
+            stats = _tiempos_fn[nombre] = {
+                "llamadas": 0,
+                "errores": 0,
+                "tiempo_total": 0.0,
+                "tiempo_max": 0.0,
+            }
+        stats["llamadas"] += 1
+        stats["errores"] += error
+        stats["tiempo_total"] += duracion
+        stats["tiempo_max"] = max(stats["tiempo_max"], duracion)
+        BD_FUNCION_DURACION.observar(duracion, nombre)
+        if error:
+            BD_FUNCION_ERRORES.inc(nombre)
+
+
+def estadisticas_funciones() -> dict:
+    return {
+        nombre: {**stats, "tiempo_promedio": stats["tiempo_total"] / stats["llamadas"]}
+        for nombre, stats in sorted(_tiempos_fn.items())
+    }
+
+
+def sql_fn(nombre: str, cantidad: int, texto: bool = False) -> str:
+    """
+    Arma "SELECT fn_x(%s, %s, ...)". El nombre se valida porque va dentro del SQL.
+    Con texto=True agrega ::text para recibir el JSON sin que el driver lo convierta.
+    """
+    if not _NOMBRE_FN.match(nombre):
+        raise ValueError(f"Nombre de función inválido: {nombre}")
+    return f"SELECT {nombre}({', '.join(['%s'] * cantidad)}){'::text' if texto else ''}"
+
+
+def sql_fn_versionada(nombre: str, cantidad: int, texto: bool = False) -> str:
+    """
+    Versión de las tablas (fn_version_tablas) + llamada a la función en una sola
+    sentencia, con el mismo snapshot. Si la versión es la que ya tiene el
+    cliente, la función no se ejecuta. Parámetros: los de la función, la
+    versión conocida y la lista de tablas.
+    """
+    llamada = sql_fn(nombre, cantidad, texto).removeprefix("SELECT ")
+    return (
+        f"SELECT v.version, v.sin_cambios, CASE WHEN v.sin_cambios THEN NULL ELSE {llamada} END "
+        f"FROM (SELECT version, version = %s AS sin_cambios FROM fn_version_tablas(%s) AS t(version)) v"
+    )
+
+
+class _TransaccionSync:
+    """
+    Transacción sobre una conexión psycopg2 del pool.
+    Cada consulta se ejecuta en el threadpool para no bloquear el event loop.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    async def llamar_fn(self, nombre: str, *params):
+        with cronometro_fn(nombre):
+            return await run_in_threadpool(self._llamar_fn, nombre, params)
+
+    async def valor(self, consulta: str, *params):
+        return await run_in_threadpool(self._ejecutar, consulta, params, "valor")
+
+    async def fila(self, consulta: str, *params):
+        return await run_in_threadpool(self._ejecutar, consulta, params, "fila")
+
+    async def filas(self, consulta: str, *params):
+        return await run_in_threadpool(self._ejecutar, consulta, params, "filas")
+
+    async def ejecutar(self, consulta: str, *params):
+        await run_in_threadpool(self._ejecutar, consulta, params, None)
+
+    def _llamar_fn(self, nombre, params):
+        # Preparada como en llamar_fn. Dentro de la transacción no se puede
+        # repetir sin preparar: si la sentencia quedó inválida se falla y se
+        # descarta para la próxima transacción de esta conexión.
+        try:
+            with span("bd.sql", modo="llamar_fn"):
+                row = _ejecutar_llamada(self._conn, nombre, params, False, PREPARAR)
+        except psycopg2.Error as e:
+            if PREPARAR and e.pgcode in _PREPARADA_INVALIDA:
+                _por_olvidar.add(self._conn._conexion())
+            raise _error_psycopg2(e) from e
+        return row[0] if row else None
+
+    def _ejecutar(self, consulta, params, modo):
+        # SQL libre (comprobaciones puntuales como el login): sin preparar,
+        # pero con cursor común; los dicts se arman con cursor.description
+        try:
+            with span("bd.sql", modo=modo or "ejecutar"), self._conn.cursor() as cur:
+                cur.execute(consulta, params)
+                if modo == "valor":
+                    row = cur.fetchone()
+                    return row[0] if row else None
+                if modo == "fila":
+                    row = cur.fetchone()
+                    return _como_dict(cur.description, row) if row else None
+                if modo == "filas":
+                    return [_como_dict(cur.description, row) for row in cur.fetchall()]
+        except psycopg2.Error as e:
+            raise _error_psycopg2(e) from e
+
+
+def _como_dict(descripcion, row) -> dict:
+    return {columna[0]: valor for columna, valor in zip(descripcion, row)}
+
+
+def _terminar(conn, confirmar: bool):
+    try:
+        if confirmar:
+            conn.commit()
+    finally:
+        conn.close()
+
+
+@asynccontextmanager
+async def transaccion(role: str):
+    """
+    Uso:
+        async with transaccion(user["role"]) as tx:
+            existe = await tx.fila("SELECT id FROM ... WHERE x = %s", valor)
+            resultado = await tx.llamar_fn("fn_crear_x", a, b)
+
+    Hace COMMIT al salir sin errores y ROLLBACK si hay una excepción.
+    Los parámetros siempre van con %s, también con asyncpg.
+    """
+    with span("bd.transaccion", rol=role):
+        if ASYNC:
+            async with _async.transaccion_async(role) as tx:
+                yield tx
+            return
+
+        conn = await run_in_threadpool(get_connection, role)
+        confirmar = False
+        try:
+            yield _TransaccionSync(conn)
+            confirmar = True
+        finally:
+            await run_in_threadpool(_terminar, conn, confirmar)
+
+
+# ---------------------------------------
+#      SENTENCIAS PREPARADAS (psycopg2)
+# ---------------------------------------
+# llamar_fn, tx.llamar_fn y llamar_fn_versionada preparan "SELECT fn_x($1, ...)"
+# una vez por conexión (PREPARE) y luego solo envían EXECUTE: PostgreSQL no
+# vuelve a analizar ni planificar la llamada. El SQL libre de tx.fila/filas no
+# se prepara: son pocas consultas puntuales y su texto no se arma aquí.
+# Con asyncpg no hace falta: el driver ya cachea sentencias preparadas.
+# DB_PREPARAR=0 lo desactiva (por ejemplo detrás de pgbouncer en modo transacción).
+PREPARAR = os.getenv("DB_PREPARAR", "1") != "0"
+
+# Conexión psycopg2 → {clave: True si está preparada, False si no se pudo preparar}
+_preparadas = weakref.WeakKeyDictionary()
+
+# 26000: la sentencia ya no existe; 0A000: "cached plan must not change result type"
+# (una migración cambió la función). Se descartan y se repite sin preparar.
+_PREPARADA_INVALIDA = ("26000", "0A000")
+
+# Conexiones cuyas sentencias quedaron inválidas dentro de una transacción
+# (tx.llamar_fn): se descartan al usarlas de nuevo, ya fuera de esa transacción.
+_por_olvidar = weakref.WeakSet()
+
+
+def _sql_preparada(conn, clave: str, consulta: str, cantidad: int):
+    """
+    "EXECUTE clave(%s, ...)" para consulta (armada con sql_fn o
+    sql_fn_versionada, solo con %s de parámetros), preparándola si hace falta.
+    None si no se puede preparar (por ejemplo una sobrecarga ambigua).
+    """
+    if conn._conexion() in _por_olvidar:
+        _olvidar_preparadas(conn)
+    preparadas = _preparadas.setdefault(conn._conexion(), {})
+
+    estado = preparadas.get(clave)
+    if estado is None:
+        marcadores = consulta % tuple(f"${i}" for i in range(1, cantidad + 1))
+        # SAVEPOINT: si el PREPARE falla dentro de una transacción abierta
+        # (tx.llamar_fn) no se pierde lo que ya hizo
+        with conn.cursor() as cur:
+            cur.execute("SAVEPOINT preparar")
+            try:
+                cur.execute(f"PREPARE {clave} AS {marcadores}")
+                estado = True
+            except psycopg2.Error:
+                cur.execute("ROLLBACK TO SAVEPOINT preparar")
+                estado = False
+            cur.execute("RELEASE SAVEPOINT preparar")
+        preparadas[clave] = estado
+
+    if not estado:
+        return None
+    if cantidad == 0:
+        return f"EXECUTE {clave}"
+    return f"EXECUTE {clave}({', '.join(['%s'] * cantidad)})"
+
+
+def _olvidar_preparadas(conn):
+    with conn.cursor() as cur:
+        cur.execute("DEALLOCATE ALL")
+    _preparadas.pop(conn._conexion(), None)
+    _por_olvidar.discard(conn._conexion())
+
+
+def _ejecutar_sentencia(conn, clave, consulta, params, preparar):
+    preparada = _sql_preparada(conn, clave, consulta, len(params)) if preparar else None
+    # Cursor común: la fila llega como tupla, sin armar un dict
+    with conn.cursor() as cur:
+        cur.execute(preparada or consulta, params)
+        return cur.fetchone()
+
+
+def _ejecutar_llamada(conn, nombre, params, texto, preparar):
+    consulta = sql_fn(nombre, len(params), texto)  # valida el nombre: va dentro del SQL
+    clave = f"{nombre}_{len(params)}_t" if texto else f"{nombre}_{len(params)}"
+    return _ejecutar_sentencia(conn, clave, consulta, params, preparar)
+
+
+def _en_conexion(role, ejecutar):
+    """
+    ejecutar(conn, preparar) en su propia transacción. Si la sentencia
+    preparada quedó inválida, la descarta y repite sin preparar.
+    """
+    with conexion(role) as conn:
+        try:
+            try:
+                row = ejecutar(conn, PREPARAR)
+            except psycopg2.Error as e:
+                if not PREPARAR or e.pgcode not in _PREPARADA_INVALIDA:
+                    raise
+                conn.rollback()
+                _olvidar_preparadas(conn)
+                row = ejecutar(conn, False)
+            conn.commit()
+        except psycopg2.Error as e:
+            raise _error_psycopg2(e) from e
+    return row
+
+
+def _llamar_fn_sync(role, nombre, params, texto=False):
+    row = _en_conexion(role, lambda conn, preparar: _ejecutar_llamada(conn, nombre, params, texto, preparar))
+    return row[0] if row else None
+
+
+async def llamar_fn(role: str, nombre: str, *params):
+    """
+    Ejecuta SELECT nombre(params...) con el rol indicado en su propia
+    transacción y devuelve lo que retorna la función (el json ya convertido
+    a dict/list) o None.
+    """
+    with cronometro_fn(nombre):
+        if ASYNC:
+            return await _async.llamar_fn_async(role, nombre, *params)
+        return await run_in_threadpool(_llamar_fn_sync, role, nombre, params)
+
+
+async def llamar_fn_texto(role: str, nombre: str, *params):
+    """
+    Igual que llamar_fn, pero devuelve el JSON tal como lo arma PostgreSQL
+    (str) o None, sin convertirlo a dict/list. Ver app/json_crudo.py.
+    """
+    with cronometro_fn(nombre):
+        if ASYNC:
+            return await _async.llamar_fn_async(role, nombre, *params, texto=True)
+        return await run_in_threadpool(_llamar_fn_sync, role, nombre, params, True)
+
+
+def _llamar_fn_versionada_sync(role, clave, consulta, params):
+    return _en_conexion(role, lambda conn, preparar: _ejecutar_sentencia(conn, clave, consulta, params, preparar))
+
+
+async def llamar_fn_versionada(role: str, tablas, conocida, nombre: str, *params, texto: bool = False):
+    """
+    Para los listados con ETag (app/etag.py). Devuelve (version, sin_cambios, resultado):
+    version de las tablas según fn_version_tablas, sin_cambios si coincide con
+    conocida (entonces resultado es None y la función no se ejecutó) y el
+    resultado de la función (como texto con texto=True).
+    """
+    consulta = sql_fn_versionada(nombre, len(params), texto)
+    parametros = (*params, conocida, list(tablas))
+    with cronometro_fn(nombre):
+        if ASYNC:
+            row = await _async.llamar_fila_async(role, consulta, parametros)
+        else:
+            clave = f"v_{nombre}_{len(params)}_t" if texto else f"v_{nombre}_{len(params)}"
+            row = await run_in_threadpool(_llamar_fn_versionada_sync, role, clave, consulta, parametros)
+    version, sin_cambios, resultado = row
+    return version, bool(sin_cambios), resultado
+
+
+# ---------------------------------------
+#      LECTURA EN FLUJO (cursor del servidor)
+# ---------------------------------------
+FLUJO_LOTE = int(os.getenv("DB_FLUJO_LOTE", "500"))
+
+
+def _abrir_cursor_servidor(conn, consulta, params, lote):
+    try:
+        cur = conn.cursor(name="flujo")
+        cur.itersize = lote
+        cur.execute(consulta, params)
+        return cur
+    except psycopg2.Error as e:
+        raise _error_psycopg2(e) from e
+
+
+def _leer_lote(cur, lote):
+    try:
+        return cur.fetchmany(lote)
+    except psycopg2.Error as e:
+        raise _error_psycopg2(e) from e
+
+
+def _cerrar_cursor_servidor(conn, cur):
+    try:
+        if not cur.closed:
+            cur.close()
+    except psycopg2.Error:
+        pass
+    finally:
+        conn.close()
+
+
+class Flujo:
+    """
+    Iterador async con la primera columna de cada fila, lote por lote.
+    aclose() devuelve la conexión aunque nunca se haya empezado a iterar
+    (un generador sin arrancar no ejecuta su finally, y asyncpg no recupera
+    conexiones prestadas al recolectarlas). Se puede llamar más de una vez.
+    """
+
+    def __init__(self, leer, cerrar):
+        self._leer = leer        # async () -> lista de filas (vacía al final)
+        self._cerrar = cerrar    # async (error o None) -> None
+        self._lote = iter(())
+        self._cerrado = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            fila = next(self._lote, None)
+            if fila is not None:
+                return fila[0]
+            if self._cerrado:
+                raise StopAsyncIteration
+            try:
+                filas = await self._leer()
+            except BaseException as e:
+                await self.aclose(e)
+                raise
+            if not filas:
+                await self.aclose()
+                raise StopAsyncIteration
+            self._lote = iter(filas)
+
+    async def aclose(self, error=None):
+        if not self._cerrado:
+            self._cerrado = True
+            await self._cerrar(error)
+
+
+async def flujo_filas(role: str, consulta: str, *params, lote: int = FLUJO_LOTE):
+    """
+    Abre un cursor del lado del servidor (DECLARE ... / FETCH n) y devuelve un
+    iterador async con la primera columna de cada fila. En memoria solo hay un
+    lote a la vez. La conexión se pide aquí, antes de empezar a responder, para
+    que un 503 del pool o un error de SQL todavía lleguen como error HTTP.
+    La conexión vuelve al pool cuando el iterador termina o al llamar aclose()
+    (ver RespuestaNDJSON en app/exportacion.py).
+    """
+    if ASYNC:
+        return await _async.flujo_filas_async(role, consulta, params, lote)
+
+    conn = await run_in_threadpool(get_connection, role)
+    try:
+        cur = await run_in_threadpool(_abrir_cursor_servidor, conn, consulta, params, lote)
+    except BaseException:
+        await run_in_threadpool(conn.close)
+        raise
+    return Flujo(
+        lambda: run_in_threadpool(_leer_lote, cur, lote),
+        lambda error: run_in_threadpool(_cerrar_cursor_servidor, conn, cur),
+    )
+
+
+# ---------------------------------------
+#      LISTEN / NOTIFY
+# ---------------------------------------
+ESCUCHA_REINTENTO = 5
+_escuchas = []
+
+
+def _credenciales_escucha():
+    if POOL_MODO == POOL_COMPARTIDO:
+        return os.getenv("DB_AUTH_USER"), os.getenv("DB_AUTH_PASSWORD")
+    return _credenciales("administrador")
+
+
+class _EscuchaSync(threading.Thread):
+    """
+    Hilo con una conexión propia (fuera del pool) que hace LISTEN en un canal.
+    Si la conexión se cae, reintenta cada ESCUCHA_REINTENTO segundos; cada vez
+    que (re)conecta llama a al_conectar, porque pudo perder avisos.
+    """
+
+    def __init__(self, canal, al_notificar, al_conectar):
+        super().__init__(name=f"listen-{canal}", daemon=True)
+        self.canal = canal
+        self.al_notificar = al_notificar
+        self.al_conectar = al_conectar
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.is_set():
+            conn = None
+            try:
+                conn = _abrir_conexion(*_credenciales_escucha())
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.canal)))
+                self.al_conectar()
+
+                while not self._parar.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.al_notificar(conn.notifies.pop(0).payload)
+            except (psycopg2.Error, OSError):
+                self._parar.wait(ESCUCHA_REINTENTO)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def detener(self):
+        self._parar.set()
+
+
+async def iniciar_escucha(canal: str, al_notificar, al_conectar):
+    """
+    al_notificar(payload) se llama por cada NOTIFY del canal.
+    Con psycopg2 corre en un hilo aparte: los callbacks deben ser thread-safe.
+    """
+    if ASYNC:
+        _escuchas.append(await _async.iniciar_escucha_async(canal, al_notificar, al_conectar))
+        return
+    escucha = _EscuchaSync(canal, al_notificar, al_conectar)
+    escucha.start()
+    _escuchas.append(escucha)
+
+
+async def _detener_escuchas():
+    escuchas = list(_escuchas)
+    _escuchas.clear()
+    for escucha in escuchas:
+        if ASYNC:
+            await _async.detener_escucha_async(escucha)
+        else:
+            escucha.detener()
+
+
+async def iniciar_bd():
+    if ASYNC:
+        await _async.iniciar_pools()
+    else:
+        await run_in_threadpool(iniciar_pools)
+
+
+async def cerrar_bd():
+    await _detener_escuchas()
+    if ASYNC:
+        await _async.cerrar_pools()
+    await run_in_threadpool(cerrar_pools)
+
+
+def estadisticas_bd() -> dict:
+    if ASYNC:
+        return _async.estadisticas_pool()
+    return estadisticas_pool()
+
+
+if ASYNC:
+    from app import database_async as _async
@@ -0,0 +1,299 @@
+import asyncio
+import json
+import os
+import re
+import time
+from decimal import Decimal
+from contextlib import asynccontextmanager, AsyncExitStack
+
+import asyncpg
+from fastapi import HTTPException
+from app.metricas import BD_CONEXION_ESPERA
+from app.trazas import span
+
+from app.database import (
+    ROLES, POOL_MODO, POOL_COMPARTIDO, ESCUCHA_REINTENTO, ErrorBD,
+    Flujo, _credenciales, _credenciales_escucha, _config_pool, cronometro_fn, sql_fn
+)
+
+# ---------------------------------------
+#      POOLS ASYNCPG (DB_DRIVER=asyncpg)
+# ---------------------------------------
+_pools = {}
+_estadisticas = {}
+_lock = asyncio.Lock()
+
+
+async def _preparar_conexion(conn):
+    # Igual que psycopg2: las columnas json llegan ya convertidas a dict/list
+    await conn.set_type_codec("json", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+def _clave(role: str) -> str:
+    if role not in ROLES:
+        raise Exception("Rol inválido")
+    return POOL_COMPARTIDO if POOL_MODO == POOL_COMPARTIDO else role
+
+
+async def _pool(role: str) -> asyncpg.Pool:
+    clave = _clave(role)
+    pool = _pools.get(clave)
+    if pool is None:
+        async with _lock:
+            pool = _pools.get(clave)
+            if pool is None:
+                if clave == POOL_COMPARTIDO:
+                    user, password = os.getenv("DB_AUTH_USER"), os.getenv("DB_AUTH_PASSWORD")
+                else:
+                    user, password = _credenciales(role)
+                pool = await asyncpg.create_pool(
+                    host=os.getenv("DB_HOST"),
+                    port=int(os.getenv("DB_PORT", "5432")),
+                    database=os.getenv("DB_NAME"),
+                    user=user,
+                    password=password,
+                    min_size=int(_config_pool("DB_POOL_MIN", clave, "1")),
+                    max_size=int(_config_pool("DB_POOL_MAX", clave, "10")),
+                    max_inactive_connection_lifetime=_config_pool("DB_POOL_MAX_IDLE", clave, "300"),
+                    init=_preparar_conexion,
+                )
+                _pools[clave] = pool
+                _estadisticas[clave] = {
+                    "esperando": 0,
+                    "prestamos": 0,
+                    "tiempo_espera_total": 0.0,
+                    "tiempo_espera_max": 0.0,
+                    "timeouts": 0,
+                }
+    return pool
+
+
+@asynccontextmanager
+async def conexion_async(role: str, transaccion: bool = True):
+    """
+    Presta una conexión asyncpg del pool del rol.
+    Con transaccion=True (o en modo compartido) el bloque corre dentro de
+    BEGIN/COMMIT; si hay una excepción se hace ROLLBACK.
+    """
+    pool = await _pool(role)
+    clave = _clave(role)
+    stats = _estadisticas[clave]
+
+    inicio = time.monotonic()
+    stats["esperando"] += 1
+    try:
+        with span("bd.conexion", pool=clave):
+            conn = await pool.acquire(timeout=_config_pool("DB_POOL_TIMEOUT", clave, "10"))
+    except asyncio.TimeoutError:
+        stats["timeouts"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado, intenta nuevamente.",
+            headers={"Retry-After": "1"}
+        )
+    finally:
+        stats["esperando"] -= 1
+
+    espera = time.monotonic() - inicio
+    BD_CONEXION_ESPERA.observar(espera, clave)
+    stats["prestamos"] += 1
+    stats["tiempo_espera_total"] += espera
+    stats["tiempo_espera_max"] = max(stats["tiempo_espera_max"], espera)
+
+    try:
+        if clave == POOL_COMPARTIDO:
+            async with conn.transaction():
+                # role ya fue validado contra ROLES en _clave()
+                await conn.execute(f'SET LOCAL ROLE "{role}"')
+                yield conn
+        elif transaccion:
+            async with conn.transaction():
+                yield conn
+        else:
+            yield conn
+    finally:
+        await pool.release(conn)
+
+
+_MARCADOR = re.compile(r"%%|%s")
+
+
+def _sql_asyncpg(consulta: str) -> str:
+    """
+    Convierte los marcadores %s (estilo psycopg2) a $1, $2, ...
+    """
+    contador = 0
+
+    def reemplazar(m):
+        nonlocal contador
+        if m.group(0) == "%%":
+            return "%"
+        contador += 1
+        return f"${contador}"
+
+    return _MARCADOR.sub(reemplazar, consulta)
+
+
+def _params_asyncpg(params):
+    # asyncpg exige Decimal para columnas numeric; psycopg2 aceptaba float
+    return [Decimal(str(p)) if isinstance(p, float) else p for p in params]
+
+
+def _error_asyncpg(e) -> ErrorBD:
+    return ErrorBD(e.message, e.sqlstate, getattr(e, "constraint_name", None))
+
+
+class _TransaccionAsync:
+    """
+    Misma interfaz que _TransaccionSync de app/database.py, sobre asyncpg
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    async def llamar_fn(self, nombre: str, *params):
+        with cronometro_fn(nombre):
+            return await self.valor(sql_fn(nombre, len(params)), *params)
+
+    async def valor(self, consulta: str, *params):
+        return await self._consulta(self._conn.fetchval, consulta, params, "valor")
+
+    async def fila(self, consulta: str, *params):
+        row = await self._consulta(self._conn.fetchrow, consulta, params, "fila")
+        return dict(row) if row else None
+
+    async def filas(self, consulta: str, *params):
+        rows = await self._consulta(self._conn.fetch, consulta, params, "filas")
+        return [dict(row) for row in rows]
+
+    async def ejecutar(self, consulta: str, *params):
+        await self._consulta(self._conn.execute, consulta, params, "ejecutar")
+
+    async def _consulta(self, metodo, consulta, params, modo):
+        with span("bd.sql", modo=modo):
+            try:
+                return await metodo(_sql_asyncpg(consulta), *_params_asyncpg(params))
+            except asyncpg.PostgresError as e:
+                raise _error_asyncpg(e) from e
+
+
+@asynccontextmanager
+async def transaccion_async(role: str):
+    async with conexion_async(role) as conn:
+        yield _TransaccionAsync(conn)
+
+
+async def llamar_fn_async(role: str, nombre: str, *params, texto: bool = False):
+    # Una sola sentencia es atómica: no hace falta BEGIN/COMMIT (salvo en modo compartido)
+    async with conexion_async(role, transaccion=False) as conn:
+        return await _TransaccionAsync(conn).valor(sql_fn(nombre, len(params), texto), *params)
+
+
+async def llamar_fila_async(role: str, consulta: str, params):
+    # Fila completa como tupla (llamar_fn_versionada)
+    async with conexion_async(role, transaccion=False) as conn:
+        row = await _TransaccionAsync(conn)._consulta(conn.fetchrow, consulta, params, "fila")
+    return tuple(row)
+
+
+async def _leer_lote_async(cursor, lote):
+    try:
+        return await cursor.fetch(lote)
+    except asyncpg.PostgresError as e:
+        raise _error_asyncpg(e) from e
+
+
+async def _cerrar_flujo_async(pila, error):
+    # Con error se sale con ROLLBACK, igual que un async with que falla
+    if error is None:
+        await pila.aclose()
+    else:
+        await pila.__aexit__(type(error), error, error.__traceback__)
+
+
+async def flujo_filas_async(role: str, consulta: str, params, lote: int):
+    # El cursor de asyncpg necesita una transacción abierta mientras se lee
+    pila = AsyncExitStack()
+    try:
+        conn = await pila.enter_async_context(conexion_async(role))
+        cursor = await conn.cursor(_sql_asyncpg(consulta), *_params_asyncpg(params))
+    except BaseException as e:
+        await pila.aclose()
+        if isinstance(e, asyncpg.PostgresError):
+            raise _error_asyncpg(e) from e
+        raise
+    return Flujo(
+        lambda: _leer_lote_async(cursor, lote),
+        lambda error: _cerrar_flujo_async(pila, error),
+    )
+
+
+async def _conectar_escucha():
+    user, password = _credenciales_escucha()
+    return await asyncpg.connect(
+        host=os.getenv("DB_HOST"),
+        port=int(os.getenv("DB_PORT", "5432")),
+        database=os.getenv("DB_NAME"),
+        user=user,
+        password=password,
+    )
+
+
+async def _escuchar(canal, al_notificar, al_conectar):
+    # Conexión propia fuera del pool; si se cae, se reconecta y se avisa con al_conectar
+    while True:
+        conn = None
+        try:
+            conn = await _conectar_escucha()
+            await conn.add_listener(canal, lambda _conn, _pid, _canal, payload: al_notificar(payload))
+            al_conectar()
+            while not conn.is_closed():
+                await asyncio.sleep(ESCUCHA_REINTENTO)
+        except (asyncpg.PostgresError, OSError, asyncpg.InterfaceError):
+            await asyncio.sleep(ESCUCHA_REINTENTO)
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+
+
+async def iniciar_escucha_async(canal: str, al_notificar, al_conectar) -> asyncio.Task:
+    return asyncio.create_task(_escuchar(canal, al_notificar, al_conectar))
+
+
+async def detener_escucha_async(tarea: asyncio.Task):
+    tarea.cancel()
+    try:
+        await tarea
+    except asyncio.CancelledError:
+        pass
+
+
+async def iniciar_pools():
+    roles = ROLES[:1] if POOL_MODO == POOL_COMPARTIDO else ROLES
+    for role in roles:
+        await _pool(role)
+
+
+async def cerrar_pools():
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        await pool.close()
+
+
+def estadisticas_pool() -> dict:
+    resultado = {}
+    for clave, pool in list(_pools.items()):
+        stats = _estadisticas[clave]
+        resultado[clave] = {
+            "en_uso": pool.get_size() - pool.get_idle_size(),
+            "libres": pool.get_idle_size(),
+            "esperando": stats["esperando"],
+            "minimo": pool.get_min_size(),
+            "maximo": pool.get_max_size(),
+            "prestamos": stats["prestamos"],
+            "tiempo_espera_total": round(stats["tiempo_espera_total"], 6),
+            "tiempo_espera_max": round(stats["tiempo_espera_max"], 6),
+            "timeouts": stats["timeouts"],
+        }
+    return resultado
@@ -0,0 +1,58 @@
+import hashlib
+import json
+from typing import Optional
+from fastapi import Request, Response
+
+# ETag de los listados a partir de la versión de sus tablas
+# (fn_version_tablas, migraciones/0014_versiones_sin_bloqueo.sql).
+# El ETag es "<version>.<sello>": la versión viaja en el ETag y se devuelve a
+# PostgreSQL en la misma llamada del listado (llamar_fn_versionada). Si no
+# cambió, la función del listado no se ejecuta y se responde 304.
+
+# Una versión legítima es corta ("12-3-0"); lo demás se ignora
+_MAX_VERSION = 200
+
+
+def _sello(request: Request, user: dict) -> str:
+    """
+    Distingue usuario/rol (un veterinario ve solo sus citas) y los
+    parámetros de la URL (paginación).
+    """
+    clave = json.dumps([user["role"], user["id"], str(request.url.query)])
+    return hashlib.sha256(clave.encode()).hexdigest()[:24]
+
+
+def _candidatos(request: Request):
+    cabecera = request.headers.get("if-none-match") or ""
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    return [c.strip().removeprefix("W/") for c in cabecera.split(",") if c.strip()]
+
+
+def version_conocida(request: Request, user: dict) -> Optional[str]:
+    """
+    La versión del ETag que envía el cliente para esta misma URL y usuario, o None
+    """
+    sello = _sello(request, user)
+    for candidato in _candidatos(request):
+        version, _, sello_cliente = candidato.strip('"').rpartition(".")
+        if sello_cliente == sello and version and len(version) <= _MAX_VERSION:
+            return version
+    return None
+
+
+def etag_version(request: Request, user: dict, version: str) -> str:
+    return f'"{version}.{_sello(request, user)}"'
+
+
+def no_modificado(request: Request, etag: str) -> bool:
+    candidatos = _candidatos(request)
+    return "*" in candidatos or etag in candidatos
+
+
+def cabeceras_etag(etag: str) -> dict:
+    # no-cache: el navegador guarda la respuesta pero siempre revalida con If-None-Match
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def respuesta_304(etag: str) -> Response:
+    return Response(status_code=304, headers=cabeceras_etag(etag))
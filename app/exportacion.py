@@ -0,0 +1,46 @@
+import anyio
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from app.database import Flujo, flujo_filas
+
+# Exportación completa para procesos de sincronización: una fila JSON por línea.
+# PostgreSQL arma el JSON de cada fila (row_to_json) y se reenvía como texto,
+# sin pasar por objetos Python.
+NDJSON = "application/x-ndjson"
+
+
+def pide_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+class RespuestaNDJSON(StreamingResponse):
+    """
+    Libera el cursor y la conexión al terminar la respuesta, también si el
+    cliente se desconecta antes del primer byte (el iterador nunca arranca).
+    """
+
+    media_type = NDJSON
+
+    def __init__(self, filas: Flujo):
+        super().__init__(_lineas(filas))
+        self._filas = filas
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self._filas.aclose()
+
+
+async def _lineas(filas: Flujo):
+    async for fila in filas:
+        yield fila + "\n"
+
+
+async def respuesta_ndjson(role: str, consulta: str, *params) -> StreamingResponse:
+    """
+    consulta debe devolver una sola columna de texto JSON por fila
+    """
+    filas = await flujo_filas(role, consulta, *params)
+    return RespuestaNDJSON(filas)
@@ -0,0 +1,41 @@
+import json
+from typing import Optional
+from fastapi.responses import Response
+
+# Las funciones fn_* ya devuelven el JSON armado por PostgreSQL. En los listados
+# completos se pide como texto (llamar_fn_texto) y se escribe tal cual en el
+# body: sin json.loads en el driver ni jsonable_encoder + json.dumps en FastAPI.
+
+# Los errores controlados ({"status": "error", ...}) son objetos chicos
+_MAX_ERROR = 2048
+
+
+class RespuestaJSON(Response):
+    media_type = "application/json"
+
+
+def error_json(texto: Optional[str]) -> Optional[dict]:
+    """
+    Devuelve el objeto si el texto es un {"status": "error", ...}, si no None.
+    Solo se parsea un objeto pequeño que contenga "error"; una lista nunca lo es.
+    """
+    if texto is None or len(texto) > _MAX_ERROR or '"error"' not in texto:
+        return None
+    if not texto.lstrip().startswith("{"):
+        return None
+    valor = json.loads(texto)
+    if isinstance(valor, dict) and valor.get("status") == "error":
+        return valor
+    return None
+
+
+def vacio(texto: Optional[str]) -> bool:
+    # json_agg sin filas devuelve NULL; con COALESCE, []
+    return texto is None or texto.strip() in ("", "null", "[]")
+
+
+def envolver(clave: str, texto: str) -> str:
+    """
+    {"clave": <texto>} sin parsear el texto
+    """
+    return '{' + json.dumps(clave) + ':' + texto + '}'
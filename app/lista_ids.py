@@ -0,0 +1,32 @@
+from fastapi import HTTPException, Query
+
+# Endpoints obtener-*?ids=1,2,3: todas las filas pedidas con una sola consulta
+# (id = ANY(...)) en vez de una petición por id.
+MAX_IDS = 100
+
+
+class ListaIds:
+    """
+    Parámetro ?ids=1,2,3 (sin repetidos, en el orden recibido)
+    """
+
+    def __init__(self, ids: str = Query(..., description="ids separados por coma")):
+        try:
+            valores = [int(v) for v in ids.split(",") if v.strip()]
+        except ValueError:
+            raise HTTPException(400, "ids debe ser una lista de números separados por coma")
+
+        if not valores:
+            raise HTTPException(400, "Debe enviar al menos un id")
+
+        self.ids = list(dict.fromkeys(valores))
+        if len(self.ids) > MAX_IDS:
+            raise HTTPException(400, f"Máximo {MAX_IDS} ids por petición")
+
+
+def por_id(filas, ids) -> dict:
+    """
+    { data: {id: fila}, faltantes: [ids que no existen] }
+    """
+    data = {fila["id"]: fila for fila in filas or []}
+    return {"data": data, "faltantes": [i for i in ids if i not in data]}
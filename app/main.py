@@ -1,10 +1,17 @@
-from fastapi import FastAPI
-from app.routers import razas, usuarios, medicamentos, mascotas, facturas, consultas,clientes,citas,consulta_medicamentos
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import http_exception_handler
+from app.routers import razas, usuarios, medicamentos, mascotas, facturas, consultas,clientes,citas,consulta_medicamentos,monitoreo,batch,metricas
 from app.auth import router as auth_router
 from app.seeders.seed import seed_admin
+from app.database import ErrorBD, error_http, iniciar_bd, cerrar_bd
+from app.cache_catalogos import iniciar_cache_catalogos
+from app.seguridad import cerrar_pool_hash
+from app.respuestas import RespuestaORJSON
+from app.metricas import MiddlewareMetricas
+from app.trazas import MiddlewareTrazas, cerrar_trazas
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+app = FastAPI(default_response_class=RespuestaORJSON)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,10 +21,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Último en agregarse = el más externo: mide también lo que agregan los demás middlewares
+app.add_middleware(MiddlewareMetricas)
+# X-Request-ID y trazas (TRAZAS_EXPORTADOR); envuelve a todo lo anterior
+app.add_middleware(MiddlewareTrazas)
+
+# Errores de PostgreSQL que ningún handler atrapó → misma respuesta en todos los routers
+@app.exception_handler(ErrorBD)
+async def error_bd_handler(request: Request, exc: ErrorBD):
+    return await http_exception_handler(request, error_http(exc))
+
+
 @app.on_event("startup")
-def startup_event():
-    seed_admin()
-    
+async def startup_event():
+    await iniciar_bd()
+    await iniciar_cache_catalogos()
+    await seed_admin()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await cerrar_bd()
+    cerrar_pool_hash()
+    cerrar_trazas()
+
 
 app.include_router(auth_router, prefix="/api")
 app.include_router(usuarios.router, prefix="/api")
@@ -29,6 +56,10 @@ app.include_router(consultas.router, prefix="/api")
 app.include_router(clientes.router, prefix="/api")
 app.include_router(citas.router, prefix="/api")
 app.include_router(consulta_medicamentos.router, prefix="/api")
+app.include_router(monitoreo.router, prefix="/api")
+app.include_router(batch.router, prefix="/api")
+# Sin prefijo /api: Prometheus lo busca en /metrics
+app.include_router(metricas.router)
 
 
 
@@ -0,0 +1,192 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Métricas en memoria con el formato de texto de Prometheus (GET /metrics).
+# Cada observación es un bisect y unas sumas bajo un lock: se puede dejar
+# activo en producción. Los valores son por proceso (cada worker de uvicorn
+# expone los suyos; Prometheus los distingue por instancia).
+
+# Sin METRICAS_TOKEN, /metrics responde 404 salvo METRICAS_PUBLICAS=1
+# (por ejemplo si solo es accesible desde la red interna de Prometheus)
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN")
+METRICAS_PUBLICAS = os.getenv("METRICAS_PUBLICAS", "0") == "1"
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BYTES = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres, valores, extra="") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+
+    tipo = "counter"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores, cantidad=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def lineas(self):
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for clave, valor in valores:
+            yield f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}"
+
+
+class Histograma:
+
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_SEGUNDOS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores):
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                # [conteo por bucket (no acumulado) + desborde, suma]
+                serie = self._series[valores] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    @contextmanager
+    def medir(self, *valores):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, *valores)
+
+    def lineas(self):
+        with self._lock:
+            series = sorted((clave, list(conteos), suma) for clave, (conteos, suma) in self._series.items())
+        for clave, conteos, suma in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float("inf"),), conteos):
+                acumulado += conteo
+                le = f'le="{_numero(limite)}"'
+                yield f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, le)} {acumulado}"
+            yield f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(suma)}"
+            yield f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {acumulado}"
+
+
+# ---------------------------------------
+#      MÉTRICAS DE LA APLICACIÓN
+# ---------------------------------------
+HTTP_PETICIONES = Contador(
+    "http_peticiones_total", "Peticiones HTTP atendidas", ("metodo", "ruta", "rol", "estado")
+)
+HTTP_DURACION = Histograma(
+    "http_duracion_segundos", "Duración de las peticiones HTTP", ("metodo", "ruta", "rol")
+)
+HTTP_RESPUESTA_BYTES = Histograma(
+    "http_respuesta_bytes", "Tamaño del body de las respuestas", ("metodo", "ruta"), BUCKETS_BYTES
+)
+BD_FUNCION_DURACION = Histograma(
+    "bd_funcion_duracion_segundos", "Duración de cada llamada a una función fn_*", ("funcion",)
+)
+BD_FUNCION_ERRORES = Contador(
+    "bd_funcion_errores_total", "Llamadas a funciones fn_* que terminaron en error", ("funcion",)
+)
+BD_CONEXION_ESPERA = Histograma(
+    "bd_conexion_espera_segundos", "Tiempo para obtener una conexión del pool", ("pool",)
+)
+AUTH_VERIFICACION = Histograma(
+    "auth_verificacion_password_segundos", "Verificación argon2 en el login (incluye la cola)"
+)
+
+METRICAS = (
+    HTTP_PETICIONES, HTTP_DURACION, HTTP_RESPUESTA_BYTES,
+    BD_FUNCION_DURACION, BD_FUNCION_ERRORES, BD_CONEXION_ESPERA, AUTH_VERIFICACION,
+)
+
+
+def exponer(medidores: dict = None) -> str:
+    """
+    Texto para Prometheus. medidores: {nombre: (ayuda, [(etiquetas, valor), ...])}
+    con valores instantáneos (pools, cola de hash) leídos al momento de la consulta.
+    """
+    lineas = []
+    for metrica in METRICAS:
+        lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+        lineas.extend(metrica.lineas())
+
+    for nombre, (ayuda, muestras) in sorted((medidores or {}).items()):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} gauge")
+        for etiquetas, valor in muestras:
+            lineas.append(f"{nombre}{_etiquetas(etiquetas.keys(), etiquetas.values())} {_numero(valor)}")
+
+    return "\n".join(lineas) + "\n"
+
+
+# ---------------------------------------
+#      MIDDLEWARE ASGI
+# ---------------------------------------
+class MiddlewareMetricas:
+    """
+    Mide cada petición HTTP. La ruta es la plantilla (/api/citas/obtener-cita/{cita_id}),
+    no la URL, para no crear una serie por id; el rol lo deja get_current_user en
+    request.state.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        respuesta = {"estado": 500, "bytes": 0}
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                respuesta["estado"] = mensaje["status"]
+            elif mensaje["type"] == "http.response.body":
+                respuesta["bytes"] += len(mensaje.get("body", b""))
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion = time.perf_counter() - inicio
+            ruta = getattr(scope.get("route"), "path", None) or "sin_ruta"
+            rol = scope.get("state", {}).get("rol", "anonimo")
+            metodo = scope["method"]
+
+            HTTP_PETICIONES.inc(metodo, ruta, rol, str(respuesta["estado"]))
+            HTTP_DURACION.observar(duracion, metodo, ruta, rol)
+            HTTP_RESPUESTA_BYTES.observar(respuesta["bytes"], metodo, ruta)
@@ -0,0 +1,213 @@
+"""
+Aplica en orden los archivos de migraciones/ (NNNN_descripcion.sql) y registra
+cada versión aplicada en la tabla schema_migrations.
+
+Uso:
+    python -m app.migraciones            aplica las pendientes
+    python -m app.migraciones --estado   muestra aplicadas y pendientes
+
+Cada archivo corre en su propia transacción. Si su primera línea es
+"-- migracion: sin-transaccion" se ejecuta sentencia por sentencia en
+autocommit, necesario para CREATE INDEX CONCURRENTLY; en esos archivos cada
+sentencia termina en ";" al final de la línea y no se usan bloques $$.
+
+Se conecta con DB_MIGRACIONES_USER / DB_MIGRACIONES_PASSWORD (el dueño del
+esquema); si no están definidas usa ADMIN_USER / ADMIN_PASSWORD.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+
+import psycopg2
+from psycopg2 import extensions
+
+from app.database import _abrir_conexion, _credenciales
+
+DIRECTORIO = Path(__file__).resolve().parent.parent / "migraciones"
+SIN_TRANSACCION = "-- migracion: sin-transaccion"
+VERSION_BASE = "0000"
+
+_ARCHIVO = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+_INDICE_CONCURRENTE = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE
+)
+# Clave de pg_advisory_lock: dos despliegues a la vez no aplican la misma migración
+_BLOQUEO = 7_420_001
+
+
+class Migracion:
+
+    def __init__(self, ruta: Path):
+        m = _ARCHIVO.match(ruta.name)
+        self.ruta = ruta
+        self.version = m.group(1)
+        self.nombre = m.group(2)
+        self.sql = ruta.read_text(encoding="utf-8")
+        self.checksum = hashlib.sha256(self.sql.encode()).hexdigest()
+        self.sin_transaccion = self.sql.lstrip().startswith(SIN_TRANSACCION)
+
+    def sentencias(self):
+        # Solo para archivos sin transacción (sentencias simples, una o más líneas)
+        lineas = [l for l in self.sql.splitlines() if not l.strip().startswith("--")]
+        texto = "\n".join(lineas)
+        return [s.strip() for s in re.split(r";\s*$", texto, flags=re.MULTILINE) if s.strip()]
+
+
+def leer_migraciones():
+    migraciones = [Migracion(r) for r in sorted(DIRECTORIO.glob("*.sql")) if _ARCHIVO.match(r.name)]
+    versiones = [m.version for m in migraciones]
+    if len(versiones) != len(set(versiones)):
+        raise SystemExit("Hay dos archivos de migración con la misma versión")
+    return migraciones
+
+
+def _conectar():
+    user = os.getenv("DB_MIGRACIONES_USER")
+    password = os.getenv("DB_MIGRACIONES_PASSWORD")
+    if not user:
+        user, password = _credenciales("administrador")
+    return _abrir_conexion(user, password)
+
+
+def _preparar(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS public.schema_migrations (
+                version character varying(4) PRIMARY KEY,
+                nombre text NOT NULL,
+                checksum character(64) NOT NULL,
+                aplicada_en timestamp without time zone DEFAULT now() NOT NULL
+            )
+        """)
+        cur.execute("SELECT count(*) FROM public.schema_migrations")
+        vacia = cur.fetchone()[0] == 0
+        cur.execute("SELECT to_regclass('public.citas') IS NOT NULL")
+        restaurada = cur.fetchone()[0]
+    conn.commit()
+    return vacia and restaurada
+
+
+def _aplicadas(conn) -> dict:
+    with conn.cursor() as cur:
+        cur.execute("SELECT version, checksum FROM public.schema_migrations ORDER BY version")
+        filas = cur.fetchall()
+    conn.commit()
+    return dict(filas)
+
+
+def _registrar(cur, migracion):
+    cur.execute(
+        "INSERT INTO public.schema_migrations (version, nombre, checksum) VALUES (%s, %s, %s)",
+        (migracion.version, migracion.nombre, migracion.checksum)
+    )
+
+
+def _reparar_indice_invalido(cur, sentencia):
+    """
+    Un CREATE INDEX CONCURRENTLY que falla deja el índice creado pero inválido,
+    y IF NOT EXISTS lo saltaría en el reintento: se borra antes de volver a crearlo.
+    """
+    m = _INDICE_CONCURRENTE.search(sentencia)
+    if not m:
+        return
+    cur.execute("""
+        SELECT 1 FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = %s AND NOT i.indisvalid
+    """, (m.group(1),))
+    if cur.fetchone():
+        print(f"  índice inválido {m.group(1)}: se elimina y se vuelve a crear")
+        cur.execute(f'DROP INDEX CONCURRENTLY IF EXISTS public."{m.group(1)}"')
+
+
+def _aplicar(conn, migracion):
+    if not migracion.sin_transaccion:
+        with conn.cursor() as cur:
+            cur.execute(migracion.sql)
+            _registrar(cur, migracion)
+        conn.commit()
+        return
+
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for sentencia in migracion.sentencias():
+                _reparar_indice_invalido(cur, sentencia)
+                cur.execute(sentencia)
+            _registrar(cur, migracion)
+    finally:
+        conn.autocommit = False
+
+
+def migrar():
+    migraciones = leer_migraciones()
+    conn = _conectar()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (_BLOQUEO,))
+        conn.commit()
+
+        if _preparar(conn):
+            # Base restaurada desde full_backup.sql: el esquema base ya existe
+            base = next((m for m in migraciones if m.version == VERSION_BASE), None)
+            if base is not None:
+                with conn.cursor() as cur:
+                    _registrar(cur, base)
+                conn.commit()
+                print(f"{base.version} {base.nombre}: esquema existente, marcada como aplicada")
+
+        aplicadas = _aplicadas(conn)
+        pendientes = [m for m in migraciones if m.version not in aplicadas]
+
+        for m in migraciones:
+            if m.version in aplicadas and aplicadas[m.version].strip() != m.checksum:
+                print(f"AVISO: {m.ruta.name} cambió después de aplicarse")
+
+        if not pendientes:
+            print("No hay migraciones pendientes")
+            return
+
+        for m in pendientes:
+            print(f"Aplicando {m.ruta.name}...")
+            try:
+                _aplicar(conn, m)
+            except psycopg2.Error as e:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                raise SystemExit(f"Error en {m.ruta.name}: {e}")
+        print(f"{len(pendientes)} migración(es) aplicada(s)")
+    finally:
+        conn.close()
+
+
+def estado():
+    migraciones = leer_migraciones()
+    conn = _conectar()
+    try:
+        _preparar(conn)
+        aplicadas = _aplicadas(conn)
+    finally:
+        conn.close()
+
+    for m in migraciones:
+        marca = "aplicada " if m.version in aplicadas else "pendiente"
+        print(f"{marca}  {m.ruta.name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.migraciones")
+    parser.add_argument("--estado", action="store_true", help="muestra aplicadas y pendientes")
+    args = parser.parse_args(argv)
+
+    if args.estado:
+        estado()
+    else:
+        migrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+
+
+class OperacionBatch(BaseModel):
+    op: str                      # nombre registrado en app/routers/batch.py (ej. "crear_cliente")
+    ref: Optional[str] = None    # alias para referenciar el resultado: {"$ref": "<ref>.id"}
+    datos: dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    operaciones: list[OperacionBatch]
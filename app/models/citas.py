@@ -11,20 +11,39 @@ class CitaBase(BaseModel):
 class CitaCreate(CitaBase):
     fecha: datetime
     hora: time
-    veterinario_id: int
+    # None → se asigna el veterinario con menos carga ese día
+    veterinario_id: Optional[int] = None
+    duracion_minutos: int = 30
 
 class CitaUpdate(BaseModel):
     fecha: Optional[datetime] = None
     hora: Optional[time] = None
     veterinario_id: Optional[int] = None
     estado: Optional[str] = None
+    duracion_minutos: Optional[int] = None
 
 class CitaResponse(BaseModel):
     id: int
     fecha: datetime
     hora: time
     veterinario_id: int
+    duracion_minutos: int
     estado: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+
+class VeterinarioResumen(BaseModel):
+    id: int
+    nombre: str
+
+
+class IntervaloLibre(BaseModel):
+    inicio: datetime
+    fin: datetime
+
+
+class DisponibilidadResponse(BaseModel):
+    veterinario: VeterinarioResumen
+    libres: list[IntervaloLibre]
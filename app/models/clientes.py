@@ -1,5 +1,7 @@
 from pydantic import BaseModel
+from datetime import datetime
 from typing import Optional
+from app.models.consultas import HistorialPagina
 
 class ClienteBase(BaseModel):
     nombre: str
@@ -22,3 +24,28 @@ class ClienteResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# ---- Ficha del cliente (fn_obtener_ficha_cliente) ----
+
+class FichaCliente(BaseModel):
+    id: int
+    nombre: str
+    telefono: Optional[str] = None
+    direccion: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class FichaMascota(BaseModel):
+    id: int
+    nombre: str
+    edad: Optional[int] = None
+    peso: Optional[float] = None
+    raza: str
+    historial: HistorialPagina
+
+
+class FichaClienteResponse(BaseModel):
+    cliente: FichaCliente
+    mascotas: list[FichaMascota]
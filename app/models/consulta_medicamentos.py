@@ -12,6 +12,16 @@ class ConsultaMedicamentoCreate(ConsultaMedicamentoBase):
     pass
 
 
+class ConsultaMedicamentoLinea(BaseModel):
+    medicamento_id: int
+    cantidad: int
+
+
+class ConsultaMedicamentosLote(BaseModel):
+    consulta_id: int
+    medicamentos: list[ConsultaMedicamentoLinea]
+
+
 class ConsultaMedicamentoUpdate(BaseModel):
     cantidad: Optional[int] = None
 
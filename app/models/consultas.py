@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import date, datetime, time
 from typing import Optional
 
 class ConsultaBase(BaseModel):
@@ -29,3 +30,75 @@ class ConsultaResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# ---- Detalle de consulta (fn_obtener_consulta_detalle) ----
+
+class DetalleCita(BaseModel):
+    id: int
+    fecha: date
+    hora: time
+    estado: Optional[str] = None
+
+
+class DetalleMascota(BaseModel):
+    id: int
+    nombre: str
+    edad: Optional[int] = None
+    peso: Optional[float] = None
+    raza: str
+
+
+class DetalleCliente(BaseModel):
+    id: int
+    nombre: str
+    telefono: Optional[str] = None
+    direccion: Optional[str] = None
+
+
+class DetalleMedicamento(BaseModel):
+    id: int
+    nombre: str
+    precio: float
+    cantidad: int
+    subtotal: float
+
+
+class DetalleFactura(BaseModel):
+    id: int
+    total: float
+    fecha: Optional[datetime] = None
+
+
+class ConsultaDetalleResponse(BaseModel):
+    id: int
+    cita_id: int
+    cliente_id: int
+    mascota_id: int
+    veterinario_id: int
+    diagnostico: Optional[str] = None
+    total: Optional[float] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    cita: DetalleCita
+    mascota: DetalleMascota
+    cliente: DetalleCliente
+    medicamentos: list[DetalleMedicamento]
+    factura: Optional[DetalleFactura] = None
+
+
+# ---- Historial de una mascota (fn_historial_mascota_pagina) ----
+
+class HistorialConsulta(BaseModel):
+    id: int
+    cita_id: int
+    veterinario_id: int
+    diagnostico: Optional[str] = None
+    total: Optional[float] = None
+    created_at: Optional[datetime] = None
+    factura: Optional[DetalleFactura] = None
+
+
+class HistorialPagina(BaseModel):
+    data: list[HistorialConsulta]
+    next_cursor: Optional[str] = None
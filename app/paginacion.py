@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from typing import Optional
+from fastapi import HTTPException, Query
+
+# Paginación por keyset: el cliente recibe un cursor opaco con la clave de la
+# última fila devuelta y lo reenvía para pedir la siguiente página. Las
+# funciones *_pagina reciben esa clave en vez de un OFFSET, así el costo de
+# cada página no crece con el tamaño de la tabla.
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 200
+
+
+class Paginacion:
+    """
+    Parámetros ?limit=&cursor= de los endpoints /listar-*.
+    Si no llega ninguno, el endpoint responde el listado completo como antes.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO),
+        cursor: Optional[str] = Query(None)
+    ):
+        self.activa = limit is not None or cursor is not None
+        self.limite = limit or LIMITE_POR_DEFECTO
+        self.cursor = decodificar_cursor(cursor)
+
+    def id(self) -> Optional[int]:
+        valor = self.cursor.get("id")
+        # bool es subclase de int: {"id": true} también es un cursor inválido
+        if valor is not None and (not isinstance(valor, int) or isinstance(valor, bool)):
+            raise HTTPException(400, "Cursor inválido")
+        return valor
+
+    def fecha_hora_id(self):
+        if not self.cursor:
+            return None, None, None
+        try:
+            return (
+                date.fromisoformat(self.cursor["fecha"]),
+                time.fromisoformat(self.cursor["hora"]),
+                int(self.cursor["id"])
+            )
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(400, "Cursor inválido")
+
+    def created_at_id(self):
+        if not self.cursor:
+            return None, None
+        try:
+            return datetime.fromisoformat(self.cursor["created_at"]), int(self.cursor["id"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(400, "Cursor inválido")
+
+
+def codificar_cursor(clave: dict) -> str:
+    texto = json.dumps(clave, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: Optional[str]) -> dict:
+    if not cursor:
+        return {}
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        clave = json.loads(texto)
+    except (binascii.Error, ValueError):
+        raise HTTPException(400, "Cursor inválido")
+    if not isinstance(clave, dict):
+        raise HTTPException(400, "Cursor inválido")
+    return clave
+
+
+def pagina(filas, limite: int, campos=("id",)) -> dict:
+    """
+    filas viene de una función *_pagina llamada con limite + 1: la fila extra
+    solo indica que hay otra página y no se devuelve.
+    """
+    filas = filas or []
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    next_cursor = None
+    if hay_mas:
+        ultima = filas[-1]
+        next_cursor = codificar_cursor({campo: ultima[campo] for campo in campos})
+
+    return {"data": filas, "next_cursor": next_cursor}
@@ -0,0 +1,36 @@
+import datetime
+import decimal
+
+import orjson
+from fastapi.responses import JSONResponse
+from app.trazas import span
+
+# Clase de respuesta por defecto de la app (FastAPI(default_response_class=...)).
+# orjson serializa dict/list/str/int/float, date, time y datetime en C; lo que
+# no conoce pasa por _por_defecto con las mismas reglas que jsonable_encoder.
+
+
+def _por_defecto(valor):
+    if isinstance(valor, decimal.Decimal):
+        # Igual que FastAPI: 10 → 10, 10.50 → 10.5
+        return int(valor) if valor.as_tuple().exponent >= 0 else float(valor)
+    if isinstance(valor, datetime.timedelta):
+        return valor.total_seconds()
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def a_json(contenido) -> bytes:
+    # OPT_NON_STR_KEYS: diccionarios indexados por id (obtener-*?ids=)
+    return orjson.dumps(contenido, default=_por_defecto, option=orjson.OPT_NON_STR_KEYS)
+
+
+class RespuestaORJSON(JSONResponse):
+
+    def render(self, content) -> bytes:
+        with span("serializacion") as s:
+            body = a_json(content)
+            if s is not None:
+                s.atributo("bytes", len(body))
+        return body
@@ -0,0 +1,195 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.auth import get_current_user
+from app.database import ErrorBD, error_http, transaccion
+from app.models.batch import BatchRequest
+from app.models.citas import CitaCreate
+from app.models.clientes import ClienteCreate
+from app.models.consulta_medicamentos import ConsultaMedicamentoCreate
+from app.models.consultas import ConsultaCreate
+from app.models.facturas import FacturaCreate
+from app.models.mascotas import MascotaCreate
+from app.routers.citas import ROLES_CREAR_CITA, _error_cita, _normalizar_fecha
+from app.routers.clientes import ROLES_CREAR_CLIENTE
+from app.routers.consulta_medicamentos import ROLES_AGREGAR_MEDICAMENTO
+from app.routers.consultas import ROLES_CREAR_CONSULTA, _error_consulta
+from app.routers.facturas import ROLES_CREAR_FACTURA
+from app.routers.mascotas import ROLES_CREAR_MASCOTA
+from pydantic import ValidationError
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+# Varias operaciones de escritura en una sola conexión y una sola transacción.
+# Si una falla se hace ROLLBACK de todas. Un valor {"$ref": "<n>.<campo>"} o
+# {"$ref": "<ref>.<campo>"} en los datos se reemplaza por el resultado de una
+# operación anterior, por ejemplo {"cliente_id": {"$ref": "cliente.id"}}.
+# Los textos se pasan tal cual aunque empiecen con "$" (un diagnóstico, una dirección).
+
+BATCH_MAX_OPERACIONES = 20
+
+
+class Operacion:
+
+    def __init__(self, roles, modelo, ejecutar, error_bd=None):
+        self.roles = roles
+        self.modelo = modelo
+        self.ejecutar = ejecutar
+        self.error_bd = error_bd
+
+
+# ------------------------------
+#   OPERACIONES (mismas reglas que los endpoints individuales)
+# ------------------------------
+async def _crear_cliente(tx, data: ClienteCreate):
+    existe = await tx.fila("""
+        SELECT id FROM clientes
+        WHERE nombre = %s AND telefono = %s
+    """, data.nombre, data.telefono)
+
+    if existe:
+        raise HTTPException(400, "El cliente ya existe.")
+
+    return await tx.llamar_fn("fn_crear_cliente", data.nombre, data.telefono, data.direccion)
+
+
+async def _crear_mascota(tx, data: MascotaCreate):
+    return await tx.llamar_fn(
+        "fn_crear_mascota",
+        data.cliente_id, data.raza_id, data.nombre, data.edad, data.peso
+    )
+
+
+async def _crear_cita(tx, data: CitaCreate):
+    fecha = _normalizar_fecha(data.fecha)
+
+    if data.veterinario_id is None:
+        return await tx.llamar_fn("fn_crear_cita_auto", fecha, data.hora, data.duracion_minutos)
+
+    return await tx.llamar_fn(
+        "fn_crear_cita",
+        fecha, data.hora, data.veterinario_id, data.duracion_minutos
+    )
+
+
+async def _crear_consulta(tx, data: ConsultaCreate):
+    return await tx.llamar_fn(
+        "fn_crear_consulta",
+        data.cita_id, data.cliente_id, data.mascota_id,
+        data.veterinario_id, data.diagnostico, data.total
+    )
+
+
+async def _crear_factura(tx, data: FacturaCreate):
+    return await tx.llamar_fn("fn_crear_factura", data.consulta_id, data.total)
+
+
+async def _agregar_medicamento(tx, data: ConsultaMedicamentoCreate):
+    return await tx.llamar_fn(
+        "fn_agregar_medicamento_consulta",
+        data.consulta_id, data.medicamento_id, data.cantidad
+    )
+
+
+# Cada operación exige los roles de su endpoint y el batch entero corre con el
+# rol del usuario: un batch solo puede incluir operaciones que ese rol ya puede
+# hacer una por una. No da permisos nuevos (ej. veterinario: cliente → mascota;
+# la cita la agenda secretaria o administrador en otra llamada).
+OPERACIONES = {
+    "crear_cliente": Operacion(ROLES_CREAR_CLIENTE, ClienteCreate, _crear_cliente),
+    "crear_mascota": Operacion(ROLES_CREAR_MASCOTA, MascotaCreate, _crear_mascota),
+    "crear_cita": Operacion(ROLES_CREAR_CITA, CitaCreate, _crear_cita, _error_cita),
+    "crear_consulta": Operacion(ROLES_CREAR_CONSULTA, ConsultaCreate, _crear_consulta, _error_consulta),
+    "crear_factura": Operacion(ROLES_CREAR_FACTURA, FacturaCreate, _crear_factura),
+    "agregar_medicamento": Operacion(ROLES_AGREGAR_MEDICAMENTO, ConsultaMedicamentoCreate, _agregar_medicamento),
+}
+
+
+def _resolver(valor, resultados: dict):
+    """
+    Reemplaza {"$ref": "<n>.<campo>"} / {"$ref": "<ref>.<campo>"} por el valor de un resultado anterior
+    """
+    if isinstance(valor, dict):
+        if "$ref" not in valor:
+            return {k: _resolver(v, resultados) for k, v in valor.items()}
+        referencia = valor["$ref"]
+        if len(valor) != 1 or not isinstance(referencia, str):
+            raise HTTPException(400, f"Referencia inválida: {valor}")
+
+        clave, _, campo = referencia.partition(".")
+        resultado = resultados.get(clave)
+        if not isinstance(resultado, dict) or (campo or "id") not in resultado:
+            raise HTTPException(400, f"Referencia inválida: {referencia}")
+        return resultado[campo or "id"]
+    if isinstance(valor, list):
+        return [_resolver(v, resultados) for v in valor]
+    return valor
+
+
+def _error_operacion(indice: int, nombre: str, e: HTTPException):
+    raise HTTPException(e.status_code, f"Operación {indice} ({nombre}): {e.detail}")
+
+
+@router.post("")
+async def ejecutar_batch(data: BatchRequest, user=Depends(get_current_user)):
+
+    if not data.operaciones:
+        raise HTTPException(400, "Debe enviar al menos una operación")
+
+    if len(data.operaciones) > BATCH_MAX_OPERACIONES:
+        raise HTTPException(400, f"Máximo {BATCH_MAX_OPERACIONES} operaciones por batch")
+
+    # Se valida todo (nombres, roles y alias) antes de abrir la transacción
+    refs = set()
+    for i, item in enumerate(data.operaciones):
+        operacion = OPERACIONES.get(item.op)
+        if operacion is None:
+            raise HTTPException(400, f"Operación {i}: '{item.op}' no existe")
+        if user["role"] not in operacion.roles:
+            raise HTTPException(403, f"Operación {i} ({item.op}): No autorizado")
+        if item.ref is not None:
+            if item.ref.isdigit() or item.ref in refs:
+                raise HTTPException(400, f"Operación {i}: alias '{item.ref}' inválido o repetido")
+            refs.add(item.ref)
+
+    resultados = {}
+    salida = []
+
+    async with transaccion(user["role"]) as tx:
+        for i, item in enumerate(data.operaciones):
+            operacion = OPERACIONES[item.op]
+
+            try:
+                datos = operacion.modelo(**_resolver(item.datos, resultados))
+            except HTTPException as e:
+                _error_operacion(i, item.op, e)
+            except ValidationError as e:
+                raise HTTPException(422, f"Operación {i} ({item.op}): {e.errors(include_url=False)}")
+
+            try:
+                try:
+                    resultado = await operacion.ejecutar(tx, datos)
+                except ErrorBD as e:
+                    # El mensaje del endpoint (ej. cita que se cruza) o el mapeo común (409/422/...)
+                    if operacion.error_bd is not None:
+                        try:
+                            operacion.error_bd(e)
+                        except ErrorBD:
+                            pass
+                    raise error_http(e) from e
+
+                if resultado is None:
+                    raise HTTPException(500, "La función SQL no retornó datos")
+
+                # Errores controlados de las funciones: {"status": "error", "message": ...}
+                if isinstance(resultado, dict) and resultado.get("status") == "error":
+                    raise HTTPException(400, resultado.get("message", "Error en la operación"))
+
+            except HTTPException as e:
+                # Sale del bloque con excepción → ROLLBACK de todo el batch
+                _error_operacion(i, item.op, e)
+
+            resultados[str(i)] = resultado
+            if item.ref is not None:
+                resultados[item.ref] = resultado
+            salida.append(resultado)
+
+    return {"status": "success", "resultados": salida}
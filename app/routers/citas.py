@@ -1,85 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from app.auth import get_current_user
-from app.database import get_connection
-from psycopg2.extras import RealDictCursor
-from datetime import date, datetime
-from app.models.citas import CitaCreate, CitaUpdate
+from app.database import ErrorBD, llamar_fn, llamar_fn_texto, llamar_fn_versionada
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from app.agenda import calcular_disponibilidad
+from app.models.citas import CitaCreate, CitaUpdate, DisponibilidadResponse
+from app.etag import version_conocida, etag_version, no_modificado, cabeceras_etag, respuesta_304
+from app.paginacion import Paginacion, pagina
+from app.json_crudo import RespuestaJSON, vacio
+from app.respuestas import RespuestaORJSON
 
 router = APIRouter(prefix="/citas", tags=["Citas"])
 
+# Roles que pueden crear; /api/batch usa los mismos (app/routers/batch.py)
+ROLES_CREAR_CITA = ("administrador", "secretaria")
 
-@router.post("/crear-cita", response_model=dict)
-def crear_cita(data: CitaCreate, user=Depends(get_current_user)):
 
-    if user["role"] not in ("administrador", "secretaria"):
-        raise HTTPException(403, "No autorizado")
-
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    # Verificar cita repetida (misma fecha + hora + veterinario)
-    cur.execute("""
-        SELECT id FROM citas
-        WHERE fecha = %s
-        AND hora = %s
-        AND veterinario_id = %s
-    """, (data.fecha, data.hora, data.veterinario_id))
-
-    existe = cur.fetchone()
-
-    if existe:
-        conn.close()
+def _error_cita(e: ErrorBD):
+    # 23P01: exclusion_violation (citas_sin_solapamiento)
+    if e.sqlstate == "23P01":
         raise HTTPException(
             status_code=400,
             detail="El veterinario ya tiene una cita programada en esa fecha y hora."
         )
-    # FECHA LLEGA COMO "2025-11-20" → LO FORZAMOS A DATE
-    if isinstance(data.fecha, str):
-        fecha = data.fecha.split("T")[0] if "T" in data.fecha else data.fecha
-    elif isinstance(data.fecha, datetime):
-        fecha = data.fecha.date().isoformat()
-    elif isinstance(data.fecha, date):
-        fecha = data.fecha.isoformat()
-    else:
-        fecha = str(data.fecha)
+    # 23514: check_violation (citas_duracion_check, citas_estado_check)
+    if e.sqlstate == "23514":
+        raise HTTPException(400, "Datos de la cita inválidos")
+    raise e
 
-    # Crear la cita con tu función SQL correcta
-    cur.execute(
-        "SELECT fn_crear_cita(%s, %s, %s)",
-        (fecha, data.hora, data.veterinario_id)
-    )
 
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
+def _normalizar_fecha(fecha):
+    # FECHA LLEGA COMO "2025-11-20" o datetime → LA FORZAMOS A DATE
+    if fecha is None:
+        return None
+    if isinstance(fecha, str):
+        return date.fromisoformat(fecha.split("T")[0])
+    if isinstance(fecha, datetime):
+        return fecha.date()
+    return fecha
 
-    if not result or not result["fn_crear_cita"]:
-        raise HTTPException(500, "fn_crear_cita no retornó datos")
 
-    return result["fn_crear_cita"]
+@router.post("/crear-cita")
+async def crear_cita(data: CitaCreate, user=Depends(get_current_user)):
 
+    if user["role"] not in ROLES_CREAR_CITA:
+        raise HTTPException(403, "No autorizado")
 
+    fecha = _normalizar_fecha(data.fecha)
+
+    # Sin veterinario: se elige el de menor carga que esté libre en ese horario
+    if data.veterinario_id is None:
+        try:
+            cita = await llamar_fn(
+                user["role"], "fn_crear_cita_auto",
+                fecha, data.hora, data.duracion_minutos
+            )
+        except ErrorBD as e:
+            _error_cita(e)
+
+        if isinstance(cita, dict) and cita.get("status") == "error":
+            raise HTTPException(400, cita.get("message", "No hay veterinarios disponibles"))
+
+        return cita
+
+    # Una sola sentencia: la restricción citas_sin_solapamiento rechaza
+    # cualquier cita que se cruce con otra del mismo veterinario
+    try:
+        cita = await llamar_fn(
+            user["role"], "fn_crear_cita",
+            fecha, data.hora, data.veterinario_id, data.duracion_minutos
+        )
+    except ErrorBD as e:
+        _error_cita(e)
 
+    if not cita:
+        raise HTTPException(500, "fn_crear_cita no retornó datos")
 
-@router.get("/obtener-cita/{cita_id}", response_model=dict)
-def obtener_cita(cita_id: int, user=Depends(get_current_user)):
+    return cita
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    cur.execute("SELECT fn_obtener_cita(%s)", (cita_id,))
-    result = cur.fetchone()
 
-    conn.close()
 
-    if not result or not result["fn_obtener_cita"]:
+@router.get("/obtener-cita/{cita_id}")
+async def obtener_cita(cita_id: int, user=Depends(get_current_user)):
+
+    cita = await llamar_fn(user["role"], "fn_obtener_cita", cita_id)
+
+    if not cita:
         raise HTTPException(
             status_code=404,
             detail=f"La cita con ID {cita_id} no existe."
         )
 
-    cita = result["fn_obtener_cita"]
-
     # 🔒 Validación para veterinario
     if user["role"] == "veterinario" and cita["veterinario_id"] != user["id"]:
         raise HTTPException(
@@ -91,121 +103,115 @@ def obtener_cita(cita_id: int, user=Depends(get_current_user)):
 
 
 
-@router.get("/listar-citas", response_model=list)
-def listar_citas(user=Depends(get_current_user)):
+@router.get("/listar-citas")
+async def listar_citas(
+    request: Request, response: Response,
+    pag: Paginacion = Depends(), user=Depends(get_current_user)
+):
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    veterinario = user["role"] == "veterinario"
 
-    # Veterinario
-    if user["role"] == "veterinario":
-        cur.execute("SELECT fn_listar_citas_por_veterinario(%s)", (user["id"],))
-        row = cur.fetchone()
-        conn.close()
+    # Paginado: ?limit=&cursor= → { data, next_cursor }
+    if pag.activa:
+        fecha, hora, cita_id = pag.fecha_hora_id()
+        if veterinario:
+            nombre, params = "fn_listar_citas_por_veterinario_pagina", (user["id"], fecha, hora, cita_id, pag.limite + 1)
+        else:
+            nombre, params = "fn_listar_citas_pagina", (fecha, hora, cita_id, pag.limite + 1)
+    elif veterinario:
+        nombre, params = "fn_listar_citas_por_veterinario", (user["id"],)
+    else:
+        nombre, params = "fn_listar_citas", ()
+
+    # Versión de citas/usuarios y listado en la misma llamada: si el cliente ya
+    # tiene esa versión (If-None-Match) la función del listado no se ejecuta → 304.
+    # El listado completo llega como texto y va directo al body, sin parsearlo.
+    version, sin_cambios, citas = await llamar_fn_versionada(
+        user["role"], ("citas", "usuarios"), version_conocida(request, user),
+        nombre, *params, texto=not pag.activa
+    )
+    etag = etag_version(request, user, version)
+    if sin_cambios or no_modificado(request, etag):
+        return respuesta_304(etag)
+    response.headers.update(cabeceras_etag(etag))
 
-        citas = row["fn_listar_citas_por_veterinario"] if row else None
+    if pag.activa:
+        return RespuestaORJSON(pagina(citas, pag.limite, ("fecha", "hora", "id")), headers=cabeceras_etag(etag))
 
-        if not citas:
+    if vacio(citas):
+        if veterinario:
             return [{"message": "Aún no hay citas registradas para este veterinario"}]
-
-        return citas
-
-    # Admin o secretaria
-    cur.execute("SELECT fn_listar_citas()")
-    row = cur.fetchone()
-    conn.close()
-
-    citas = row["fn_listar_citas"] if row else None
-
-    if not citas:
         return [{"message": "Aún no hay citas registradas"}]
 
-    return citas
+    # Al devolver un Response propio hay que pasarle las cabeceras del ETag
+    return RespuestaJSON(citas, headers=cabeceras_etag(etag))
 
 
 
-@router.put("/actualizar-cita/{cita_id}", response_model=dict)
-def actualizar_cita(cita_id: int, data: CitaUpdate, user=Depends(get_current_user)):
+@router.put("/actualizar-cita/{cita_id}")
+async def actualizar_cita(cita_id: int, data: CitaUpdate, user=Depends(get_current_user)):
 
     if user["role"] not in ["secretaria", "administrador", "veterinario"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
     # --- NORMALIZAR FECHA ---
-    if isinstance(data.fecha, str):
-        fecha = data.fecha.split("T")[0] if "T" in data.fecha else data.fecha
-    elif isinstance(data.fecha, datetime):
-        fecha = data.fecha.date().isoformat()
-    elif isinstance(data.fecha, date):
-        fecha = data.fecha.isoformat()
-    else:
-        fecha = str(data.fecha)
+    fecha = _normalizar_fecha(data.fecha)
 
     # --- EJECUTAR FUNCIÓN SQL CON TIPOS CORRECTOS ---
-    cur.execute(
-        "SELECT fn_actualizar_cita(%s, %s::date, %s::time, %s, %s)",
-        (cita_id, fecha, data.hora, data.veterinario_id, data.estado)
-    )
-
-    row = cur.fetchone()
-    conn.commit()
-    conn.close()
+    try:
+        cita = await llamar_fn(
+            user["role"], "fn_actualizar_cita",
+            cita_id, fecha, data.hora, data.veterinario_id, data.estado, data.duracion_minutos
+        )
+    except ErrorBD as e:
+        _error_cita(e)
 
-    if not row or not row["fn_actualizar_cita"]:
+    if not cita:
         raise HTTPException(
             status_code=404,
             detail=f"La cita con ID {cita_id} no existe o no pudo ser actualizada."
         )
 
-    return row["fn_actualizar_cita"]
+    return cita
 
 
 
-@router.delete("/eliminar-cita/{cita_id}", response_model=dict)
-def eliminar_cita(cita_id: int, user=Depends(get_current_user)):
+@router.delete("/eliminar-cita/{cita_id}")
+async def eliminar_cita(cita_id: int, user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_eliminar_cita(%s)", (cita_id,))
-    row = cur.fetchone()
+    cita = await llamar_fn(user["role"], "fn_eliminar_cita", cita_id)
 
-    conn.commit()
-    conn.close()
-
-    # Manejo de ambos casos:
-    # 1) No hay fila
-    # 2) Hay fila pero la función retornó NULL
-    if not row or not row["fn_eliminar_cita"]:
+    # Si la función retornó NULL
+    if not cita:
         raise HTTPException(
             status_code=404,
             detail=f"La cita con ID {cita_id} no existe o ya fue eliminada."
         )
 
-    return row["fn_eliminar_cita"]
+    return cita
 
-@router.get("/listar-citas-veterinario", response_model=list)
-def listar_citas_veterinario(user=Depends(get_current_user)):
+@router.get("/listar-citas-veterinario")
+async def listar_citas_veterinario(pag: Paginacion = Depends(), user=Depends(get_current_user)):
     if user["role"] != "veterinario":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_listar_citas_por_veterinario(%s)", (user["id"],))
-    row = cur.fetchone()
-    conn.close()
+    if pag.activa:
+        fecha, hora, cita_id = pag.fecha_hora_id()
+        citas = await llamar_fn(
+            user["role"], "fn_listar_citas_por_veterinario_pagina",
+            user["id"], fecha, hora, cita_id, pag.limite + 1
+        )
+        return RespuestaORJSON(pagina(citas, pag.limite, ("fecha", "hora", "id")))
 
-    citas = row["fn_listar_citas_por_veterinario"] if row else None
-    return citas or []
+    # Listado completo: directo a orjson, sin jsonable_encoder sobre cada fila
+    citas = await llamar_fn(user["role"], "fn_listar_citas_por_veterinario", user["id"])
+    return RespuestaORJSON(citas or [])
 
-@router.put("/actualizar-estado/{cita_id}", response_model=dict)
-def actualizar_estado(cita_id: int, data: dict, user=Depends(get_current_user)):
+@router.put("/actualizar-estado/{cita_id}")
+async def actualizar_estado(cita_id: int, data: dict, user=Depends(get_current_user)):
 
     if user["role"] != "veterinario":
         raise HTTPException(403, "No autorizado")
@@ -214,22 +220,50 @@ def actualizar_estado(cita_id: int, data: dict, user=Depends(get_current_user)):
     if not estado:
         raise HTTPException(400, "El estado es requerido")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_actualizar_estado_cita(%s, %s)",
-        (cita_id, estado)
-    )
-
-    row = cur.fetchone()
-    conn.commit()
-    conn.close()
+    # Reactivar una cita cancelada puede chocar con otra ya agendada
+    try:
+        cita = await llamar_fn(user["role"], "fn_actualizar_estado_cita", cita_id, estado)
+    except ErrorBD as e:
+        _error_cita(e)
 
-    if not row or not row["fn_actualizar_estado_cita"]:
+    if not cita:
         raise HTTPException(
             status_code=404,
             detail=f"No se pudo actualizar el estado de la cita {cita_id}."
         )
 
-    return row["fn_actualizar_estado_cita"]
+    return cita
+
+
+
+# ------------------------------
+#   DISPONIBILIDAD (admin / secretaria)
+# ------------------------------
+DISPONIBILIDAD_MAX_DIAS = 31
+
+
+@router.get("/disponibilidad", response_model=list[DisponibilidadResponse])
+async def disponibilidad(
+    desde: date,
+    hasta: date,
+    veterinario_id: Optional[int] = None,
+    duracion: int = Query(30, ge=1, le=480),
+    user=Depends(get_current_user)
+):
+
+    if user["role"] not in ("administrador", "secretaria"):
+        raise HTTPException(403, "No autorizado")
+
+    if hasta < desde:
+        raise HTTPException(400, "La fecha 'hasta' debe ser igual o posterior a 'desde'")
+
+    if (hasta - desde).days >= DISPONIBILIDAD_MAX_DIAS:
+        raise HTTPException(400, f"El rango máximo es de {DISPONIBILIDAD_MAX_DIAS} días")
+
+    # [desde 00:00, hasta + 1 día 00:00)
+    inicio = datetime.combine(desde, time.min)
+    fin = datetime.combine(hasta + timedelta(days=1), time.min)
+
+    agenda = await llamar_fn(user["role"], "fn_agenda_veterinarios", inicio, fin, veterinario_id)
+
+    return calcular_disponibilidad(agenda, inicio, fin, duracion)
@@ -1,150 +1,179 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.auth import get_current_user
-from app.database import get_connection
-from psycopg2.extras import RealDictCursor
-from app.models.clientes import ClienteCreate, ClienteUpdate
+from app.database import llamar_fn, llamar_fn_texto, transaccion
+from app.models.clientes import ClienteCreate, ClienteUpdate, FichaClienteResponse
+from app.models.consultas import HistorialPagina
+from app.paginacion import LIMITE_MAXIMO, Paginacion, pagina
+from app.lista_ids import ListaIds, por_id
+from app.json_crudo import RespuestaJSON, vacio
+from app.respuestas import RespuestaORJSON
 
 router = APIRouter(prefix="/clientes", tags=["Clientes"])
 
+# Roles que pueden crear; /api/batch usa los mismos (app/routers/batch.py)
+ROLES_CREAR_CLIENTE = ("veterinario",)
 
-@router.post("/crear-cliente", response_model=dict)
-def crear_cliente(data: ClienteCreate, user=Depends(get_current_user)):
+# Consultas por mascota en la primera página de la ficha
+HISTORIAL_POR_DEFECTO = 10
 
-    if user["role"] != "veterinario":
-        raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+@router.post("/crear-cliente")
+async def crear_cliente(data: ClienteCreate, user=Depends(get_current_user)):
 
-    # OPCIONAL: verificar si el cliente ya existe por nombre + telefono
-    cur.execute("""
-        SELECT id FROM clientes 
-        WHERE nombre = %s AND telefono = %s
-    """, (data.nombre, data.telefono))
+    if user["role"] not in ROLES_CREAR_CLIENTE:
+        raise HTTPException(403, "No autorizado")
 
-    existe = cur.fetchone()
-    
-    if existe:
-        conn.close()
-        raise HTTPException(
-            status_code=400,
-            detail="El cliente ya existe."
-        )
+    async with transaccion(user["role"]) as tx:
 
-    # Crear cliente
-    cur.execute(
-        "SELECT fn_crear_cliente(%s, %s, %s)",
-        (data.nombre, data.telefono, data.direccion)
-    )
+        # OPCIONAL: verificar si el cliente ya existe por nombre + telefono
+        existe = await tx.fila("""
+            SELECT id FROM clientes
+            WHERE nombre = %s AND telefono = %s
+        """, data.nombre, data.telefono)
 
-    row = cur.fetchone()
-    conn.commit()
-    conn.close()
+        if existe:
+            raise HTTPException(
+                status_code=400,
+                detail="El cliente ya existe."
+            )
 
-    # Manejo de errores: resultado vacío o función retornó NULL
-    if not row or not row["fn_crear_cliente"]:
+        # Crear cliente
+        cliente = await tx.llamar_fn("fn_crear_cliente", data.nombre, data.telefono, data.direccion)
+
+    # Manejo de errores: la función retornó NULL
+    if not cliente:
         raise HTTPException(
             status_code=500,
             detail="No se pudo crear el cliente. Intenta nuevamente."
         )
 
-    return row["fn_crear_cliente"]
-
+    return cliente
 
-@router.get("/obtener-cliente/{cliente_id}", response_model=dict)
-def obtener_cliente(cliente_id: int, user=Depends(get_current_user)):
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+@router.get("/obtener-cliente/{cliente_id}")
+async def obtener_cliente(cliente_id: int, user=Depends(get_current_user)):
 
-    cur.execute("SELECT fn_obtener_cliente(%s)", (cliente_id,))
-    row = cur.fetchone()
-    conn.close()
+    cliente = await llamar_fn(user["role"], "fn_obtener_cliente", cliente_id)
 
-    # Manejo de ambos errores:
-    # 1) No llegó fila
-    # 2) La función retornó NULL
-    if not row or not row["fn_obtener_cliente"]:
+    # La función retornó NULL
+    if not cliente:
         raise HTTPException(
             status_code=404,
             detail=f"El cliente con ID {cliente_id} no existe."
         )
 
-    return row["fn_obtener_cliente"]
+    return cliente
+
+
+@router.get("/obtener-clientes")
+async def obtener_clientes(lista: ListaIds = Depends(), user=Depends(get_current_user)):
 
+    # ?ids=1,2,3 → una sola consulta; los ids que no existen van en "faltantes"
+    clientes = await llamar_fn(user["role"], "fn_obtener_clientes", lista.ids)
 
-@router.get("/listar-clientes", response_model=list)
-def listar_clientes(user=Depends(get_current_user)):
+    return por_id(clientes, lista.ids)
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    cur.execute("SELECT fn_listar_clientes()")
-    row = cur.fetchone()
-    conn.close()
+@router.get("/listar-clientes")
+async def listar_clientes(pag: Paginacion = Depends(), user=Depends(get_current_user)):
 
-    clientes = row["fn_listar_clientes"] if row else None
+    # Paginado: ?limit=&cursor= → { data, next_cursor }
+    if pag.activa:
+        clientes = await llamar_fn(user["role"], "fn_listar_clientes_pagina", pag.id(), pag.limite + 1)
+        return RespuestaORJSON(pagina(clientes, pag.limite))
+
+    # Listado completo como texto: se escribe en el body sin parsearlo
+    clientes = await llamar_fn_texto(user["role"], "fn_listar_clientes")
 
     # Si no hay clientes → devolvemos mensaje dentro de una lista
-    if not clientes:
+    if vacio(clientes):
         return [{"message": "Aún no hay clientes registrados"}]
 
-    return clientes
+    return RespuestaJSON(clientes)
 
 
 
-@router.put("/actualizar-cliente/{cliente_id}", response_model=dict)
-def actualizar_cliente(cliente_id: int, data: ClienteUpdate, user=Depends(get_current_user)):
+@router.put("/actualizar-cliente/{cliente_id}")
+async def actualizar_cliente(cliente_id: int, data: ClienteUpdate, user=Depends(get_current_user)):
 
     if user["role"] not in ["veterinario", "administrador"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_actualizar_cliente(%s, %s, %s, %s)",
-        (cliente_id, data.nombre, data.telefono, data.direccion)
+    cliente = await llamar_fn(
+        user["role"], "fn_actualizar_cliente",
+        cliente_id, data.nombre, data.telefono, data.direccion
     )
 
-    row = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    # Manejo correcto de ambos casos:
-    # 1) No llegó fila
-    # 2) La función retornó NULL
-    if not row or not row["fn_actualizar_cliente"]:
+    # La función retornó NULL
+    if not cliente:
         raise HTTPException(
             status_code=404,
             detail=f"El cliente con ID {cliente_id} no existe o no pudo actualizarse."
         )
 
-    return row["fn_actualizar_cliente"]
+    return cliente
 
 
 
-@router.delete("/eliminar-cliente/{cliente_id}", response_model=dict)
-def eliminar_cliente(cliente_id: int, user=Depends(get_current_user)):
+@router.delete("/eliminar-cliente/{cliente_id}")
+async def eliminar_cliente(cliente_id: int, user=Depends(get_current_user)):
 
     if user["role"] not in ["veterinario", "administrador"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_eliminar_cliente(%s)", (cliente_id,))
-    row = cur.fetchone()
-    conn.commit()
-    conn.close()
+    cliente = await llamar_fn(user["role"], "fn_eliminar_cliente", cliente_id)
 
-    # Manejo de ambos casos:
-    # 1) La función no retorno fila
-    # 2) La función retornó NULL
-    if not row or not row["fn_eliminar_cliente"]:
+    # La función retornó NULL
+    if not cliente:
         raise HTTPException(
             status_code=404,
             detail=f"El cliente con ID {cliente_id} no existe o ya fue eliminado."
         )
 
-    return row["fn_eliminar_cliente"]
+    return cliente
+
+
+
+@router.get("/{cliente_id}/ficha", response_model=FichaClienteResponse)
+async def ficha_cliente(
+    cliente_id: int,
+    limit: int = Query(HISTORIAL_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+    user=Depends(get_current_user)
+):
+
+    if user["role"] not in ["administrador", "veterinario", "secretaria"]:
+        raise HTTPException(403, "No autorizado")
+
+    # Cliente + mascotas + primera página del historial de cada una en una sola llamada
+    ficha = await llamar_fn(user["role"], "fn_obtener_ficha_cliente", cliente_id, limit + 1)
+
+    if not ficha:
+        raise HTTPException(
+            status_code=404,
+            detail=f"El cliente con ID {cliente_id} no existe."
+        )
+
+    for mascota in ficha["mascotas"]:
+        mascota["historial"] = pagina(mascota["historial"], limit, campos=("created_at", "id"))
+
+    return ficha
+
+
+
+@router.get("/{cliente_id}/ficha/mascotas/{mascota_id}/historial", response_model=HistorialPagina)
+async def historial_mascota(
+    cliente_id: int, mascota_id: int,
+    pag: Paginacion = Depends(), user=Depends(get_current_user)
+):
+
+    if user["role"] not in ["administrador", "veterinario", "secretaria"]:
+        raise HTTPException(403, "No autorizado")
+
+    # Siguiente página con el next_cursor que vino en la ficha
+    created_at, ultimo_id = pag.created_at_id()
+    historial = await llamar_fn(
+        user["role"], "fn_historial_mascota_pagina",
+        cliente_id, mascota_id, created_at, ultimo_id, pag.limite + 1
+    )
+
+    return pagina(historial, pag.limite, campos=("created_at", "id"))
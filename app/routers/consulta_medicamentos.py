@@ -1,40 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.auth import get_current_user
-from app.database import get_connection
-from psycopg2.extras import RealDictCursor
-from app.models.consulta_medicamentos import ConsultaMedicamentoUpdate, ConsultaMedicamentoCreate, ConsultaMedicamentoResponse
+from app.database import llamar_fn
+from app.models.consulta_medicamentos import ConsultaMedicamentoUpdate, ConsultaMedicamentoCreate, ConsultaMedicamentoResponse, ConsultaMedicamentosLote
 
 router = APIRouter(prefix="/consulta-medicamentos", tags=["Consulta Medicamentos"])
 
+# Roles que pueden recetar; /api/batch usa los mismos (app/routers/batch.py)
+ROLES_AGREGAR_MEDICAMENTO = ("veterinario",)
 
-@router.post("/agregar", response_model=dict)
-def agregar_medicamento(data: ConsultaMedicamentoCreate, user=Depends(get_current_user)):
 
-    if user["role"] not in ["veterinario"]:
-        raise HTTPException(403, "No autorizado")
-
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    try:
-        cur.execute(
-            "SELECT fn_agregar_medicamento_consulta(%s, %s, %s)",
-            (data.consulta_id, data.medicamento_id, data.cantidad)
-        )
-        result = cur.fetchone()
-        conn.commit()
+@router.post("/agregar")
+async def agregar_medicamento(data: ConsultaMedicamentoCreate, user=Depends(get_current_user)):
 
-    except Exception as e:
-        conn.rollback()
-        raise HTTPException(500, f"Error SQL: {e}")
-
-    finally:
-        conn.close()
-
-    if not result:
-        raise HTTPException(500, "Error inesperado: función sin retorno")
+    if user["role"] not in ROLES_AGREGAR_MEDICAMENTO:
+        raise HTTPException(403, "No autorizado")
 
-    respuesta = result.get("fn_agregar_medicamento_consulta")
+    # Un ErrorBD sigue al handler global (app/main.py): 409/422, sin el mensaje de PostgreSQL
+    respuesta = await llamar_fn(
+        user["role"], "fn_agregar_medicamento_consulta",
+        data.consulta_id, data.medicamento_id, data.cantidad
+    )
 
     if not respuesta:
         raise HTTPException(500, "La función SQL no retornó datos")
@@ -51,27 +36,58 @@ def agregar_medicamento(data: ConsultaMedicamentoCreate, user=Depends(get_curren
 
 
 
-@router.get("/listar/{consulta_id}", response_model=list)
-def listar_medicamentos_consulta(consulta_id: int, user=Depends(get_current_user)):
+LOTE_MAX_LINEAS = 100
 
-    if user["role"] not in ["administrador", "veterinario", "secretaria"]:
+
+@router.post("/agregar-lote")
+async def agregar_medicamentos_lote(data: ConsultaMedicamentosLote, user=Depends(get_current_user)):
+
+    if user["role"] not in ROLES_AGREGAR_MEDICAMENTO:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    if not data.medicamentos:
+        raise HTTPException(400, "Debe enviar al menos un medicamento")
+
+    if len(data.medicamentos) > LOTE_MAX_LINEAS:
+        raise HTTPException(400, f"Máximo {LOTE_MAX_LINEAS} medicamentos por receta")
+
+    ids = [linea.medicamento_id for linea in data.medicamentos]
+    cantidades = [linea.cantidad for linea in data.medicamentos]
+
+    if len(set(ids)) != len(ids):
+        raise HTTPException(400, "Hay medicamentos repetidos en la receta")
 
-    cur.execute(
-        "SELECT fn_listar_medicamentos_consulta(%s)",
-        (consulta_id,)
+    if any(cantidad <= 0 for cantidad in cantidades):
+        raise HTTPException(400, "Las cantidades deben ser mayores a cero")
+
+    # Una sola llamada: valida, inserta todas las líneas y devuelve el total.
+    # Un ErrorBD sigue al handler global (app/main.py)
+    respuesta = await llamar_fn(
+        user["role"], "fn_agregar_medicamentos_consulta",
+        data.consulta_id, ids, cantidades
     )
 
-    result = cur.fetchone()
-    conn.close()
+    if not respuesta:
+        raise HTTPException(500, "La función SQL no retornó datos")
+
+    if respuesta.get("status") == "error":
+        raise HTTPException(
+            status_code=400,
+            detail=respuesta.get("message", "Error al agregar medicamentos")
+        )
+
+    return respuesta
 
-    if not result:
-        return []  # ← devolver lista vacía
 
-    respuesta = result.get("fn_listar_medicamentos_consulta")
+
+
+@router.get("/listar/{consulta_id}")
+async def listar_medicamentos_consulta(consulta_id: int, user=Depends(get_current_user)):
+
+    if user["role"] not in ["administrador", "veterinario", "secretaria"]:
+        raise HTTPException(403, "No autorizado")
+
+    respuesta = await llamar_fn(user["role"], "fn_listar_medicamentos_consulta", consulta_id)
 
     # Si no hay medicamentos → lista vacía, NO error
     if respuesta is None:
@@ -84,29 +100,20 @@ def listar_medicamentos_consulta(consulta_id: int, user=Depends(get_current_user
 
 
 
-@router.put("/actualizar", response_model=dict)
-def actualizar_medicamento(data: ConsultaMedicamentoCreate, user=Depends(get_current_user)):
+@router.put("/actualizar")
+async def actualizar_medicamento(data: ConsultaMedicamentoCreate, user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "veterinario"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_actualizar_medicamento_consulta(%s, %s, %s)",
-        (data.consulta_id, data.medicamento_id, data.cantidad)
+    respuesta = await llamar_fn(
+        user["role"], "fn_actualizar_medicamento_consulta",
+        data.consulta_id, data.medicamento_id, data.cantidad
     )
 
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    if not result:
+    if respuesta is None:
         raise HTTPException(500, "No se pudo actualizar el medicamento")
 
-    respuesta = result.get("fn_actualizar_medicamento_consulta")
-
     if isinstance(respuesta, dict) and respuesta.get("status") == "error":
         raise HTTPException(400, respuesta.get("message", "Error al actualizar"))
 
@@ -114,30 +121,21 @@ def actualizar_medicamento(data: ConsultaMedicamentoCreate, user=Depends(get_cur
 
 
 
-@router.delete("/eliminar/{consulta_id}/{medicamento_id}", response_model=dict)
-def eliminar_medicamento(consulta_id: int,medicamento_id: int,
+@router.delete("/eliminar/{consulta_id}/{medicamento_id}")
+async def eliminar_medicamento(consulta_id: int,medicamento_id: int,
     user=Depends(get_current_user)):
 
     if user["role"] not in ["veterinario"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_eliminar_medicamento_consulta(%s, %s)",
-        (consulta_id, medicamento_id)
+    respuesta = await llamar_fn(
+        user["role"], "fn_eliminar_medicamento_consulta",
+        consulta_id, medicamento_id
     )
 
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    if not result:
+    if respuesta is None:
         raise HTTPException(404, "No se pudo eliminar, no existe registro")
 
-    respuesta = result.get("fn_eliminar_medicamento_consulta")
-
     if isinstance(respuesta, dict) and respuesta.get("status") == "error":
         raise HTTPException(400, respuesta.get("message", "Error al eliminar"))
 
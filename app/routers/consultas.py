@@ -1,138 +1,140 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.auth import get_current_user
-from app.database import get_connection
-from psycopg2.extras import RealDictCursor
-from app.models.consultas import ConsultaCreate, ConsultaUpdate
+from app.database import ErrorBD, llamar_fn, llamar_fn_texto
+from app.models.consultas import ConsultaCreate, ConsultaUpdate, ConsultaDetalleResponse
+from app.exportacion import pide_ndjson, respuesta_ndjson
+from app.paginacion import Paginacion, pagina
+from app.json_crudo import RespuestaJSON, vacio
+from app.respuestas import RespuestaORJSON
 
 router = APIRouter(prefix="/consultas", tags=["Consultas"])
 
+# Roles que pueden crear; /api/batch usa los mismos (app/routers/batch.py)
+ROLES_CREAR_CONSULTA = ("administrador", "veterinario")
 
-@router.post("/crear-consulta", response_model=dict)
-def crear_consulta(data: ConsultaCreate, user=Depends(get_current_user)):
 
-    if user["role"] not in ("administrador", "veterinario"):
-        raise HTTPException(403, "No autorizado")
-
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    # Validación opcional: una consulta por mascota en el día
-    cur.execute("""
-        SELECT id FROM consultas 
-        WHERE mascota_id = %s 
-        AND DATE(created_at) = CURRENT_DATE
-    """, (data.mascota_id,))
-
-    existe = cur.fetchone()
-
-    if existe:
-        conn.close()
+def _error_consulta(e: ErrorBD):
+    # 23505: unique_violation
+    if e.sqlstate == "23505" and e.restriccion == "uq_consultas_mascota_dia":
         raise HTTPException(
             status_code=400,
             detail="Ya existe una consulta registrada hoy para esta mascota."
         )
+    if e.sqlstate == "23505" and e.restriccion == "consultas_cita_id_key":
+        raise HTTPException(400, "Esta cita ya tiene una consulta registrada.")
+    raise e
+
 
-    # Crear consulta (ahora incluyendo cita_id)
-    cur.execute(
-    "SELECT fn_crear_consulta(%s, %s, %s, %s, %s, %s)",
-    (
-        data.cita_id,
-        data.cliente_id,
-        data.mascota_id,
-        data.veterinario_id,
-        data.diagnostico,
-        data.total
-    )
-)
-
-    row = cur.fetchone()
-    conn.commit()
-    conn.close()
+@router.post("/crear-consulta")
+async def crear_consulta(data: ConsultaCreate, user=Depends(get_current_user)):
+
+    if user["role"] not in ROLES_CREAR_CONSULTA:
+        raise HTTPException(403, "No autorizado")
+
+    # Un solo INSERT: el índice único uq_consultas_mascota_dia rechaza
+    # una segunda consulta de la misma mascota en el día
+    try:
+        consulta = await llamar_fn(
+            user["role"], "fn_crear_consulta",
+            data.cita_id,
+            data.cliente_id,
+            data.mascota_id,
+            data.veterinario_id,
+            data.diagnostico,
+            data.total
+        )
+    except ErrorBD as e:
+        _error_consulta(e)
 
     # Validar retorno
-    if not row or not row["fn_crear_consulta"]:
+    if not consulta:
         raise HTTPException(
             status_code=500,
             detail="No se pudo crear la consulta debido a un error interno."
         )
 
-    return row["fn_crear_consulta"]
+    return consulta
+
 
 
+@router.get("/obtener-consulta/{consulta_id}")
+async def obtener_consulta(consulta_id: int, user=Depends(get_current_user)):
 
-@router.get("/obtener-consulta/{consulta_id}", response_model=dict)
-def obtener_consulta(consulta_id: int, user=Depends(get_current_user)):
+    consulta = await llamar_fn(user["role"], "fn_obtener_consulta", consulta_id)
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    # La función retornó NULL
+    if not consulta:
+        raise HTTPException(
+            status_code=404,
+            detail=f"La consulta con ID {consulta_id} no existe."
+        )
 
-    cur.execute("SELECT fn_obtener_consulta(%s)", (consulta_id,))
-    row = cur.fetchone()
-    conn.close()
+    return consulta
 
-    # Manejo de ambos casos:
-    # 1) No llegó fila
-    # 2) La función retornó NULL
-    if not row or not row["fn_obtener_consulta"]:
+
+
+@router.get("/detalle-consulta/{consulta_id}", response_model=ConsultaDetalleResponse)
+async def detalle_consulta(consulta_id: int, user=Depends(get_current_user)):
+
+    if user["role"] not in ["administrador", "veterinario", "secretaria"]:
+        raise HTTPException(403, "No autorizado")
+
+    # Consulta + cita + mascota + cliente + medicamentos + factura en una sola llamada
+    detalle = await llamar_fn(user["role"], "fn_obtener_consulta_detalle", consulta_id)
+
+    if not detalle:
         raise HTTPException(
             status_code=404,
             detail=f"La consulta con ID {consulta_id} no existe."
         )
 
-    return row["fn_obtener_consulta"]
+    return detalle
 
 
 
-@router.get("/listar-consultas", response_model=list)
-def listar_consultas(user=Depends(get_current_user)):
+@router.get("/listar-consultas")
+async def listar_consultas(request: Request, pag: Paginacion = Depends(), user=Depends(get_current_user)):
+
+    # Exportación completa en flujo: Accept: application/x-ndjson
+    if pide_ndjson(request):
+        return await respuesta_ndjson(
+            user["role"],
+            "SELECT row_to_json(c)::text FROM consultas c ORDER BY c.id"
+        )
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor()
-    cur.execute("SELECT fn_listar_consultas()")
-    row = cur.fetchone()
-    conn.close()
+    # Paginado: ?limit=&cursor= → { data, next_cursor }
+    if pag.activa:
+        consultas = await llamar_fn(user["role"], "fn_listar_consultas_pagina", pag.id(), pag.limite + 1)
+        return RespuestaORJSON(pagina(consultas, pag.limite))
 
-    raw = row[0] if row else None
+    # El JSON de PostgreSQL como texto, directo al body (sin json.loads ni re-serializar)
+    raw = await llamar_fn_texto(user["role"], "fn_listar_consultas")
 
-    if not raw:
+    if vacio(raw):
         return [{"message": "Aún no hay consultas registradas"}]
 
-    # 🔥 Convertir string JSON a lista Python
-    import json
-    try:
-        return json.loads(raw)
-    except:
-        # Si ya viene como json_agg real
-        return raw
+    return RespuestaJSON(raw)
 
 
 
-@router.put("/actualizar-consulta/{consulta_id}", response_model=dict)
-def actualizar_consulta(consulta_id: int, data: ConsultaUpdate, user=Depends(get_current_user)):
+@router.put("/actualizar-consulta/{consulta_id}")
+async def actualizar_consulta(consulta_id: int, data: ConsultaUpdate, user=Depends(get_current_user)):
 
     if user["role"] not in ("administrador", "veterinario"):
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_actualizar_consulta(%s, %s, %s, %s, %s)",
-        (
-            consulta_id,data.cliente_id,data.mascota_id,data.diagnostico,data.total        
+    try:
+        respuesta = await llamar_fn(
+            user["role"], "fn_actualizar_consulta",
+            consulta_id, data.cliente_id, data.mascota_id, data.diagnostico, data.total
         )
-    )
-
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
+    except ErrorBD as e:
+        _error_consulta(e)
 
     #  Si no retorna nada → no existe
-    if not result:
+    if respuesta is None:
         raise HTTPException(404, "Consulta no encontrada")
 
-    respuesta = result["fn_actualizar_consulta"]
-
     #  Si la función devuelve un error interno
     if isinstance(respuesta, dict) and respuesta.get("status") == "error":
         raise HTTPException(
@@ -143,27 +145,18 @@ def actualizar_consulta(consulta_id: int, data: ConsultaUpdate, user=Depends(get
     return respuesta
 
 
-@router.delete("/eliminar-consulta/{consulta_id}", response_model=dict)
-def eliminar_consulta(consulta_id: int, user=Depends(get_current_user)):
+@router.delete("/eliminar-consulta/{consulta_id}")
+async def eliminar_consulta(consulta_id: int, user=Depends(get_current_user)):
 
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_eliminar_consulta(%s)", (consulta_id,))
-    result = cur.fetchone()
-
-    conn.commit()
-    conn.close()
+    respuesta = await llamar_fn(user["role"], "fn_eliminar_consulta", consulta_id)
 
     #  No regresó nada → No existe
-    if not result:
+    if respuesta is None:
         raise HTTPException(404, "Consulta no encontrada")
 
-    respuesta = result["fn_eliminar_consulta"]
-
     #  Si la función devuelve un error tipo:
     # { "status": "error", "message": "No existe la consulta" }
     if isinstance(respuesta, dict) and respuesta.get("status") == "error":
@@ -1,39 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.auth import get_current_user
-from app.database import get_connection
-from psycopg2.extras import RealDictCursor
+from app.database import llamar_fn, llamar_fn_texto
 from app.models.facturas import FacturaCreate, FacturaUpdate, FacturaResponse
+from app.exportacion import pide_ndjson, respuesta_ndjson
+from app.paginacion import Paginacion, pagina
+from app.json_crudo import RespuestaJSON, error_json, vacio
+from app.respuestas import RespuestaORJSON
 
 router = APIRouter(prefix="/facturas", tags=["Facturas"])
 
+# Roles que pueden crear; /api/batch usa los mismos (app/routers/batch.py)
+ROLES_CREAR_FACTURA = ("administrador", "secretaria")
+
 
 # -----------------------------
 #   CREAR FACTURA
 # -----------------------------
-@router.post("/crear-factura", response_model=dict)
-def crear_factura(data: FacturaCreate, user=Depends(get_current_user)):
+@router.post("/crear-factura")
+async def crear_factura(data: FacturaCreate, user=Depends(get_current_user)):
 
-    if user["role"] not in ["administrador", "secretaria"]:
+    if user["role"] not in ROLES_CREAR_FACTURA:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_crear_factura(%s, %s)",
-        (data.consulta_id, data.total)
-    )
-
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
+    respuesta = await llamar_fn(user["role"], "fn_crear_factura", data.consulta_id, data.total)
 
     # Si la función no retornó nada → error interno
-    if not result:
+    if respuesta is None:
         raise HTTPException(500, "fn_crear_factura no retornó datos")
 
-    respuesta = result["fn_crear_factura"]
-
     # Si la función devuelve algo como:
     # { "status": "error", "message": "El cliente no existe" }
     if isinstance(respuesta, dict) and respuesta.get("status") == "error":
@@ -44,22 +38,15 @@ def crear_factura(data: FacturaCreate, user=Depends(get_current_user)):
 # -----------------------------
 #   OBTENER FACTURA POR ID
 # -----------------------------
-@router.get("/obtener-factura/{factura_id}", response_model=dict)
-def obtener_factura(factura_id: int, user=Depends(get_current_user)):
-
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+@router.get("/obtener-factura/{factura_id}")
+async def obtener_factura(factura_id: int, user=Depends(get_current_user)):
 
-    cur.execute("SELECT fn_obtener_factura(%s)", (factura_id,))
-    result = cur.fetchone()
-    conn.close()
+    factura = await llamar_fn(user["role"], "fn_obtener_factura", factura_id)
 
     # Si no existe ninguna respuesta desde PostgreSQL
-    if not result:
+    if factura is None:
         raise HTTPException(404, "Factura no encontrada")
 
-    factura = result["fn_obtener_factura"]
-
     # Si la función devuelve un error desde PostgreSQL:
     # { "status": "error", "message": "Factura no existe" }
     if isinstance(factura, dict) and factura.get("status") == "error":
@@ -72,64 +59,59 @@ def obtener_factura(factura_id: int, user=Depends(get_current_user)):
 # -----------------------------
 #   LISTAR TODAS LAS FACTURAS
 # -----------------------------
-@router.get("/listar-facturas", response_model=list)
-def listar_facturas(user=Depends(get_current_user)):
+@router.get("/listar-facturas")
+async def listar_facturas(request: Request, pag: Paginacion = Depends(), user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    # Exportación completa en flujo: Accept: application/x-ndjson
+    if pide_ndjson(request):
+        return await respuesta_ndjson(
+            user["role"],
+            "SELECT row_to_json(f)::text FROM facturas f ORDER BY f.id"
+        )
 
-    cur.execute("SELECT fn_listar_facturas()")
-    result = cur.fetchone()
-    conn.close()
+    # Paginado: ?limit=&cursor= → { data, next_cursor }
+    if pag.activa:
+        facturas = await llamar_fn(user["role"], "fn_listar_facturas_pagina", pag.id(), pag.limite + 1)
+        return RespuestaORJSON(pagina(facturas, pag.limite))
+
+    # Listado completo como texto: se escribe en el body sin parsearlo
+    facturas = await llamar_fn_texto(user["role"], "fn_listar_facturas")
 
     # Si PostgreSQL no devolvió nada
-    if not result:
+    if facturas is None:
         raise HTTPException(404, "No se encontraron facturas")
 
-    facturas = result["fn_listar_facturas"]
-
     # Si la función devuelve un error estructurado
-    if isinstance(facturas, dict) and facturas.get("status") == "error":
-        raise HTTPException(400, facturas.get("message", "Error al listar facturas"))
+    error = error_json(facturas)
+    if error:
+        raise HTTPException(400, error.get("message", "Error al listar facturas"))
 
     # Si la lista está vacía → enviar mensaje amigable al frontend
-    if isinstance(facturas, list) and len(facturas) == 0:
+    if vacio(facturas):
         raise HTTPException(404, "Aún no existen facturas registradas")
 
-    return facturas
+    return RespuestaJSON(facturas)
 
 
 
 # -----------------------------
 #   ACTUALIZAR FACTURA
 # -----------------------------
-@router.put("/actualizar-factura/{factura_id}", response_model=dict)
-def actualizar_factura(factura_id: int, data: FacturaUpdate, user=Depends(get_current_user)):
+@router.put("/actualizar-factura/{factura_id}")
+async def actualizar_factura(factura_id: int, data: FacturaUpdate, user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_actualizar_factura(%s, %s)",
-        (factura_id, data.total)
-    )
-
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
+    factura = await llamar_fn(user["role"], "fn_actualizar_factura", factura_id, data.total)
 
     # Si PostgreSQL no devolvió nada
-    if not result:
+    if factura is None:
         raise HTTPException(404, "Factura no encontrada")
 
-    factura = result["fn_actualizar_factura"]
-
     # Si la función maneja errores internos
     # Por ejemplo:
     # RETURN json_build_object('status', 'error', 'message', 'Factura no existe');
@@ -142,26 +124,18 @@ def actualizar_factura(factura_id: int, data: FacturaUpdate, user=Depends(get_cu
 # -----------------------------
 #   ELIMINAR FACTURA
 # -----------------------------
-@router.delete("/eliminar-factura/{factura_id}", response_model=dict)
-def eliminar_factura(factura_id: int, user=Depends(get_current_user)):
+@router.delete("/eliminar-factura/{factura_id}")
+async def eliminar_factura(factura_id: int, user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_eliminar_factura(%s)", (factura_id,))
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
+    factura = await llamar_fn(user["role"], "fn_eliminar_factura", factura_id)
 
     # Si PostgreSQL no regresó ninguna fila
-    if not result:
+    if factura is None:
         raise HTTPException(404, "Factura no encontrada")
 
-    factura = result["fn_eliminar_factura"]
-
     # Validar si la función retorna un JSON de error interno
     # Ejemplo desde PostgreSQL:
     # RETURN json_build_object('status', 'error', 'message', 'Factura no existe');
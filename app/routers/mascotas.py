@@ -1,35 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from app.auth import get_current_user
-from app.database import get_connection
-from psycopg2.extras import RealDictCursor
+from app.database import llamar_fn, llamar_fn_texto, llamar_fn_versionada
 from app.models.mascotas import MascotaCreate, MascotaUpdate, MascotaResponse
+from app.etag import version_conocida, etag_version, no_modificado, cabeceras_etag, respuesta_304
+from app.paginacion import Paginacion, pagina
+from app.lista_ids import ListaIds, por_id
+from app.json_crudo import RespuestaJSON, envolver, error_json, vacio
+from app.respuestas import RespuestaORJSON
 
 router = APIRouter(prefix="/mascotas", tags=["Mascotas"])
 
-@router.post("/crear-mascota", response_model=dict)
-def crear_mascota(data: MascotaCreate, user=Depends(get_current_user)):
+# Roles que pueden crear; /api/batch usa los mismos (app/routers/batch.py)
+ROLES_CREAR_MASCOTA = ("veterinario", "administrador")
 
-    if user["role"] not in ["veterinario", "administrador"]:
-        raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+@router.post("/crear-mascota")
+async def crear_mascota(data: MascotaCreate, user=Depends(get_current_user)):
 
-    cur.execute(
-        "SELECT fn_crear_mascota(%s, %s, %s, %s, %s)",
-        (data.cliente_id, data.raza_id, data.nombre, data.edad, data.peso)
-    )
+    if user["role"] not in ROLES_CREAR_MASCOTA:
+        raise HTTPException(403, "No autorizado")
 
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
+    mascota = await llamar_fn(
+        user["role"], "fn_crear_mascota",
+        data.cliente_id, data.raza_id, data.nombre, data.edad, data.peso
+    )
 
     # Si no devuelve nada
-    if not result:
+    if mascota is None:
         raise HTTPException(500, "No se pudo crear la mascota")
 
-    mascota = result.get("fn_crear_mascota")
-
     # Si la función retorna un error personalizado
     # Ejemplo PostgreSQL:
     # RETURN json_build_object('status','error','message','La raza no existe');
@@ -39,25 +38,18 @@ def crear_mascota(data: MascotaCreate, user=Depends(get_current_user)):
     return mascota
 
 
-@router.get("/obtener-mascota/{mascota_id}", response_model=dict)
-def obtener_mascota(mascota_id: int, user=Depends(get_current_user)):
+@router.get("/obtener-mascota/{mascota_id}")
+async def obtener_mascota(mascota_id: int, user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "veterinario", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    mascota = await llamar_fn(user["role"], "fn_obtener_mascota", mascota_id)
 
-    cur.execute("SELECT fn_obtener_mascota(%s)", (mascota_id,))
-    result = cur.fetchone()
-    conn.close()
-
-    # Si no regresó ninguna fila
-    if not result:
+    # Si no regresó nada
+    if mascota is None:
         raise HTTPException(404, "Mascota no encontrada")
 
-    mascota = result.get("fn_obtener_mascota")
-
     # Si tu función retorna algo como:
     # RETURN json_build_object('status','error','message','Mascota no existe')
     if isinstance(mascota, dict) and mascota.get("status") == "error":
@@ -67,68 +59,79 @@ def obtener_mascota(mascota_id: int, user=Depends(get_current_user)):
 
 
 
-@router.get("/listar-mascotas", response_model=dict)
-def listar_mascotas(user=Depends(get_current_user)):
+@router.get("/obtener-mascotas")
+async def obtener_mascotas(lista: ListaIds = Depends(), user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "veterinario", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    # ?ids=1,2,3 → una sola consulta; los ids que no existen van en "faltantes"
+    mascotas = await llamar_fn(user["role"], "fn_obtener_mascotas", lista.ids)
 
-    cur.execute("SELECT fn_listar_mascotas()")
-    result = cur.fetchone()
-    conn.close()
+    return por_id(mascotas, lista.ids)
 
-    # Si PostgreSQL no devolvió ninguna fila
-    if not result:
-        raise HTTPException(404, "No se encontraron mascotas")
 
-    mascotas = result.get("fn_listar_mascotas")
+
+@router.get("/listar-mascotas")
+async def listar_mascotas(
+    request: Request, response: Response,
+    pag: Paginacion = Depends(), user=Depends(get_current_user)
+):
+
+    if user["role"] not in ["administrador", "veterinario", "secretaria"]:
+        raise HTTPException(403, "No autorizado")
+
+    # Paginado: ?limit=&cursor= → { data, next_cursor }
+    if pag.activa:
+        nombre, params = "fn_listar_mascotas_pagina", (pag.id(), pag.limite + 1)
+    else:
+        nombre, params = "fn_listar_mascotas", ()
+
+    # Versión de las tablas y listado en la misma llamada: si el cliente ya tiene
+    # esa versión (If-None-Match) la función del listado no se ejecuta → 304
+    version, sin_cambios, mascotas = await llamar_fn_versionada(
+        user["role"], ("mascotas", "clientes", "razas"), version_conocida(request, user),
+        nombre, *params, texto=not pag.activa
+    )
+    etag = etag_version(request, user, version)
+    if sin_cambios or no_modificado(request, etag):
+        return respuesta_304(etag)
+    response.headers.update(cabeceras_etag(etag))
+
+    if pag.activa:
+        return RespuestaORJSON(pagina(mascotas, pag.limite), headers=cabeceras_etag(etag))
 
     # Si tu función retorna un error personalizado
     # Ejemplo:
     # RETURN json_build_object('status','error','message','No hay mascotas')
-    if isinstance(mascotas, dict) and mascotas.get("status") == "error":
-        raise HTTPException(404, mascotas.get("message", "No se encontraron mascotas"))
+    error = error_json(mascotas)
+    if error:
+        raise HTTPException(404, error.get("message", "No se encontraron mascotas"))
 
     # Si retorna null desde PostgreSQL
     if mascotas is None:
         raise HTTPException(404, "No se encontraron mascotas")
 
     # Si retorna una lista vacía — también mandamos mensaje al frontend
-    if isinstance(mascotas, list) and len(mascotas) == 0:
+    if vacio(mascotas):
         raise HTTPException(404, "No hay mascotas registradas aún")
 
-    return {"data": mascotas}
+    return RespuestaJSON(envolver("data", mascotas), headers=cabeceras_etag(etag))
 
 
 
 
-@router.put("/actualizar-mascota/{mascota_id}", response_model=dict)
-def actualizar_mascota(mascota_id: int, data: MascotaUpdate, user=Depends(get_current_user)):
+@router.put("/actualizar-mascota/{mascota_id}")
+async def actualizar_mascota(mascota_id: int, data: MascotaUpdate, user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "veterinario"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_actualizar_mascota(%s, %s, %s, %s, %s)",
-        (mascota_id, data.raza_id, data.nombre, data.edad, data.peso)
+    mascota = await llamar_fn(
+        user["role"], "fn_actualizar_mascota",
+        mascota_id, data.raza_id, data.nombre, data.edad, data.peso
     )
 
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    # Si la función no devolvió nada
-    if not result:
-        raise HTTPException(404, "Mascota no encontrada")
-
-    mascota = result.get("fn_actualizar_mascota")
-
     # Si tu función retorna:
     # RETURN json_build_object('status','error','message','La mascota no existe');
     if isinstance(mascota, dict) and mascota.get("status") == "error":
@@ -143,25 +146,13 @@ def actualizar_mascota(mascota_id: int, data: MascotaUpdate, user=Depends(get_cu
 
 
 
-@router.delete("/eliminar-mascota/{mascota_id}", response_model=dict)
-def eliminar_mascota(mascota_id: int, user=Depends(get_current_user)):
+@router.delete("/eliminar-mascota/{mascota_id}")
+async def eliminar_mascota(mascota_id: int, user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "veterinario"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_eliminar_mascota(%s)", (mascota_id,))
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    # Si la función no devolvió nada
-    if not result:
-        raise HTTPException(404, "Mascota no encontrada")
-
-    mascota = result.get("fn_eliminar_mascota")
+    mascota = await llamar_fn(user["role"], "fn_eliminar_mascota", mascota_id)
 
     # Si la función retorna un error personalizado
     # Ejemplo:
@@ -177,23 +168,12 @@ def eliminar_mascota(mascota_id: int, user=Depends(get_current_user)):
 
 
 @router.get("/por-cliente/{cliente_id}", response_model=list[MascotaResponse])
-def mascotas_por_cliente(cliente_id: int, user=Depends(get_current_user)):
+async def mascotas_por_cliente(cliente_id: int, user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "veterinario", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_mascotas_por_cliente(%s)", (cliente_id,))
-    row = cur.fetchone()
-    conn.close()
-
-    # No llegó nada desde PostgreSQL
-    if not row:
-        raise HTTPException(404, "No se pudo consultar las mascotas")
-
-    resultado = row["fn_mascotas_por_cliente"]
+    resultado = await llamar_fn(user["role"], "fn_mascotas_por_cliente", cliente_id)
 
     # Si la función devuelve NULL
     if resultado is None:
@@ -203,4 +183,4 @@ def mascotas_por_cliente(cliente_id: int, user=Depends(get_current_user)):
     if isinstance(resultado, list) and len(resultado) == 0:
         return [{"message": "Este cliente no tiene mascotas registradas"}]
 
-    return resultado
\ No newline at end of file
+    return resultado
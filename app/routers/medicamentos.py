@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.auth import get_current_user
-from app.database import get_connection
-from psycopg2.extras import RealDictCursor
+from app import cache_catalogos
+from app.database import llamar_fn, llamar_fn_texto
 from app.models.medicamentos import MedicamentoCreate, MedicamentoUpdate
+from app.paginacion import Paginacion, pagina
+from app.lista_ids import ListaIds, por_id
+from app.json_crudo import RespuestaJSON, error_json, vacio
+from app.respuestas import RespuestaORJSON
 
 router = APIRouter(prefix="/medicamentos", tags=["Medicamentos"])
 
@@ -10,29 +14,15 @@ router = APIRouter(prefix="/medicamentos", tags=["Medicamentos"])
 # ----------------------------------------------------------
 # Crear medicamento  (solo administrador)
 # ----------------------------------------------------------
-@router.post("/crear-medicamento", response_model=dict)
-def crear_medicamento(data: MedicamentoCreate, user=Depends(get_current_user)):
+@router.post("/crear-medicamento")
+async def crear_medicamento(data: MedicamentoCreate, user=Depends(get_current_user)):
 
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    medicamento = await llamar_fn("administrador", "fn_crear_medicamento", data.nombre, data.precio)
 
-    cur.execute(
-        "SELECT fn_crear_medicamento(%s, %s)",
-        (data.nombre, data.precio)
-    )
-
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    # Si la función no devolvió nada
-    if not result:
-        raise HTTPException(500, "Error al crear el medicamento")
-
-    medicamento = result.get("fn_crear_medicamento")
+    cache_catalogos.invalidar("medicamentos")
 
     # Si la función retorna un JSON de error tipo:
     # RETURN json_build_object('status','error','message','Ya existe el medicamento');
@@ -50,25 +40,16 @@ def crear_medicamento(data: MedicamentoCreate, user=Depends(get_current_user)):
 # ----------------------------------------------------------
 # Obtener medicamento por ID
 # ----------------------------------------------------------
-@router.get("/obtener-medicamento/{medicamento_id}", response_model=dict)
-def obtener_medicamento(medicamento_id: int, user=Depends(get_current_user)):
+@router.get("/obtener-medicamento/{medicamento_id}")
+async def obtener_medicamento(medicamento_id: int, user=Depends(get_current_user)):
 
     # Todos pueden ver: administrador, veterinario, secretaria
     if user["role"] not in ["administrador", "veterinario", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_obtener_medicamento(%s)", (medicamento_id,))
-    result = cur.fetchone()
-    conn.close()
-
-    # No devolvió ninguna fila
-    if not result:
-        raise HTTPException(404, "Medicamento no encontrado")
-
-    medicamento = result.get("fn_obtener_medicamento")
+    medicamento = await cache_catalogos.obtener(
+        "medicamentos", medicamento_id, lambda: llamar_fn(user["role"], "fn_obtener_medicamento", medicamento_id)
+    )
 
     # Si la función devuelve un objeto tipo:
     # { "status": "error", "message": "Medicamento no existe" }
@@ -84,71 +65,74 @@ def obtener_medicamento(medicamento_id: int, user=Depends(get_current_user)):
 
 
 # ----------------------------------------------------------
-# Listar medicamentos
+# Obtener varios medicamentos (?ids=1,2,3)
 # ----------------------------------------------------------
-@router.get("/listar-medicamentos", response_model=list)
-def listar_medicamentos(user=Depends(get_current_user)):
+@router.get("/obtener-medicamentos")
+async def obtener_medicamentos(lista: ListaIds = Depends(), user=Depends(get_current_user)):
 
-    # Todos pueden ver: administrador, veterinario, secretaria
     if user["role"] not in ["administrador", "veterinario", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    # Una sola consulta; los ids que no existen van en "faltantes"
+    medicamentos = await llamar_fn(user["role"], "fn_obtener_medicamentos", lista.ids)
 
-    cur.execute("SELECT fn_listar_medicamentos()")
-    result = cur.fetchone()
-    conn.close()
+    return por_id(medicamentos, lista.ids)
 
-    # Si PostgreSQL no retornó ninguna fila
-    if not result:
-        raise HTTPException(404, "No se encontraron medicamentos")
 
-    medicamentos = result.get("fn_listar_medicamentos")
+
+# ----------------------------------------------------------
+# Listar medicamentos
+# ----------------------------------------------------------
+@router.get("/listar-medicamentos")
+async def listar_medicamentos(pag: Paginacion = Depends(), user=Depends(get_current_user)):
+
+    # Todos pueden ver: administrador, veterinario, secretaria
+    if user["role"] not in ["administrador", "veterinario", "secretaria"]:
+        raise HTTPException(403, "No autorizado")
+
+    # Paginado: ?limit=&cursor= → { data, next_cursor }
+    if pag.activa:
+        medicamentos = await llamar_fn(user["role"], "fn_listar_medicamentos_pagina", pag.id(), pag.limite + 1)
+        return RespuestaORJSON(pagina(medicamentos, pag.limite))
+
+    # En caché se guarda el texto JSON: cada acierto se responde sin serializar
+    medicamentos = await cache_catalogos.obtener(
+        "medicamentos", "listar", lambda: llamar_fn_texto(user["role"], "fn_listar_medicamentos")
+    )
 
     # Si la función retorna algo tipo:
     # { "status": "error", "message": "No hay medicamentos" }
-    if isinstance(medicamentos, dict) and medicamentos.get("status") == "error":
-        raise HTTPException(404, medicamentos.get("message", "No se encontraron medicamentos"))
+    error = error_json(medicamentos)
+    if error:
+        raise HTTPException(404, error.get("message", "No se encontraron medicamentos"))
 
     # Si retorna NULL
     if medicamentos is None:
         raise HTTPException(404, "No se encontraron medicamentos")
 
     # Si retorna lista vacía
-    if isinstance(medicamentos, list) and len(medicamentos) == 0:
+    if vacio(medicamentos):
         raise HTTPException(404, "No hay medicamentos registrados aún")
 
-    return medicamentos
+    return RespuestaJSON(medicamentos)
 
 
 
 # ----------------------------------------------------------
 # Actualizar medicamento (solo administrador)
 # ----------------------------------------------------------
-@router.put("/actualizar-medicamento/{medicamento_id}", response_model=dict)
-def actualizar_medicamento(medicamento_id: int, data: MedicamentoUpdate, user=Depends(get_current_user)):
+@router.put("/actualizar-medicamento/{medicamento_id}")
+async def actualizar_medicamento(medicamento_id: int, data: MedicamentoUpdate, user=Depends(get_current_user)):
 
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_actualizar_medicamento(%s, %s, %s)",
-        (medicamento_id, data.nombre, data.precio)
+    medicamento = await llamar_fn(
+        "administrador", "fn_actualizar_medicamento",
+        medicamento_id, data.nombre, data.precio
     )
 
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    # No regresó ninguna fila
-    if not result:
-        raise HTTPException(404, "Medicamento no encontrado")
-
-    medicamento = result.get("fn_actualizar_medicamento")
+    cache_catalogos.invalidar("medicamentos")
 
     # Si PL/pgSQL retorna algo tipo:
     # RETURN json_build_object('status','error','message','Medicamento no existe')
@@ -166,25 +150,15 @@ def actualizar_medicamento(medicamento_id: int, data: MedicamentoUpdate, user=De
 # ----------------------------------------------------------
 # Eliminar medicamento (solo administrador)
 # ----------------------------------------------------------
-@router.delete("/eliminar-medicamento/{medicamento_id}", response_model=dict)
-def eliminar_medicamento(medicamento_id: int, user=Depends(get_current_user)):
+@router.delete("/eliminar-medicamento/{medicamento_id}")
+async def eliminar_medicamento(medicamento_id: int, user=Depends(get_current_user)):
 
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_eliminar_medicamento(%s)", (medicamento_id,))
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    # Si PL/pgSQL no retornó ninguna fila
-    if not result:
-        raise HTTPException(404, "Medicamento no encontrado")
+    medicamento = await llamar_fn("administrador", "fn_eliminar_medicamento", medicamento_id)
 
-    medicamento = result.get("fn_eliminar_medicamento")
+    cache_catalogos.invalidar("medicamentos")
 
     # Si PL/pgSQL devuelve un JSON tipo error:
     # { "status": "error", "message": "Medicamento no existe" }
@@ -0,0 +1,42 @@
+import secrets
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from app.database import estadisticas_bd
+from app.metricas import METRICAS_PUBLICAS, METRICAS_TOKEN, exponer
+from app.seguridad import estadisticas_hash
+
+router = APIRouter(tags=["Métricas"])
+
+
+def _medidores() -> dict:
+    # Valores instantáneos: se leen de las estadísticas que ya llevan pools y hash
+    pools = {}
+    for pool, stats in estadisticas_bd().items():
+        for dato, valor in stats.items():
+            if isinstance(valor, (int, float)):
+                pools.setdefault(f"bd_pool_{dato}", []).append(({"pool": pool}, valor))
+
+    medidores = {nombre: ("Estado del pool de conexiones", muestras) for nombre, muestras in pools.items()}
+    medidores["auth_hash_pendientes"] = (
+        "Operaciones argon2 en curso o en cola", [({}, estadisticas_hash()["pendientes"])]
+    )
+    return medidores
+
+
+# ------------------------------
+#   MÉTRICAS PROMETHEUS
+# ------------------------------
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metricas(request: Request):
+
+    # Sin JWT (Prometheus no inicia sesión): METRICAS_TOKEN como Bearer.
+    # Cerrado por defecto; abierto solo con METRICAS_PUBLICAS=1
+    if METRICAS_TOKEN:
+        # En bytes: compare_digest no acepta str con caracteres fuera de ASCII
+        enviado = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not secrets.compare_digest(enviado.encode(), METRICAS_TOKEN.encode()):
+            raise HTTPException(401, "No autorizado")
+    elif not METRICAS_PUBLICAS:
+        raise HTTPException(404, "Not Found")
+
+    return PlainTextResponse(exponer(_medidores()), media_type="text/plain; version=0.0.4")
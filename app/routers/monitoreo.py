@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.auth import get_current_user, estadisticas_cache_tokens
+from app.cache_catalogos import estadisticas_cache_catalogos
+from app.database import estadisticas_bd, estadisticas_funciones
+from app.seguridad import estadisticas_hash
+
+router = APIRouter(prefix="/monitoreo", tags=["Monitoreo"])
+
+
+# ------------------------------
+#   ESTADO DEL POOL (solo admin)
+# ------------------------------
+@router.get("/pool")
+async def estado_pool(user=Depends(get_current_user)):
+
+    if user["role"] != "administrador":
+        raise HTTPException(403, "No autorizado")
+
+    return estadisticas_bd()
+
+
+
+# ------------------------------
+#   POOL DE HASH (solo admin)
+# ------------------------------
+@router.get("/hash")
+async def estado_hash(user=Depends(get_current_user)):
+
+    if user["role"] != "administrador":
+        raise HTTPException(403, "No autorizado")
+
+    return estadisticas_hash()
+
+
+
+# ------------------------------
+#   CACHÉ DE TOKENS (solo admin)
+# ------------------------------
+@router.get("/tokens")
+async def estado_cache_tokens(user=Depends(get_current_user)):
+
+    if user["role"] != "administrador":
+        raise HTTPException(403, "No autorizado")
+
+    return estadisticas_cache_tokens()
+
+
+
+# ------------------------------
+#   CACHÉ DE CATÁLOGOS (solo admin)
+# ------------------------------
+@router.get("/catalogos")
+async def estado_cache_catalogos(user=Depends(get_current_user)):
+
+    if user["role"] != "administrador":
+        raise HTTPException(403, "No autorizado")
+
+    return estadisticas_cache_catalogos()
+
+
+
+# ------------------------------
+#   TIEMPO POR FUNCIÓN SQL (solo admin)
+# ------------------------------
+@router.get("/funciones")
+async def estado_funciones(user=Depends(get_current_user)):
+
+    if user["role"] != "administrador":
+        raise HTTPException(403, "No autorizado")
+
+    return estadisticas_funciones()
+
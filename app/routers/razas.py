@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
 from app.auth import get_current_user
-from app.database import get_connection
-from psycopg2.extras import RealDictCursor
+from app import cache_catalogos
+from app.database import llamar_fn, llamar_fn_texto
 from app.models.razas import RazaCreate, RazaUpdate, RazaResponse
+from app.paginacion import Paginacion, pagina
+from app.json_crudo import RespuestaJSON, error_json, vacio
+from app.respuestas import RespuestaORJSON
 
 router = APIRouter(prefix="/razas", tags=["Razas"])
 
@@ -10,28 +13,15 @@ router = APIRouter(prefix="/razas", tags=["Razas"])
 # ------------------------------
 #   CREAR RAZA (solo admin)
 # ------------------------------
-@router.post("/crear-raza", response_model=dict)
-def crear_raza(data: RazaCreate, user=Depends(get_current_user)):
-    
+@router.post("/crear-raza")
+async def crear_raza(data: RazaCreate, user=Depends(get_current_user)):
+
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_crear_raza(%s, %s)",
-        (data.nombre, data.descripcion)
-    )
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
+    raza = await llamar_fn("administrador", "fn_crear_raza", data.nombre, data.descripcion)
 
-    # No devolvió ninguna fila
-    if not result:
-        raise HTTPException(500, "Error al crear la raza")
-
-    raza = result.get("fn_crear_raza")
+    cache_catalogos.invalidar("razas")
 
     # Si la función retorna error en JSON
     # Ejemplo:
@@ -50,64 +40,53 @@ def crear_raza(data: RazaCreate, user=Depends(get_current_user)):
 # ------------------------------
 #   LISTAR RAZAS (todos)
 # ------------------------------
-@router.get("/listar-razas", response_model=list)
-def listar_razas(user=Depends(get_current_user)):
+@router.get("/listar-razas")
+async def listar_razas(pag: Paginacion = Depends(), user=Depends(get_current_user)):
 
     # admin / vet / secretaria → pueden ver
     if user["role"] not in ["administrador", "veterinario", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_listar_razas()")
-    result = cur.fetchone()
-    conn.close()
+    # Paginado: ?limit=&cursor= → { data, next_cursor }
+    if pag.activa:
+        razas = await llamar_fn(user["role"], "fn_listar_razas_pagina", pag.id(), pag.limite + 1)
+        return RespuestaORJSON(pagina(razas, pag.limite))
 
-    # Si PostgreSQL no devolvió ninguna fila
-    if not result:
-        raise HTTPException(404, "No se encontraron razas")
-
-    razas = result.get("fn_listar_razas")
+    # En caché se guarda el texto JSON: cada acierto se responde sin serializar
+    razas = await cache_catalogos.obtener(
+        "razas", "listar", lambda: llamar_fn_texto(user["role"], "fn_listar_razas")
+    )
 
     # Si PL/pgSQL retorna un error tipo:
     # { "status": "error", "message": "No hay razas" }
-    if isinstance(razas, dict) and razas.get("status") == "error":
-        raise HTTPException(404, razas.get("message", "No se encontraron razas"))
+    error = error_json(razas)
+    if error:
+        raise HTTPException(404, error.get("message", "No se encontraron razas"))
 
     # Si retorna NULL
     if razas is None:
         raise HTTPException(404, "No se encontraron razas")
 
     # Si retorna una lista vacía
-    if isinstance(razas, list) and len(razas) == 0:
+    if vacio(razas):
         raise HTTPException(404, "No hay razas registradas aún")
 
-    return razas
+    return RespuestaJSON(razas)
 
 
 
 # ------------------------------
 #   OBTENER UNA RAZA (todos)
 # ------------------------------
-@router.get("/obtener-raza/{raza_id}", response_model=dict)
-def obtener_raza(raza_id: int, user=Depends(get_current_user)):
+@router.get("/obtener-raza/{raza_id}")
+async def obtener_raza(raza_id: int, user=Depends(get_current_user)):
 
     if user["role"] not in ["administrador", "veterinario", "secretaria"]:
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection(user["role"])
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_obtener_raza(%s)", (raza_id,))
-    result = cur.fetchone()
-    conn.close()
-
-    # Nada retornado por la función
-    if not result:
-        raise HTTPException(404, "Raza no encontrada")
-
-    raza = result.get("fn_obtener_raza")
+    raza = await cache_catalogos.obtener(
+        "razas", raza_id, lambda: llamar_fn(user["role"], "fn_obtener_raza", raza_id)
+    )
 
     # Función devolvió NULL
     if raza is None:
@@ -125,29 +104,19 @@ def obtener_raza(raza_id: int, user=Depends(get_current_user)):
 # ------------------------------
 #   ACTUALIZAR RAZA (solo admin)
 # ------------------------------
-@router.put("/actualizar-raza/{raza_id}", response_model=dict)
-def actualizar_raza(raza_id: int, data: RazaUpdate, user=Depends(get_current_user)):
+@router.put("/actualizar-raza/{raza_id}")
+async def actualizar_raza(raza_id: int, data: RazaUpdate, user=Depends(get_current_user)):
 
     # Solo el admin puede actualizar razas
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    cur.execute(
-        "SELECT fn_actualizar_raza(%s, %s, %s)",
-        (raza_id, data.nombre, data.descripcion)
+    raza = await llamar_fn(
+        "administrador", "fn_actualizar_raza",
+        raza_id, data.nombre, data.descripcion
     )
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
 
-    # La función no devolvió nada
-    if not result:
-        raise HTTPException(404, "Raza no encontrada")
-
-    raza = result.get("fn_actualizar_raza")
+    cache_catalogos.invalidar("razas")
 
     # La función devolvió NULL
     if raza is None:
@@ -165,26 +134,16 @@ def actualizar_raza(raza_id: int, data: RazaUpdate, user=Depends(get_current_use
 # ------------------------------
 #   ELIMINAR RAZA (solo admin)
 # ------------------------------
-@router.delete("/eliminar-raza/{raza_id}", response_model=dict)
-def eliminar_raza(raza_id: int, user=Depends(get_current_user)):
+@router.delete("/eliminar-raza/{raza_id}")
+async def eliminar_raza(raza_id: int, user=Depends(get_current_user)):
 
     # Solo el admin puede eliminar
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_eliminar_raza(%s)", (raza_id,))
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    # Si no retorna nada = no existe
-    if not result:
-        raise HTTPException(404, "Raza no encontrada")
+    data = await llamar_fn("administrador", "fn_eliminar_raza", raza_id)
 
-    data = result.get("fn_eliminar_raza")
+    cache_catalogos.invalidar("razas")
 
     # Si retorna NULL
     if data is None:
@@ -1,46 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.auth import get_current_user
-from app.database import get_connection
+from app.database import llamar_fn, llamar_fn_texto
 from app.models.usuarios import UsuarioCreate, UsuarioUpdate, UsuarioResponse
-from passlib.context import CryptContext
-from psycopg2.extras import RealDictCursor
+from app.paginacion import Paginacion, pagina
+from app.json_crudo import RespuestaJSON, vacio
+from app.respuestas import RespuestaORJSON
+from app.seguridad import hashear_password
 
 
 router = APIRouter()
 
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto"
-)
+@router.post("/crear-usuario")
+async def crear_usuario(data: UsuarioCreate, user=Depends(get_current_user)):
 
-@router.post("/crear-usuario", response_model=dict)
-def crear_usuario(data: UsuarioCreate, user=Depends(get_current_user)):
-    
     # Solo el administrador puede crear usuarios
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
     # Hashear contraseña antes de guardar
-    password_hash = pwd_context.hash(data.password)
+    password_hash = await hashear_password(data.password)
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        "SELECT fn_crear_usuario(%s, %s, %s, %s)",
-        (data.nombre, data.email, password_hash, data.rol)
+    usuario = await llamar_fn(
+        "administrador", "fn_crear_usuario",
+        data.nombre, data.email, password_hash, data.rol
     )
 
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
-    # Si no retorna nada → error interno
-    if not result:
-        raise HTTPException(500, "fn_crear_usuario no retornó datos")
-
-    usuario = result["fn_crear_usuario"]
-
     # Si la función retorna NULL → error
     if usuario is None:
         raise HTTPException(500, "Error creando el usuario")
@@ -54,26 +38,14 @@ def crear_usuario(data: UsuarioCreate, user=Depends(get_current_user)):
 
 
 
-@router.get("/obtener-usuario/{usuario_id}", response_model=dict)
-def obtener_usuario(usuario_id: int, user=Depends(get_current_user)):
+@router.get("/obtener-usuario/{usuario_id}")
+async def obtener_usuario(usuario_id: int, user=Depends(get_current_user)):
 
     # Solo el administrador puede ver usuarios
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_obtener_usuario(%s)", (usuario_id,))
-    result = cur.fetchone()
-
-    conn.close()
-
-    # Si la función no retorna nada → usuario no existe
-    if not result:
-        raise HTTPException(404, "Usuario no encontrado")
-
-    usuario = result["fn_obtener_usuario"]
+    usuario = await llamar_fn("administrador", "fn_obtener_usuario", usuario_id)
 
     # Si retorna NULL como resultado
     if usuario is None:
@@ -89,39 +61,33 @@ def obtener_usuario(usuario_id: int, user=Depends(get_current_user)):
 
 
 
-@router.get("/listar-usuarios", response_model=list)
-def listar_usuarios(user=Depends(get_current_user)):
+@router.get("/listar-usuarios")
+async def listar_usuarios(pag: Paginacion = Depends(), user=Depends(get_current_user)):
 
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    # Paginado: ?limit=&cursor= → { data, next_cursor }
+    if pag.activa:
+        usuarios = await llamar_fn("administrador", "fn_listar_usuarios_pagina", pag.id(), pag.limite + 1)
+        return RespuestaORJSON(pagina(usuarios, pag.limite))
 
-    cur.execute("SELECT fn_listar_usuarios()")
-    result = cur.fetchone()
-
-    conn.close()
-
-    # Si no viene nada
-    if not result:
-        raise HTTPException(404, "No se encontraron usuarios")
-
-    usuarios = result["fn_listar_usuarios"]
+    # Listado completo como texto: se escribe en el body sin parsearlo
+    usuarios = await llamar_fn_texto("administrador", "fn_listar_usuarios")
 
     # Si la función devuelve NULL
     if usuarios is None:
         raise HTTPException(404, "No se encontraron usuarios")
 
     # Si devuelve lista vacía
-    if isinstance(usuarios, list) and len(usuarios) == 0:
+    if vacio(usuarios):
         raise HTTPException(404, "No hay usuarios registrados")
 
-    return usuarios
+    return RespuestaJSON(usuarios)
 
 
 @router.put("/actualizar-usuario/{usuario_id}", response_model=UsuarioResponse)
-def actualizar_usuario( usuario_id: int,data: UsuarioUpdate,
+async def actualizar_usuario( usuario_id: int,data: UsuarioUpdate,
     user=Depends(get_current_user)
 ):
 
@@ -129,45 +95,31 @@ def actualizar_usuario( usuario_id: int,data: UsuarioUpdate,
         raise HTTPException(403, "No autorizado")
 
     # Si envía contraseña nueva, se encripta
-    password_hash = pwd_context.hash(data.password) if data.password else None
-
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    password_hash = await hashear_password(data.password) if data.password else None
 
-    cur.execute(
-        "SELECT fn_actualizar_usuario(%s, %s, %s, %s, %s);",
-        (usuario_id, data.nombre, data.email, password_hash, data.rol)
+    usuario = await llamar_fn(
+        "administrador", "fn_actualizar_usuario",
+        usuario_id, data.nombre, data.email, password_hash, data.rol
     )
 
-    result = cur.fetchone()
-    conn.commit()
-    conn.close()
-
     # Si la función no retornó nada
-    if not result or result["fn_actualizar_usuario"] is None:
+    if usuario is None:
         raise HTTPException(404, "Usuario no encontrado")
 
-    return result["fn_actualizar_usuario"]
+    return usuario
 
 
 
-@router.delete("/eliminar-usuario/{usuario_id}", response_model=dict)
-def eliminar_usuario(usuario_id: int, user=Depends(get_current_user)):
+@router.delete("/eliminar-usuario/{usuario_id}")
+async def eliminar_usuario(usuario_id: int, user=Depends(get_current_user)):
 
     if user["role"] != "administrador":
         raise HTTPException(403, "No autorizado")
 
-    conn = get_connection("administrador")
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT fn_eliminar_usuario(%s);", (usuario_id,))
-    result = cur.fetchone()
-
-    conn.commit()
-    conn.close()
+    usuario = await llamar_fn("administrador", "fn_eliminar_usuario", usuario_id)
 
     # Si la función no retornó nada o retornó NULL
-    if not result or result["fn_eliminar_usuario"] is None:
+    if usuario is None:
         raise HTTPException(404, "Usuario no encontrado")
 
-    return result["fn_eliminar_usuario"]
+    return usuario
@@ -1,11 +1,5 @@
-import os
-from passlib.context import CryptContext
-from app.database import get_connection
-
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto"
-)
+from app.database import llamar_fn, transaccion
+from app.seguridad import hashear_password
 
 DEFAULT_ADMIN_NAME = "Administrador"
 DEFAULT_ADMIN_EMAIL = "admin@admin.com"
@@ -13,37 +7,25 @@ DEFAULT_ADMIN_PASSWORD = "admin123"
 DEFAULT_ADMIN_ROLE = "administrador"
 
 
-def seed_admin():
+async def seed_admin():
+    # Corre en el startup: usa el mismo driver que la app (DB_DRIVER) y el
+    # pool de procesos de argon2, sin bloquear el event loop
     print("🔍 Ejecutando seeder de administrador...")
 
-    # Conectar como administrador
-    conn = get_connection("administrador")
-    cur = conn.cursor()
-
     # Verificar si ya existe
-    cur.execute(
-        "SELECT id FROM usuarios WHERE email = %s",
-        (DEFAULT_ADMIN_EMAIL,)
-    )
-
-    existe = cur.fetchone()
+    async with transaccion("administrador") as tx:
+        existe = await tx.fila("SELECT id FROM usuarios WHERE email = %s", DEFAULT_ADMIN_EMAIL)
 
     if existe:
         print(" Administrador ya existe, no se genera de nuevo.")
-        conn.close()
         return
 
-    password_hash = pwd_context.hash(DEFAULT_ADMIN_PASSWORD)
+    password_hash = await hashear_password(DEFAULT_ADMIN_PASSWORD)
 
     # Insertar usando tu función
-    cur.execute(
-        "SELECT fn_crear_usuario(%s, %s, %s, %s)",
-        (DEFAULT_ADMIN_NAME, DEFAULT_ADMIN_EMAIL, password_hash, DEFAULT_ADMIN_ROLE)
+    await llamar_fn(
+        "administrador", "fn_crear_usuario",
+        DEFAULT_ADMIN_NAME, DEFAULT_ADMIN_EMAIL, password_hash, DEFAULT_ADMIN_ROLE
     )
 
-    conn.commit()
-    conn.close()
-
     print("Administrador creado correctamente.")
-
-
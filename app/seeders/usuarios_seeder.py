@@ -1,10 +1,5 @@
-from passlib.context import CryptContext
 from app.database import get_connection
-
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto"
-)
+from app.seguridad import hashear_password_sync
 
 USUARIOS = [
     ("Veterinario", "vet@correo.com", "vet123", "veterinario"),
@@ -29,7 +24,7 @@ def seed_usuarios():
             continue
 
         # 2. generar hash
-        password_hash = pwd_context.hash(password)
+        password_hash = hashear_password_sync(password)
 
         # 3. insertar usando tu función SQL
         cur.execute(
@@ -0,0 +1,151 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from app.metricas import AUTH_VERIFICACION
+from app.trazas import span
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto"
+)
+
+# argon2 consume CPU a propósito: se ejecuta en procesos aparte para no frenar
+# al resto de endpoints. HASH_MAX_COLA limita cuántas operaciones pueden estar
+# en curso o esperando; por encima de eso se responde 503 de inmediato.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_COLA = int(os.getenv("HASH_MAX_COLA", str(HASH_WORKERS * 8)))
+
+_executor = None
+_lock = threading.Lock()
+_pendientes = 0
+
+_estadisticas = {
+    "operaciones": 0,
+    "rechazadas": 0,
+    "espera_total": 0.0,
+    "espera_max": 0.0,
+    "hash_total": 0.0,
+    "hash_max": 0.0,
+}
+
+
+# ---------------------------------------
+#      FUNCIONES QUE CORREN EN LOS PROCESOS
+# ---------------------------------------
+def _verificar(password: str, password_hash: str):
+    inicio = time.time()
+    valido = pwd_context.verify(password, password_hash)
+    return valido, inicio, time.time() - inicio
+
+
+def _hashear(password: str):
+    inicio = time.time()
+    password_hash = pwd_context.hash(password)
+    return password_hash, inicio, time.time() - inicio
+
+
+# ---------------------------------------
+#      COLA ACOTADA
+# ---------------------------------------
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                # spawn: los procesos no heredan hilos ni conexiones abiertas del servidor
+                _executor = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _executor
+
+
+def _enviar(funcion, *args):
+    global _pendientes
+    with _lock:
+        if _pendientes >= HASH_MAX_COLA:
+            _estadisticas["rechazadas"] += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Demasiadas solicitudes de autenticación, intenta nuevamente.",
+                headers={"Retry-After": "1"}
+            )
+        _pendientes += 1
+    enviado = time.time()
+    try:
+        futuro = _pool().submit(funcion, *args)
+    except Exception:
+        _terminar()
+        raise
+    # El lugar en la cola se libera cuando el proceso termina, no cuando quien
+    # espera se va: un login cancelado (cliente desconectado) sigue ocupando CPU
+    futuro.add_done_callback(lambda f: _terminar(f, enviado))
+    return futuro
+
+
+def _terminar(futuro=None, enviado=None):
+    global _pendientes
+    with _lock:
+        _pendientes -= 1
+        if futuro is None or futuro.cancelled() or futuro.exception() is not None:
+            return
+        _, inicio, duracion = futuro.result()
+        espera = max(inicio - enviado, 0.0)
+        _estadisticas["operaciones"] += 1
+        _estadisticas["espera_total"] += espera
+        _estadisticas["espera_max"] = max(_estadisticas["espera_max"], espera)
+        _estadisticas["hash_total"] += duracion
+        _estadisticas["hash_max"] = max(_estadisticas["hash_max"], duracion)
+
+
+async def _ejecutar(funcion, *args):
+    resultado, _, _ = await asyncio.wrap_future(_enviar(funcion, *args))
+    return resultado
+
+
+# ---------------------------------------
+#      API
+# ---------------------------------------
+async def verificar_password(password: str, password_hash: str) -> bool:
+    with span("auth.argon2"), AUTH_VERIFICACION.medir():
+        return await _ejecutar(_verificar, password, password_hash)
+
+
+async def hashear_password(password: str) -> str:
+    return await _ejecutar(_hashear, password)
+
+
+def hashear_password_sync(password: str) -> str:
+    """
+    Para código síncrono (seeders)
+    """
+    resultado, _, _ = _enviar(_hashear, password).result()
+    return resultado
+
+
+def cerrar_pool_hash():
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def estadisticas_hash() -> dict:
+    with _lock:
+        return {
+            "workers": HASH_WORKERS,
+            "max_cola": HASH_MAX_COLA,
+            "pendientes": _pendientes,
+            "operaciones": _estadisticas["operaciones"],
+            "rechazadas": _estadisticas["rechazadas"],
+            "espera_total": round(_estadisticas["espera_total"], 6),
+            "espera_max": round(_estadisticas["espera_max"], 6),
+            "hash_total": round(_estadisticas["hash_total"], 6),
+            "hash_max": round(_estadisticas["hash_max"], 6),
+        }
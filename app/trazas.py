@@ -0,0 +1,248 @@
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Trazas por petición al estilo OpenTelemetry, sin colector externo.
+# Cada petición abre una traza (middleware) y el código marca tramos con
+#
+#     with span("bd.fn", funcion=nombre):
+#         ...
+#
+# La traza activa viaja en contextvars, así que también llega a los hilos de
+# run_in_threadpool. Al terminar la petición se decide si se exporta:
+#   TRAZAS_EXPORTADOR  ninguno (por defecto) | consola | archivo
+#   TRAZAS_ARCHIVO     ruta del archivo JSON lines (por defecto trazas.jsonl)
+#   TRAZAS_MUESTREO    fracción de peticiones exportadas, 0 a 1 (por defecto 1)
+#   TRAZAS_LENTAS_MS   además exporta siempre las peticiones más lentas que esto
+# Un traceparent entrante con el flag 01 fuerza el muestreo.
+
+TRAZAS_EXPORTADOR = os.getenv("TRAZAS_EXPORTADOR", "ninguno")
+TRAZAS_ARCHIVO = os.getenv("TRAZAS_ARCHIVO", "trazas.jsonl")
+TRAZAS_MUESTREO = float(os.getenv("TRAZAS_MUESTREO", "1"))
+TRAZAS_LENTAS_MS = float(os.getenv("TRAZAS_LENTAS_MS", "0"))
+ACTIVAS = TRAZAS_EXPORTADOR in ("consola", "archivo")
+
+_traza = ContextVar("traza", default=None)
+_span_actual = ContextVar("span_actual", default=None)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class Traza:
+
+    def __init__(self, request_id, trace_id, padre=None, muestreada=False):
+        self.request_id = request_id
+        self.trace_id = trace_id
+        self.padre = padre
+        self.muestreada = muestreada
+        # list.append es atómico: los spans de otros hilos se agregan sin lock
+        self.spans = []
+
+
+class Span:
+
+    def __init__(self, traza: Traza, nombre: str, padre, atributos: dict):
+        self.traza = traza
+        self.nombre = nombre
+        self.span_id = uuid.uuid4().hex[:16]
+        self.padre = padre
+        self.atributos = atributos
+        self.estado = "ok"
+        self._inicio_ns = time.time_ns()
+        self._inicio = time.perf_counter()
+
+    def atributo(self, clave, valor):
+        self.atributos[clave] = valor
+
+    def terminar(self):
+        self.traza.spans.append({
+            "trace_id": self.traza.trace_id,
+            "request_id": self.traza.request_id,
+            "span_id": self.span_id,
+            "parent_id": self.padre,
+            "nombre": self.nombre,
+            "inicio_ns": self._inicio_ns,
+            "duracion_ms": round((time.perf_counter() - self._inicio) * 1000, 3),
+            "estado": self.estado,
+            "atributos": self.atributos,
+        })
+
+
+@contextmanager
+def span(nombre: str, **atributos):
+    """
+    Tramo dentro de la traza actual. Sin traza activa no hace nada.
+    """
+    traza = _traza.get()
+    if traza is None:
+        yield None
+        return
+
+    s = Span(traza, nombre, _span_actual.get(), atributos)
+    token = _span_actual.set(s.span_id)
+    try:
+        yield s
+    except BaseException as e:
+        s.estado = "error"
+        s.atributos["error"] = type(e).__name__
+        raise
+    finally:
+        _span_actual.reset(token)
+        s.terminar()
+
+
+def request_id_actual():
+    traza = _traza.get()
+    return traza.request_id if traza is not None else None
+
+
+# ---------------------------------------
+#      EXPORTADORES (hilo aparte)
+# ---------------------------------------
+_cola = queue.SimpleQueue()
+_hilo = None
+_hilo_lock = threading.Lock()
+_FIN = object()
+
+
+def _arbol(spans) -> str:
+    hijos = {}
+    for s in spans:
+        hijos.setdefault(s["parent_id"], []).append(s)
+
+    lineas = []
+
+    def agregar(padre, nivel):
+        for s in sorted(hijos.get(padre, []), key=lambda s: s["inicio_ns"]):
+            atributos = " ".join(f"{k}={v}" for k, v in s["atributos"].items())
+            marca = " ERROR" if s["estado"] == "error" else ""
+            lineas.append(f"{'  ' * nivel}{s['nombre']} {s['duracion_ms']:.1f}ms{marca} {atributos}".rstrip())
+            agregar(s["span_id"], nivel + 1)
+
+    raices = {s["parent_id"] for s in spans} - {s["span_id"] for s in spans}
+    for raiz in raices:
+        agregar(raiz, 1)
+    return "\n".join(lineas)
+
+
+def _exportar(spans):
+    if TRAZAS_EXPORTADOR == "consola":
+        print(f"[traza {spans[0]['trace_id']} request {spans[0]['request_id']}]\n{_arbol(spans)}",
+              file=sys.stderr, flush=True)
+    else:
+        with open(TRAZAS_ARCHIVO, "a", encoding="utf-8") as archivo:
+            for s in spans:
+                archivo.write(json.dumps(s, default=str) + "\n")
+
+
+def _trabajar():
+    while True:
+        spans = _cola.get()
+        if spans is _FIN:
+            return
+        try:
+            _exportar(spans)
+        except Exception as e:
+            # Una traza perdida no debe tumbar el exportador
+            print(f"No se pudo exportar la traza: {e}", file=sys.stderr)
+
+
+def _encolar(spans):
+    global _hilo
+    if _hilo is None:
+        with _hilo_lock:
+            if _hilo is None:
+                _hilo = threading.Thread(target=_trabajar, name="trazas", daemon=True)
+                _hilo.start()
+    _cola.put(spans)
+
+
+def cerrar_trazas():
+    """
+    Escribe lo que quede en la cola (shutdown de la app)
+    """
+    global _hilo
+    if _hilo is not None:
+        _cola.put(_FIN)
+        _hilo.join(timeout=5)
+        _hilo = None
+
+
+# ---------------------------------------
+#      MIDDLEWARE ASGI
+# ---------------------------------------
+def _cabecera(scope, nombre: bytes):
+    for clave, valor in scope.get("headers", []):
+        if clave == nombre:
+            return valor.decode("latin-1")
+    return None
+
+
+class MiddlewareTrazas:
+    """
+    Asigna un X-Request-ID a cada petición (respeta el que llega) y lo devuelve
+    en la respuesta. Con TRAZAS_EXPORTADOR activo abre la traza y el span raíz.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _cabecera(scope, b"x-request-id")
+        if not request_id or not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                mensaje["headers"] = list(mensaje.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+                if raiz is not None:
+                    raiz.atributo("estado", mensaje["status"])
+            await send(mensaje)
+
+        raiz = None
+        if not ACTIVAS:
+            await self.app(scope, receive, enviar)
+            return
+
+        # W3C traceparent: continúa la traza de quien llama
+        m = _TRACEPARENT.match(_cabecera(scope, b"traceparent") or "")
+        if m:
+            traza = Traza(request_id, m.group(1), m.group(2), m.group(3) == "01")
+        else:
+            traza = Traza(request_id, uuid.uuid4().hex)
+        traza.muestreada = traza.muestreada or random.random() < TRAZAS_MUESTREO
+
+        token_traza = _traza.set(traza)
+        token_span = _span_actual.set(traza.padre)
+        inicio = time.perf_counter()
+        try:
+            with span("http", metodo=scope["method"], url=scope["path"]) as raiz:
+                await self.app(scope, receive, enviar)
+        finally:
+            _span_actual.reset(token_span)
+            _traza.reset(token_traza)
+
+            # La plantilla de la ruta solo se conoce después del ruteo
+            ruta = getattr(scope.get("route"), "path", None) or "sin_ruta"
+            for s in traza.spans:
+                if s["span_id"] == raiz.span_id:
+                    s["nombre"] = f"http {scope['method']} {ruta}"
+
+            lenta = TRAZAS_LENTAS_MS > 0 and (time.perf_counter() - inicio) * 1000 >= TRAZAS_LENTAS_MS
+            if traza.spans and (traza.muestreada or lenta):
+                _encolar(traza.spans)
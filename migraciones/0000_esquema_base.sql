@@ -0,0 +1,2264 @@
+--
+-- Esquema base de la base VeterinariaBd (PostgreSQL 17.6).
+--
+-- Es la parte de esquema de full_backup.sql (equivale a pg_restore --schema-only --no-owner):
+-- tablas, secuencias, funciones, triggers, restricciones y permisos, sin datos.
+-- Los roles administrador, veterinario y secretaria deben existir antes de aplicarla.
+-- Si la base ya se restauró desde full_backup.sql, el runner la marca como aplicada.
+--
+
+SET LOCAL check_function_bodies = false;
+SET LOCAL client_min_messages = warning;
+
+--
+-- Name: fn_actualizar_cita(integer, date, time without time zone, integer, text); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_cita(p_id integer, p_fecha date, p_hora time without time zone, p_veterinario_id integer, p_estado text) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE citas
+    SET fecha = COALESCE(p_fecha,fecha),
+        hora = COALESCE(p_hora,hora),
+        veterinario_id = COALESCE(p_veterinario_id,veterinario_id),
+        estado = COALESCE(p_estado,estado),
+        updated_at = now()
+    WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_actualizar_cliente(integer, text, text, text); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_cliente(p_id integer, p_nombre text, p_telefono text, p_direccion text) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE clientes
+    SET nombre = COALESCE(p_nombre,nombre),
+        telefono = COALESCE(p_telefono,telefono),
+        direccion = COALESCE(p_direccion,direccion),
+        updated_at = now()
+    WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_actualizar_consulta(integer, integer, integer, text, numeric); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_consulta(p_id integer, p_cliente_id integer, p_mascota_id integer, p_diagnostico text, p_total numeric) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE consultas
+    SET cliente_id = COALESCE(p_cliente_id,cliente_id),
+        mascota_id = COALESCE(p_mascota_id,mascota_id),
+        diagnostico = COALESCE(p_diagnostico,diagnostico),
+        total = COALESCE(p_total,total),
+        updated_at = now()
+    WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_actualizar_estado_cita(integer, character varying); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_estado_cita(p_cita_id integer, p_estado character varying) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE citas
+    SET estado = p_estado
+    WHERE id = p_cita_id;
+
+    RETURN json_build_object(
+        'id', p_cita_id,
+        'estado', p_estado
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_actualizar_factura(integer, numeric); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_factura(p_id integer, p_total numeric) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE facturas
+    SET total = COALESCE(p_total,total),
+        updated_at = now()
+    WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_actualizar_mascota(integer, integer, text, integer, numeric); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_mascota(p_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE mascotas
+    SET raza_id = COALESCE(p_raza_id,raza_id),
+        nombre = COALESCE(p_nombre,nombre),
+        edad = COALESCE(p_edad,edad),
+        peso = COALESCE(p_peso,peso),
+        updated_at = now()
+    WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_actualizar_medicamento(integer, text, numeric); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_medicamento(p_id integer, p_nombre text, p_precio numeric) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE medicamentos
+    SET 
+        nombre = COALESCE(p_nombre, nombre),
+        precio = COALESCE(p_precio, precio),
+        updated_at = now()
+    WHERE id = p_id;
+
+    RETURN json_build_object(
+        'status', 'success',
+        'id', p_id
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_actualizar_medicamento_consulta(integer, integer, integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE consulta_medicamentos
+    SET cantidad = COALESCE(p_cantidad,cantidad),
+        updated_at = now()
+    WHERE consulta_id = p_consulta_id
+      AND medicamento_id = p_medicamento_id;
+
+    RETURN json_build_object('status','success');
+END;
+$$;
+
+
+--
+-- Name: fn_actualizar_raza(integer, text, text); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_raza(p_id integer, p_nombre text, p_descripcion text) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE razas
+    SET nombre = COALESCE(p_nombre,nombre),
+        descripcion = COALESCE(p_descripcion,descripcion),
+        updated_at = now()
+    WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_actualizar_usuario(integer, text, text, text, text); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_actualizar_usuario(p_id integer, p_nombre text, p_email text, p_password_hash text, p_rol text) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE usuarios
+    SET nombre = COALESCE(p_nombre,nombre),
+        email = COALESCE(p_email,email),
+        password_hash = COALESCE(p_password_hash,password_hash),
+        rol = COALESCE(p_rol,rol),
+        updated_at = now()
+    WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_agregar_medicamento_a_consulta(integer, integer, integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_agregar_medicamento_a_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    INSERT INTO consulta_medicamentos(consulta_id, medicamento_id, cantidad)
+    VALUES (p_consulta_id, p_medicamento_id, p_cantidad)
+    ON CONFLICT (consulta_id, medicamento_id)
+    DO UPDATE SET cantidad = p_cantidad, updated_at = now();
+
+    RETURN json_build_object('status','success');
+END;
+$$;
+
+
+--
+-- Name: fn_agregar_medicamento_consulta(integer, integer, integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_agregar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_total NUMERIC;
+BEGIN
+    INSERT INTO consulta_medicamentos(consulta_id, medicamento_id, cantidad)
+    VALUES (p_consulta_id, p_medicamento_id, p_cantidad)
+    ON CONFLICT (consulta_id, medicamento_id)
+    DO UPDATE SET cantidad = p_cantidad, updated_at = NOW();
+
+    -- recalcula total después de agregar
+    v_total := fn_recalcular_total_consulta(p_consulta_id);
+
+    RETURN json_build_object(
+        'status', 'success',
+        'total', v_total
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_crear_cita(date, time without time zone, integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_crear_cita(p_fecha date, p_hora time without time zone, p_veterinario_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE c_id INT;
+BEGIN
+    INSERT INTO citas (fecha, hora, veterinario_id)
+    VALUES (p_fecha, p_hora, p_veterinario_id)
+    RETURNING id INTO c_id;
+
+    RETURN json_build_object('status','success','id',c_id);
+END;
+$$;
+
+
+--
+-- Name: fn_crear_cliente(text, text, text); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_crear_cliente(p_nombre text, p_telefono text, p_direccion text) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE c_id INT;
+BEGIN
+    INSERT INTO clientes (nombre, telefono, direccion)
+    VALUES (p_nombre, p_telefono, p_direccion)
+    RETURNING id INTO c_id;
+
+    RETURN json_build_object('status','success','id',c_id);
+END;
+$$;
+
+
+--
+-- Name: fn_crear_consulta(integer, integer, integer, text, numeric); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_crear_consulta(p_cita_id integer, p_cliente_id integer, p_mascota_id integer, p_diagnostico text, p_total numeric) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    nuevo_id INT;
+BEGIN
+    INSERT INTO consultas(cita_id, cliente_id, mascota_id, diagnostico, total)
+    VALUES (p_cita_id, p_cliente_id, p_mascota_id, p_diagnostico, p_total)
+    RETURNING id INTO nuevo_id;
+
+    RETURN json_build_object(
+        'status', 'ok',
+        'message', 'Consulta creada correctamente',
+        'id', nuevo_id
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_crear_consulta(integer, integer, integer, integer, text, numeric); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_crear_consulta(p_cita_id integer, p_cliente_id integer, p_mascota_id integer, p_veterinario_id integer, p_diagnostico text, p_total numeric) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    nuevo_id INT;
+BEGIN
+    INSERT INTO consultas(cita_id, cliente_id, mascota_id, veterinario_id, diagnostico, total)
+    VALUES (p_cita_id, p_cliente_id, p_mascota_id, p_veterinario_id, p_diagnostico, p_total)
+    RETURNING id INTO nuevo_id;
+
+    RETURN json_build_object(
+        'status', 'ok',
+        'message', 'Consulta creada correctamente',
+        'id', nuevo_id
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_crear_factura(integer, numeric); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_crear_factura(p_consulta_id integer, p_total numeric) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE f_id INT;
+BEGIN
+    INSERT INTO facturas (consulta_id, total)
+    VALUES (p_consulta_id, p_total)
+    RETURNING id INTO f_id;
+
+    RETURN json_build_object('status','success','id',f_id);
+END;
+$$;
+
+
+--
+-- Name: fn_crear_mascota(integer, integer, text, integer, numeric); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_crear_mascota(p_cliente_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE m_id INT;
+BEGIN
+    INSERT INTO mascotas (cliente_id, raza_id, nombre, edad, peso)
+    VALUES (p_cliente_id, p_raza_id, p_nombre, p_edad, p_peso)
+    RETURNING id INTO m_id;
+
+    RETURN json_build_object('status','success','id',m_id);
+END;
+$$;
+
+
+--
+-- Name: fn_crear_medicamento(text, numeric); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_crear_medicamento(p_nombre text, p_precio numeric) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE 
+    m_id INT;
+BEGIN
+    INSERT INTO medicamentos (nombre, precio)
+    VALUES (p_nombre, p_precio)
+    RETURNING id INTO m_id;
+
+    RETURN json_build_object(
+        'status', 'success',
+        'id', m_id
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_crear_raza(text, text); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_crear_raza(p_nombre text, p_descripcion text) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE r_id INT;
+BEGIN
+    INSERT INTO razas (nombre, descripcion)
+    VALUES (p_nombre, p_descripcion)
+    RETURNING id INTO r_id;
+
+    RETURN json_build_object('status','success','id',r_id);
+END;
+$$;
+
+
+--
+-- Name: fn_crear_usuario(text, text, text, text); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_crear_usuario(p_nombre text, p_email text, p_password_hash text, p_rol text) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE nuevo_id INT;
+BEGIN
+    INSERT INTO usuarios (nombre, email, password_hash, rol)
+    VALUES (p_nombre, p_email, p_password_hash, p_rol)
+    RETURNING id INTO nuevo_id;
+
+    RETURN json_build_object('status','success','id',nuevo_id);
+END;
+$$;
+
+
+--
+-- Name: fn_eliminar_cita(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_eliminar_cita(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    DELETE FROM citas WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_eliminar_cliente(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_eliminar_cliente(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    DELETE FROM clientes WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_eliminar_consulta(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_eliminar_consulta(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    DELETE FROM consultas WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_eliminar_factura(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_eliminar_factura(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    DELETE FROM facturas WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_eliminar_mascota(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_eliminar_mascota(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    DELETE FROM mascotas WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_eliminar_medicamento(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_eliminar_medicamento(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    DELETE FROM medicamentos WHERE id = p_id;
+
+    RETURN json_build_object(
+        'status', 'success',
+        'id', p_id
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_eliminar_medicamento_consulta(integer, integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_eliminar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    DELETE FROM consulta_medicamentos
+    WHERE consulta_id = p_consulta_id
+      AND medicamento_id = p_medicamento_id;
+
+    RETURN json_build_object('status','success');
+END;
+$$;
+
+
+--
+-- Name: fn_eliminar_raza(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_eliminar_raza(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    DELETE FROM razas WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_eliminar_usuario(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_eliminar_usuario(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    DELETE FROM usuarios WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_listar_citas(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_citas() RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (
+        SELECT json_agg(
+            json_build_object(
+                'id', c.id,
+                'fecha', c.fecha,
+                'hora', c.hora,
+                'estado', c.estado,
+
+                -- 🔥 Veterinario completo (id + nombre)
+                'veterinario', json_build_object(
+                    'id', u.id,
+                    'nombre', u.nombre
+                )
+            )
+        )
+        FROM citas c
+        LEFT JOIN usuarios u ON u.id = c.veterinario_id
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_listar_citas_por_veterinario(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_citas_por_veterinario(p_veterinario_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (
+        SELECT json_agg(row_to_json(c))
+        FROM (
+            SELECT *
+            FROM citas
+            WHERE veterinario_id = p_veterinario_id
+            ORDER BY fecha ASC
+        ) c
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_listar_clientes(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_clientes() RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT json_agg(row_to_json(c)) FROM clientes c);
+END;
+$$;
+
+
+--
+-- Name: fn_listar_consultas(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_consultas() RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT json_agg(row_to_json(c)) FROM consultas c);
+END;
+$$;
+
+
+--
+-- Name: fn_listar_facturas(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_facturas() RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT json_agg(row_to_json(f)) FROM facturas f);
+END;
+$$;
+
+
+--
+-- Name: fn_listar_mascotas(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_mascotas() RETURNS json
+    LANGUAGE plpgsql
+    AS $$BEGIN
+  RETURN (
+    SELECT json_agg(
+      json_build_object(
+        'id', m.id,
+        'nombre', m.nombre,
+        'edad', m.edad,
+        'peso', m.peso,
+        'cliente', json_build_object(
+            'id', c.id,
+            'nombre', c.nombre
+        ),
+        'raza', json_build_object(
+            'id', r.id,
+            'nombre', r.nombre
+        )
+      )
+    )
+    FROM mascotas m
+    LEFT JOIN clientes c ON c.id = m.cliente_id
+    LEFT JOIN razas r ON r.id = m.raza_id
+  );
+END;
+$$;
+
+
+--
+-- Name: fn_listar_medicamentos(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_medicamentos() RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (
+        SELECT json_agg(row_to_json(m))
+        FROM medicamentos m
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_listar_medicamentos_consulta(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_medicamentos_consulta(p_consulta_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (
+        SELECT json_agg(json_build_object(
+            'id', m.id,
+            'nombre', m.nombre,
+            'precio', m.precio,
+            'cantidad', cm.cantidad
+        ))
+        FROM consulta_medicamentos cm
+        JOIN medicamentos m ON m.id = cm.medicamento_id
+        WHERE cm.consulta_id = p_consulta_id
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_listar_razas(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_razas() RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT json_agg(row_to_json(r)) FROM razas r);
+END;
+$$;
+
+
+--
+-- Name: fn_listar_usuarios(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_listar_usuarios() RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT json_agg(row_to_json(u)) FROM usuarios u);
+END;
+$$;
+
+
+--
+-- Name: fn_mascotas_por_cliente(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_mascotas_por_cliente(p_cliente_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$DECLARE
+    resultado JSON;
+BEGIN
+    SELECT json_agg(json_build_object(
+        'id', m.id,
+        'nombre', m.nombre,
+        'raza_id', m.raza_id,
+        'edad', m.edad,
+        'peso', m.peso,
+        'cliente_id', m.cliente_id        -- 👈 AGREGADO
+    ))
+    INTO resultado
+    FROM mascotas m
+    WHERE m.cliente_id = p_cliente_id;
+
+    -- Si el cliente no tiene mascotas
+    IF resultado IS NULL THEN
+        RETURN json_build_object(
+            'status', 'empty',
+            'message', 'El cliente no tiene mascotas registradas'
+        );
+    END IF;
+
+    RETURN resultado;
+END;
+$$;
+
+
+--
+-- Name: fn_obtener_cita(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_obtener_cita(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT row_to_json(c) FROM citas c WHERE c.id = p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_obtener_cliente(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_obtener_cliente(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT row_to_json(c) FROM clientes c WHERE c.id = p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_obtener_consulta(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_obtener_consulta(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT row_to_json(c) FROM consultas c WHERE c.id = p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_obtener_factura(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_obtener_factura(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT row_to_json(f) FROM facturas f WHERE f.id = p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_obtener_mascota(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_obtener_mascota(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT row_to_json(m) FROM mascotas m WHERE m.id = p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_obtener_medicamento(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_obtener_medicamento(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (
+        SELECT row_to_json(m)
+        FROM medicamentos m
+        WHERE m.id = p_id
+    );
+END;
+$$;
+
+
+--
+-- Name: fn_obtener_raza(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_obtener_raza(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT row_to_json(r) FROM razas r WHERE r.id = p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_obtener_usuario(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_obtener_usuario(p_id integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (SELECT row_to_json(u) FROM usuarios u WHERE u.id = p_id);
+END;
+$$;
+
+
+--
+-- Name: fn_prevenir_citas_duplicadas(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_prevenir_citas_duplicadas() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+DECLARE existe INT;
+BEGIN
+    SELECT 1 INTO existe
+    FROM citas
+    WHERE fecha = NEW.fecha
+      AND hora = NEW.hora
+      AND veterinario_id = NEW.veterinario_id
+      AND id <> COALESCE(NEW.id, 0)
+    LIMIT 1;
+
+    IF existe = 1 THEN
+        RAISE EXCEPTION 'El veterinario ya tiene una cita en esta fecha y hora.';
+    END IF;
+
+    RETURN NEW;
+END;
+$$;
+
+
+--
+-- Name: fn_recalcular_total_consulta(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_recalcular_total_consulta() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+DECLARE total NUMERIC(10,2);
+DECLARE consulta_id INT;
+BEGIN
+    -- Detecta el id de la consulta dependiendo del tipo de operación
+    IF TG_OP = 'DELETE' THEN
+        consulta_id = OLD.consulta_id;
+    ELSE
+        consulta_id = NEW.consulta_id;
+    END IF;
+
+    -- Calcula el nuevo total
+    SELECT COALESCE(SUM(m.precio * cm.cantidad), 0) INTO total
+    FROM consulta_medicamentos cm
+    JOIN medicamentos m ON m.id = cm.medicamento_id
+    WHERE cm.consulta_id = consulta_id;
+
+    -- Actualiza la consulta
+    UPDATE consultas
+    SET total = total,
+        updated_at = now()
+    WHERE id = consulta_id;
+
+    RETURN NEW;
+END;
+$$;
+
+
+--
+-- Name: fn_recalcular_total_consulta(integer); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_recalcular_total_consulta(p_consulta_id integer) RETURNS numeric
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_total NUMERIC := 0;
+BEGIN
+    SELECT COALESCE(SUM(m.precio * cm.cantidad), 0)
+    INTO v_total
+    FROM consulta_medicamentos cm
+    JOIN medicamentos m ON m.id = cm.medicamento_id
+    WHERE cm.consulta_id = p_consulta_id;  -- ← aquí el cambio
+
+    UPDATE consultas
+    SET total = v_total,
+        updated_at = NOW()
+    WHERE id = p_consulta_id;
+
+    RETURN v_total;
+END;
+$$;
+
+
+--
+-- Name: fn_set_updated_at(); Type: FUNCTION; Schema: public
+--
+
+CREATE FUNCTION public.fn_set_updated_at() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+
+--
+-- Name: citas; Type: TABLE; Schema: public
+--
+
+CREATE TABLE public.citas (
+    id integer NOT NULL,
+    fecha date NOT NULL,
+    hora time without time zone NOT NULL,
+    veterinario_id integer NOT NULL,
+    estado character varying(20) DEFAULT 'pendiente'::character varying,
+    created_at timestamp without time zone DEFAULT now(),
+    updated_at timestamp without time zone DEFAULT now(),
+    CONSTRAINT citas_estado_check CHECK (((estado)::text = ANY ((ARRAY['pendiente'::character varying, 'completada'::character varying, 'cancelada'::character varying])::text[])))
+);
+
+
+--
+-- Name: citas_id_seq; Type: SEQUENCE; Schema: public
+--
+
+CREATE SEQUENCE public.citas_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: citas_id_seq; Type: SEQUENCE OWNED BY; Schema: public
+--
+
+ALTER SEQUENCE public.citas_id_seq OWNED BY public.citas.id;
+
+
+--
+-- Name: clientes; Type: TABLE; Schema: public
+--
+
+CREATE TABLE public.clientes (
+    id integer NOT NULL,
+    nombre character varying(100) NOT NULL,
+    telefono character varying(20),
+    direccion text,
+    created_at timestamp without time zone DEFAULT now(),
+    updated_at timestamp without time zone DEFAULT now()
+);
+
+
+--
+-- Name: clientes_id_seq; Type: SEQUENCE; Schema: public
+--
+
+CREATE SEQUENCE public.clientes_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: clientes_id_seq; Type: SEQUENCE OWNED BY; Schema: public
+--
+
+ALTER SEQUENCE public.clientes_id_seq OWNED BY public.clientes.id;
+
+
+--
+-- Name: consulta_medicamentos; Type: TABLE; Schema: public
+--
+
+CREATE TABLE public.consulta_medicamentos (
+    consulta_id integer NOT NULL,
+    medicamento_id integer NOT NULL,
+    cantidad integer NOT NULL,
+    updated_at timestamp without time zone DEFAULT now()
+);
+
+
+--
+-- Name: consultas; Type: TABLE; Schema: public
+--
+
+CREATE TABLE public.consultas (
+    id integer NOT NULL,
+    cita_id integer NOT NULL,
+    cliente_id integer NOT NULL,
+    mascota_id integer NOT NULL,
+    veterinario_id integer NOT NULL,
+    diagnostico text,
+    total numeric(10,2) DEFAULT 0,
+    created_at timestamp without time zone DEFAULT now(),
+    updated_at timestamp without time zone DEFAULT now()
+);
+
+
+--
+-- Name: consultas_id_seq; Type: SEQUENCE; Schema: public
+--
+
+CREATE SEQUENCE public.consultas_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: consultas_id_seq; Type: SEQUENCE OWNED BY; Schema: public
+--
+
+ALTER SEQUENCE public.consultas_id_seq OWNED BY public.consultas.id;
+
+
+--
+-- Name: facturas; Type: TABLE; Schema: public
+--
+
+CREATE TABLE public.facturas (
+    id integer NOT NULL,
+    consulta_id integer NOT NULL,
+    total numeric(10,2) NOT NULL,
+    fecha timestamp without time zone DEFAULT now(),
+    updated_at timestamp without time zone DEFAULT now()
+);
+
+
+--
+-- Name: facturas_id_seq; Type: SEQUENCE; Schema: public
+--
+
+CREATE SEQUENCE public.facturas_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: facturas_id_seq; Type: SEQUENCE OWNED BY; Schema: public
+--
+
+ALTER SEQUENCE public.facturas_id_seq OWNED BY public.facturas.id;
+
+
+--
+-- Name: mascotas; Type: TABLE; Schema: public
+--
+
+CREATE TABLE public.mascotas (
+    id integer NOT NULL,
+    cliente_id integer NOT NULL,
+    raza_id integer NOT NULL,
+    nombre character varying(100) NOT NULL,
+    edad integer,
+    peso numeric(5,2),
+    created_at timestamp without time zone DEFAULT now(),
+    updated_at timestamp without time zone DEFAULT now()
+);
+
+
+--
+-- Name: mascotas_id_seq; Type: SEQUENCE; Schema: public
+--
+
+CREATE SEQUENCE public.mascotas_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: mascotas_id_seq; Type: SEQUENCE OWNED BY; Schema: public
+--
+
+ALTER SEQUENCE public.mascotas_id_seq OWNED BY public.mascotas.id;
+
+
+--
+-- Name: medicamentos; Type: TABLE; Schema: public
+--
+
+CREATE TABLE public.medicamentos (
+    id integer NOT NULL,
+    nombre character varying(100) NOT NULL,
+    precio numeric(10,2) NOT NULL,
+    created_at timestamp without time zone DEFAULT now(),
+    updated_at timestamp without time zone DEFAULT now()
+);
+
+
+--
+-- Name: medicamentos_id_seq; Type: SEQUENCE; Schema: public
+--
+
+CREATE SEQUENCE public.medicamentos_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: medicamentos_id_seq; Type: SEQUENCE OWNED BY; Schema: public
+--
+
+ALTER SEQUENCE public.medicamentos_id_seq OWNED BY public.medicamentos.id;
+
+
+--
+-- Name: razas; Type: TABLE; Schema: public
+--
+
+CREATE TABLE public.razas (
+    id integer NOT NULL,
+    nombre character varying(100) NOT NULL,
+    descripcion text,
+    created_at timestamp without time zone DEFAULT now(),
+    updated_at timestamp without time zone DEFAULT now()
+);
+
+
+--
+-- Name: razas_id_seq; Type: SEQUENCE; Schema: public
+--
+
+CREATE SEQUENCE public.razas_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: razas_id_seq; Type: SEQUENCE OWNED BY; Schema: public
+--
+
+ALTER SEQUENCE public.razas_id_seq OWNED BY public.razas.id;
+
+
+--
+-- Name: usuarios; Type: TABLE; Schema: public
+--
+
+CREATE TABLE public.usuarios (
+    id integer NOT NULL,
+    nombre character varying(100) NOT NULL,
+    email character varying(100) NOT NULL,
+    password_hash text NOT NULL,
+    rol character varying(20) NOT NULL,
+    created_at timestamp without time zone DEFAULT now(),
+    updated_at timestamp without time zone DEFAULT now(),
+    CONSTRAINT usuarios_rol_check CHECK (((rol)::text = ANY (ARRAY[('administrador'::character varying)::text, ('veterinario'::character varying)::text, ('secretaria'::character varying)::text])))
+);
+
+
+--
+-- Name: usuarios_id_seq; Type: SEQUENCE; Schema: public
+--
+
+CREATE SEQUENCE public.usuarios_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: usuarios_id_seq; Type: SEQUENCE OWNED BY; Schema: public
+--
+
+ALTER SEQUENCE public.usuarios_id_seq OWNED BY public.usuarios.id;
+
+
+--
+-- Name: citas id; Type: DEFAULT; Schema: public
+--
+
+ALTER TABLE ONLY public.citas ALTER COLUMN id SET DEFAULT nextval('public.citas_id_seq'::regclass);
+
+
+--
+-- Name: clientes id; Type: DEFAULT; Schema: public
+--
+
+ALTER TABLE ONLY public.clientes ALTER COLUMN id SET DEFAULT nextval('public.clientes_id_seq'::regclass);
+
+
+--
+-- Name: consultas id; Type: DEFAULT; Schema: public
+--
+
+ALTER TABLE ONLY public.consultas ALTER COLUMN id SET DEFAULT nextval('public.consultas_id_seq'::regclass);
+
+
+--
+-- Name: facturas id; Type: DEFAULT; Schema: public
+--
+
+ALTER TABLE ONLY public.facturas ALTER COLUMN id SET DEFAULT nextval('public.facturas_id_seq'::regclass);
+
+
+--
+-- Name: mascotas id; Type: DEFAULT; Schema: public
+--
+
+ALTER TABLE ONLY public.mascotas ALTER COLUMN id SET DEFAULT nextval('public.mascotas_id_seq'::regclass);
+
+
+--
+-- Name: medicamentos id; Type: DEFAULT; Schema: public
+--
+
+ALTER TABLE ONLY public.medicamentos ALTER COLUMN id SET DEFAULT nextval('public.medicamentos_id_seq'::regclass);
+
+
+--
+-- Name: razas id; Type: DEFAULT; Schema: public
+--
+
+ALTER TABLE ONLY public.razas ALTER COLUMN id SET DEFAULT nextval('public.razas_id_seq'::regclass);
+
+
+--
+-- Name: usuarios id; Type: DEFAULT; Schema: public
+--
+
+ALTER TABLE ONLY public.usuarios ALTER COLUMN id SET DEFAULT nextval('public.usuarios_id_seq'::regclass);
+
+
+--
+-- Name: citas citas_pkey; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.citas
+    ADD CONSTRAINT citas_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: clientes clientes_pkey; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.clientes
+    ADD CONSTRAINT clientes_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: consulta_medicamentos consulta_medicamentos_pkey; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.consulta_medicamentos
+    ADD CONSTRAINT consulta_medicamentos_pkey PRIMARY KEY (consulta_id, medicamento_id);
+
+
+--
+-- Name: consultas consultas_cita_id_key; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.consultas
+    ADD CONSTRAINT consultas_cita_id_key UNIQUE (cita_id);
+
+
+--
+-- Name: consultas consultas_pkey; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.consultas
+    ADD CONSTRAINT consultas_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: facturas facturas_consulta_id_key; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.facturas
+    ADD CONSTRAINT facturas_consulta_id_key UNIQUE (consulta_id);
+
+
+--
+-- Name: facturas facturas_pkey; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.facturas
+    ADD CONSTRAINT facturas_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: mascotas mascotas_pkey; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.mascotas
+    ADD CONSTRAINT mascotas_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: medicamentos medicamentos_nombre_key; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.medicamentos
+    ADD CONSTRAINT medicamentos_nombre_key UNIQUE (nombre);
+
+
+--
+-- Name: medicamentos medicamentos_pkey; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.medicamentos
+    ADD CONSTRAINT medicamentos_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: razas razas_nombre_key; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.razas
+    ADD CONSTRAINT razas_nombre_key UNIQUE (nombre);
+
+
+--
+-- Name: razas razas_pkey; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.razas
+    ADD CONSTRAINT razas_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: usuarios usuarios_email_key; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.usuarios
+    ADD CONSTRAINT usuarios_email_key UNIQUE (email);
+
+
+--
+-- Name: usuarios usuarios_pkey; Type: CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.usuarios
+    ADD CONSTRAINT usuarios_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: citas trg_cita_unica; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_cita_unica BEFORE INSERT OR UPDATE ON public.citas FOR EACH ROW EXECUTE FUNCTION public.fn_prevenir_citas_duplicadas();
+
+
+--
+-- Name: consulta_medicamentos trg_recalcular_total_consulta; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_recalcular_total_consulta AFTER INSERT OR DELETE OR UPDATE ON public.consulta_medicamentos FOR EACH ROW EXECUTE FUNCTION public.fn_recalcular_total_consulta();
+
+
+--
+-- Name: citas trg_updated_at_citas; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_updated_at_citas BEFORE UPDATE ON public.citas FOR EACH ROW EXECUTE FUNCTION public.fn_set_updated_at();
+
+
+--
+-- Name: clientes trg_updated_at_clientes; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_updated_at_clientes BEFORE UPDATE ON public.clientes FOR EACH ROW EXECUTE FUNCTION public.fn_set_updated_at();
+
+
+--
+-- Name: consulta_medicamentos trg_updated_at_consulta_medicamentos; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_updated_at_consulta_medicamentos BEFORE UPDATE ON public.consulta_medicamentos FOR EACH ROW EXECUTE FUNCTION public.fn_set_updated_at();
+
+
+--
+-- Name: consultas trg_updated_at_consultas; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_updated_at_consultas BEFORE UPDATE ON public.consultas FOR EACH ROW EXECUTE FUNCTION public.fn_set_updated_at();
+
+
+--
+-- Name: facturas trg_updated_at_facturas; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_updated_at_facturas BEFORE UPDATE ON public.facturas FOR EACH ROW EXECUTE FUNCTION public.fn_set_updated_at();
+
+
+--
+-- Name: mascotas trg_updated_at_mascotas; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_updated_at_mascotas BEFORE UPDATE ON public.mascotas FOR EACH ROW EXECUTE FUNCTION public.fn_set_updated_at();
+
+
+--
+-- Name: medicamentos trg_updated_at_medicamentos; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_updated_at_medicamentos BEFORE UPDATE ON public.medicamentos FOR EACH ROW EXECUTE FUNCTION public.fn_set_updated_at();
+
+
+--
+-- Name: razas trg_updated_at_razas; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_updated_at_razas BEFORE UPDATE ON public.razas FOR EACH ROW EXECUTE FUNCTION public.fn_set_updated_at();
+
+
+--
+-- Name: usuarios trg_updated_at_usuarios; Type: TRIGGER; Schema: public
+--
+
+CREATE TRIGGER trg_updated_at_usuarios BEFORE UPDATE ON public.usuarios FOR EACH ROW EXECUTE FUNCTION public.fn_set_updated_at();
+
+
+--
+-- Name: citas citas_veterinario_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.citas
+    ADD CONSTRAINT citas_veterinario_id_fkey FOREIGN KEY (veterinario_id) REFERENCES public.usuarios(id);
+
+
+--
+-- Name: consulta_medicamentos consulta_medicamentos_consulta_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.consulta_medicamentos
+    ADD CONSTRAINT consulta_medicamentos_consulta_id_fkey FOREIGN KEY (consulta_id) REFERENCES public.consultas(id) ON DELETE CASCADE;
+
+
+--
+-- Name: consulta_medicamentos consulta_medicamentos_medicamento_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.consulta_medicamentos
+    ADD CONSTRAINT consulta_medicamentos_medicamento_id_fkey FOREIGN KEY (medicamento_id) REFERENCES public.medicamentos(id);
+
+
+--
+-- Name: consultas consultas_cita_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.consultas
+    ADD CONSTRAINT consultas_cita_id_fkey FOREIGN KEY (cita_id) REFERENCES public.citas(id) ON DELETE CASCADE;
+
+
+--
+-- Name: consultas consultas_cliente_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.consultas
+    ADD CONSTRAINT consultas_cliente_id_fkey FOREIGN KEY (cliente_id) REFERENCES public.clientes(id);
+
+
+--
+-- Name: consultas consultas_mascota_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.consultas
+    ADD CONSTRAINT consultas_mascota_id_fkey FOREIGN KEY (mascota_id) REFERENCES public.mascotas(id);
+
+
+--
+-- Name: consultas consultas_veterinario_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.consultas
+    ADD CONSTRAINT consultas_veterinario_id_fkey FOREIGN KEY (veterinario_id) REFERENCES public.usuarios(id);
+
+
+--
+-- Name: facturas facturas_consulta_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.facturas
+    ADD CONSTRAINT facturas_consulta_id_fkey FOREIGN KEY (consulta_id) REFERENCES public.consultas(id);
+
+
+--
+-- Name: mascotas mascotas_cliente_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.mascotas
+    ADD CONSTRAINT mascotas_cliente_id_fkey FOREIGN KEY (cliente_id) REFERENCES public.clientes(id) ON DELETE CASCADE;
+
+
+--
+-- Name: mascotas mascotas_raza_id_fkey; Type: FK CONSTRAINT; Schema: public
+--
+
+ALTER TABLE ONLY public.mascotas
+    ADD CONSTRAINT mascotas_raza_id_fkey FOREIGN KEY (raza_id) REFERENCES public.razas(id);
+
+
+--
+-- Name: SCHEMA public; Type: ACL; Schema: -
+--
+
+GRANT USAGE ON SCHEMA public TO administrador;
+GRANT USAGE ON SCHEMA public TO secretaria;
+GRANT USAGE ON SCHEMA public TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_actualizar_cita(p_id integer, p_fecha date, p_hora time without time zone, p_veterinario_id integer, p_estado text); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_actualizar_cita(p_id integer, p_fecha date, p_hora time without time zone, p_veterinario_id integer, p_estado text) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_cita(p_id integer, p_fecha date, p_hora time without time zone, p_veterinario_id integer, p_estado text) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_actualizar_cita(p_id integer, p_fecha date, p_hora time without time zone, p_veterinario_id integer, p_estado text) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_actualizar_cliente(p_id integer, p_nombre text, p_telefono text, p_direccion text); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_actualizar_cliente(p_id integer, p_nombre text, p_telefono text, p_direccion text) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_cliente(p_id integer, p_nombre text, p_telefono text, p_direccion text) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_actualizar_cliente(p_id integer, p_nombre text, p_telefono text, p_direccion text) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_actualizar_consulta(p_id integer, p_cliente_id integer, p_mascota_id integer, p_diagnostico text, p_total numeric); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_actualizar_consulta(p_id integer, p_cliente_id integer, p_mascota_id integer, p_diagnostico text, p_total numeric) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_consulta(p_id integer, p_cliente_id integer, p_mascota_id integer, p_diagnostico text, p_total numeric) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_actualizar_consulta(p_id integer, p_cliente_id integer, p_mascota_id integer, p_diagnostico text, p_total numeric) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_actualizar_factura(p_id integer, p_total numeric); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_actualizar_factura(p_id integer, p_total numeric) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_factura(p_id integer, p_total numeric) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_actualizar_factura(p_id integer, p_total numeric) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_actualizar_mascota(p_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_actualizar_mascota(p_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_mascota(p_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_actualizar_mascota(p_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_actualizar_medicamento(p_id integer, p_nombre text, p_precio numeric); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_actualizar_medicamento(p_id integer, p_nombre text, p_precio numeric) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_medicamento(p_id integer, p_nombre text, p_precio numeric) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_actualizar_medicamento(p_id integer, p_nombre text, p_precio numeric) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_actualizar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_actualizar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_actualizar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_actualizar_raza(p_id integer, p_nombre text, p_descripcion text); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_actualizar_raza(p_id integer, p_nombre text, p_descripcion text) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_raza(p_id integer, p_nombre text, p_descripcion text) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_actualizar_raza(p_id integer, p_nombre text, p_descripcion text) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_actualizar_usuario(p_id integer, p_nombre text, p_email text, p_password_hash text, p_rol text); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_actualizar_usuario(p_id integer, p_nombre text, p_email text, p_password_hash text, p_rol text) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_usuario(p_id integer, p_nombre text, p_email text, p_password_hash text, p_rol text) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_actualizar_usuario(p_id integer, p_nombre text, p_email text, p_password_hash text, p_rol text) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_agregar_medicamento_a_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_agregar_medicamento_a_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_agregar_medicamento_a_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_agregar_medicamento_a_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_agregar_medicamento_a_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_crear_cita(p_fecha date, p_hora time without time zone, p_veterinario_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_crear_cita(p_fecha date, p_hora time without time zone, p_veterinario_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_cita(p_fecha date, p_hora time without time zone, p_veterinario_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_cita(p_fecha date, p_hora time without time zone, p_veterinario_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_crear_cita(p_fecha date, p_hora time without time zone, p_veterinario_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_crear_cliente(p_nombre text, p_telefono text, p_direccion text); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_crear_cliente(p_nombre text, p_telefono text, p_direccion text) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_cliente(p_nombre text, p_telefono text, p_direccion text) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_cliente(p_nombre text, p_telefono text, p_direccion text) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_crear_cliente(p_nombre text, p_telefono text, p_direccion text) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_crear_consulta(p_cita_id integer, p_cliente_id integer, p_mascota_id integer, p_veterinario_id integer, p_diagnostico text, p_total numeric); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_crear_consulta(p_cita_id integer, p_cliente_id integer, p_mascota_id integer, p_veterinario_id integer, p_diagnostico text, p_total numeric) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_consulta(p_cita_id integer, p_cliente_id integer, p_mascota_id integer, p_veterinario_id integer, p_diagnostico text, p_total numeric) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_consulta(p_cita_id integer, p_cliente_id integer, p_mascota_id integer, p_veterinario_id integer, p_diagnostico text, p_total numeric) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_crear_consulta(p_cita_id integer, p_cliente_id integer, p_mascota_id integer, p_veterinario_id integer, p_diagnostico text, p_total numeric) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_crear_factura(p_consulta_id integer, p_total numeric); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_crear_factura(p_consulta_id integer, p_total numeric) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_factura(p_consulta_id integer, p_total numeric) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_factura(p_consulta_id integer, p_total numeric) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_crear_factura(p_consulta_id integer, p_total numeric) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_crear_mascota(p_cliente_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_crear_mascota(p_cliente_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_mascota(p_cliente_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_mascota(p_cliente_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_crear_mascota(p_cliente_id integer, p_raza_id integer, p_nombre text, p_edad integer, p_peso numeric) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_crear_medicamento(p_nombre text, p_precio numeric); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_crear_medicamento(p_nombre text, p_precio numeric) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_medicamento(p_nombre text, p_precio numeric) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_medicamento(p_nombre text, p_precio numeric) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_crear_medicamento(p_nombre text, p_precio numeric) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_crear_raza(p_nombre text, p_descripcion text); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_crear_raza(p_nombre text, p_descripcion text) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_raza(p_nombre text, p_descripcion text) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_raza(p_nombre text, p_descripcion text) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_crear_raza(p_nombre text, p_descripcion text) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_crear_usuario(p_nombre text, p_email text, p_password_hash text, p_rol text); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_crear_usuario(p_nombre text, p_email text, p_password_hash text, p_rol text) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_usuario(p_nombre text, p_email text, p_password_hash text, p_rol text) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_usuario(p_nombre text, p_email text, p_password_hash text, p_rol text) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_crear_usuario(p_nombre text, p_email text, p_password_hash text, p_rol text) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_eliminar_cita(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_eliminar_cita(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_eliminar_cita(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_eliminar_cita(p_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_eliminar_cita(p_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_eliminar_cliente(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_eliminar_cliente(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_eliminar_cliente(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_eliminar_cliente(p_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_eliminar_cliente(p_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_eliminar_consulta(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_eliminar_consulta(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_eliminar_consulta(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_eliminar_consulta(p_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_eliminar_consulta(p_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_eliminar_factura(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_eliminar_factura(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_eliminar_factura(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_eliminar_factura(p_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_eliminar_factura(p_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_eliminar_mascota(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_eliminar_mascota(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_eliminar_mascota(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_eliminar_mascota(p_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_eliminar_mascota(p_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_eliminar_medicamento(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_eliminar_medicamento(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_eliminar_medicamento(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_eliminar_medicamento(p_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_eliminar_medicamento(p_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_eliminar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_eliminar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_eliminar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_eliminar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_eliminar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_eliminar_raza(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_eliminar_raza(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_eliminar_raza(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_eliminar_raza(p_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_eliminar_raza(p_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_eliminar_usuario(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_eliminar_usuario(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_eliminar_usuario(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_eliminar_usuario(p_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_eliminar_usuario(p_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_listar_citas(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_listar_citas() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_citas() TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_citas() TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_citas() TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_listar_citas_por_veterinario(p_veterinario_id integer); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_listar_citas_por_veterinario(p_veterinario_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_citas_por_veterinario(p_veterinario_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_citas_por_veterinario(p_veterinario_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_listar_clientes(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_listar_clientes() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_clientes() TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_clientes() TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_clientes() TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_listar_consultas(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_listar_consultas() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_consultas() TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_consultas() TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_consultas() TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_listar_facturas(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_listar_facturas() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_facturas() TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_facturas() TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_facturas() TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_listar_mascotas(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_listar_mascotas() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_mascotas() TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_mascotas() TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_mascotas() TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_listar_medicamentos(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_listar_medicamentos() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_medicamentos() TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_medicamentos() TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_medicamentos() TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_listar_medicamentos_consulta(p_consulta_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_listar_medicamentos_consulta(p_consulta_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_medicamentos_consulta(p_consulta_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_medicamentos_consulta(p_consulta_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_listar_medicamentos_consulta(p_consulta_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_listar_razas(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_listar_razas() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_razas() TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_razas() TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_razas() TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_listar_usuarios(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_listar_usuarios() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_usuarios() TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_usuarios() TO veterinario;
+GRANT ALL ON FUNCTION public.fn_listar_usuarios() TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_mascotas_por_cliente(p_cliente_id integer); Type: ACL; Schema: public
+--
+
+GRANT ALL ON FUNCTION public.fn_mascotas_por_cliente(p_cliente_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_mascotas_por_cliente(p_cliente_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_mascotas_por_cliente(p_cliente_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_obtener_cita(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_obtener_cita(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_cita(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_cita(p_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_obtener_cita(p_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_obtener_cliente(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_obtener_cliente(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_cliente(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_cliente(p_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_obtener_cliente(p_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_obtener_consulta(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_obtener_consulta(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_consulta(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_consulta(p_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_obtener_consulta(p_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_obtener_factura(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_obtener_factura(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_factura(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_factura(p_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_obtener_factura(p_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_obtener_mascota(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_obtener_mascota(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_mascota(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_mascota(p_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_obtener_mascota(p_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_obtener_medicamento(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_obtener_medicamento(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_medicamento(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_medicamento(p_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_obtener_medicamento(p_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_obtener_raza(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_obtener_raza(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_raza(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_raza(p_id integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_obtener_raza(p_id integer) TO veterinario;
+
+
+--
+-- Name: FUNCTION fn_obtener_usuario(p_id integer); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_obtener_usuario(p_id integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_usuario(p_id integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_usuario(p_id integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_obtener_usuario(p_id integer) TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_prevenir_citas_duplicadas(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_prevenir_citas_duplicadas() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_prevenir_citas_duplicadas() TO administrador;
+GRANT ALL ON FUNCTION public.fn_prevenir_citas_duplicadas() TO veterinario;
+GRANT ALL ON FUNCTION public.fn_prevenir_citas_duplicadas() TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_recalcular_total_consulta(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_recalcular_total_consulta() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_recalcular_total_consulta() TO administrador;
+GRANT ALL ON FUNCTION public.fn_recalcular_total_consulta() TO veterinario;
+GRANT ALL ON FUNCTION public.fn_recalcular_total_consulta() TO secretaria;
+
+
+--
+-- Name: FUNCTION fn_set_updated_at(); Type: ACL; Schema: public
+--
+
+REVOKE ALL ON FUNCTION public.fn_set_updated_at() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_set_updated_at() TO administrador;
+GRANT ALL ON FUNCTION public.fn_set_updated_at() TO veterinario;
+GRANT ALL ON FUNCTION public.fn_set_updated_at() TO secretaria;
+
+
+--
+-- Name: TABLE citas; Type: ACL; Schema: public
+--
+
+GRANT ALL ON TABLE public.citas TO administrador;
+GRANT SELECT,INSERT,DELETE,UPDATE ON TABLE public.citas TO secretaria;
+GRANT SELECT ON TABLE public.citas TO veterinario;
+
+
+--
+-- Name: COLUMN citas.estado; Type: ACL; Schema: public
+--
+
+GRANT UPDATE(estado) ON TABLE public.citas TO veterinario;
+
+
+--
+-- Name: SEQUENCE citas_id_seq; Type: ACL; Schema: public
+--
+
+GRANT ALL ON SEQUENCE public.citas_id_seq TO administrador;
+GRANT SELECT,USAGE ON SEQUENCE public.citas_id_seq TO secretaria;
+GRANT SELECT,USAGE ON SEQUENCE public.citas_id_seq TO veterinario;
+
+
+--
+-- Name: TABLE clientes; Type: ACL; Schema: public
+--
+
+GRANT ALL ON TABLE public.clientes TO administrador;
+GRANT SELECT ON TABLE public.clientes TO secretaria;
+GRANT SELECT,INSERT,DELETE,UPDATE ON TABLE public.clientes TO veterinario;
+
+
+--
+-- Name: SEQUENCE clientes_id_seq; Type: ACL; Schema: public
+--
+
+GRANT ALL ON SEQUENCE public.clientes_id_seq TO administrador;
+GRANT SELECT,USAGE ON SEQUENCE public.clientes_id_seq TO secretaria;
+GRANT SELECT,USAGE ON SEQUENCE public.clientes_id_seq TO veterinario;
+
+
+--
+-- Name: TABLE consulta_medicamentos; Type: ACL; Schema: public
+--
+
+GRANT ALL ON TABLE public.consulta_medicamentos TO administrador;
+GRANT SELECT ON TABLE public.consulta_medicamentos TO secretaria;
+GRANT SELECT,INSERT,DELETE,UPDATE ON TABLE public.consulta_medicamentos TO veterinario;
+
+
+--
+-- Name: TABLE consultas; Type: ACL; Schema: public
+--
+
+GRANT ALL ON TABLE public.consultas TO administrador;
+GRANT SELECT ON TABLE public.consultas TO secretaria;
+GRANT SELECT,INSERT,DELETE,UPDATE ON TABLE public.consultas TO veterinario;
+
+
+--
+-- Name: SEQUENCE consultas_id_seq; Type: ACL; Schema: public
+--
+
+GRANT ALL ON SEQUENCE public.consultas_id_seq TO administrador;
+GRANT SELECT,USAGE ON SEQUENCE public.consultas_id_seq TO secretaria;
+GRANT SELECT,USAGE ON SEQUENCE public.consultas_id_seq TO veterinario;
+
+
+--
+-- Name: TABLE facturas; Type: ACL; Schema: public
+--
+
+GRANT ALL ON TABLE public.facturas TO administrador;
+GRANT SELECT,INSERT,DELETE,UPDATE ON TABLE public.facturas TO secretaria;
+GRANT SELECT ON TABLE public.facturas TO veterinario;
+
+
+--
+-- Name: SEQUENCE facturas_id_seq; Type: ACL; Schema: public
+--
+
+GRANT ALL ON SEQUENCE public.facturas_id_seq TO administrador;
+GRANT SELECT,USAGE ON SEQUENCE public.facturas_id_seq TO secretaria;
+GRANT SELECT,USAGE ON SEQUENCE public.facturas_id_seq TO veterinario;
+
+
+--
+-- Name: TABLE mascotas; Type: ACL; Schema: public
+--
+
+GRANT ALL ON TABLE public.mascotas TO administrador;
+GRANT SELECT ON TABLE public.mascotas TO secretaria;
+GRANT SELECT,INSERT,DELETE,UPDATE ON TABLE public.mascotas TO veterinario;
+
+
+--
+-- Name: SEQUENCE mascotas_id_seq; Type: ACL; Schema: public
+--
+
+GRANT ALL ON SEQUENCE public.mascotas_id_seq TO administrador;
+GRANT SELECT,USAGE ON SEQUENCE public.mascotas_id_seq TO secretaria;
+GRANT SELECT,USAGE ON SEQUENCE public.mascotas_id_seq TO veterinario;
+
+
+--
+-- Name: TABLE medicamentos; Type: ACL; Schema: public
+--
+
+GRANT ALL ON TABLE public.medicamentos TO administrador;
+GRANT SELECT ON TABLE public.medicamentos TO secretaria;
+GRANT SELECT ON TABLE public.medicamentos TO veterinario;
+
+
+--
+-- Name: SEQUENCE medicamentos_id_seq; Type: ACL; Schema: public
+--
+
+GRANT ALL ON SEQUENCE public.medicamentos_id_seq TO administrador;
+GRANT SELECT,USAGE ON SEQUENCE public.medicamentos_id_seq TO secretaria;
+GRANT SELECT,USAGE ON SEQUENCE public.medicamentos_id_seq TO veterinario;
+
+
+--
+-- Name: TABLE razas; Type: ACL; Schema: public
+--
+
+GRANT ALL ON TABLE public.razas TO administrador;
+GRANT SELECT ON TABLE public.razas TO secretaria;
+GRANT SELECT ON TABLE public.razas TO veterinario;
+
+
+--
+-- Name: SEQUENCE razas_id_seq; Type: ACL; Schema: public
+--
+
+GRANT ALL ON SEQUENCE public.razas_id_seq TO administrador;
+GRANT SELECT,USAGE ON SEQUENCE public.razas_id_seq TO secretaria;
+GRANT SELECT,USAGE ON SEQUENCE public.razas_id_seq TO veterinario;
+
+
+--
+-- Name: TABLE usuarios; Type: ACL; Schema: public
+--
+
+GRANT ALL ON TABLE public.usuarios TO administrador;
+GRANT SELECT ON TABLE public.usuarios TO secretaria;
+
+
+--
+-- Name: SEQUENCE usuarios_id_seq; Type: ACL; Schema: public
+--
+
+GRANT ALL ON SEQUENCE public.usuarios_id_seq TO administrador;
+GRANT SELECT,USAGE ON SEQUENCE public.usuarios_id_seq TO secretaria;
+GRANT SELECT,USAGE ON SEQUENCE public.usuarios_id_seq TO veterinario;
@@ -0,0 +1,169 @@
+-- Listados paginados por keyset (cursor).
+-- Cada función recibe la clave de la última fila de la página anterior
+-- (NULL para la primera página) y devuelve como máximo p_limite filas.
+
+-- CITAS: orden (fecha, hora, id)
+CREATE INDEX IF NOT EXISTS idx_citas_fecha_hora_id ON public.citas (fecha, hora, id);
+
+CREATE OR REPLACE FUNCTION public.fn_listar_citas_pagina(p_fecha date, p_hora time without time zone, p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(
+        json_build_object(
+            'id', c.id,
+            'fecha', c.fecha,
+            'hora', c.hora,
+            'estado', c.estado,
+            'veterinario', json_build_object(
+                'id', u.id,
+                'nombre', u.nombre
+            )
+        ) ORDER BY c.fecha, c.hora, c.id
+    ), '[]'::json)
+    FROM (
+        SELECT *
+        FROM citas
+        WHERE (fecha, hora, id) > (COALESCE(p_fecha, '-infinity'::date), COALESCE(p_hora, '00:00'::time), COALESCE(p_id, 0))
+        ORDER BY fecha, hora, id
+        LIMIT p_limite
+    ) c
+    LEFT JOIN usuarios u ON u.id = c.veterinario_id;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_listar_citas_por_veterinario_pagina(p_veterinario_id integer, p_fecha date, p_hora time without time zone, p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(c) ORDER BY c.fecha, c.hora, c.id), '[]'::json)
+    FROM (
+        SELECT *
+        FROM citas
+        WHERE veterinario_id = p_veterinario_id
+          AND (fecha, hora, id) > (COALESCE(p_fecha, '-infinity'::date), COALESCE(p_hora, '00:00'::time), COALESCE(p_id, 0))
+        ORDER BY fecha, hora, id
+        LIMIT p_limite
+    ) c;
+$$;
+
+-- RESTO DE LISTADOS: orden por id
+CREATE OR REPLACE FUNCTION public.fn_listar_clientes_pagina(p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(c) ORDER BY c.id), '[]'::json)
+    FROM (
+        SELECT * FROM clientes WHERE id > COALESCE(p_id, 0) ORDER BY id LIMIT p_limite
+    ) c;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_listar_consultas_pagina(p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(c) ORDER BY c.id), '[]'::json)
+    FROM (
+        SELECT * FROM consultas WHERE id > COALESCE(p_id, 0) ORDER BY id LIMIT p_limite
+    ) c;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_listar_facturas_pagina(p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(f) ORDER BY f.id), '[]'::json)
+    FROM (
+        SELECT * FROM facturas WHERE id > COALESCE(p_id, 0) ORDER BY id LIMIT p_limite
+    ) f;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_listar_mascotas_pagina(p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(
+        json_build_object(
+            'id', m.id,
+            'nombre', m.nombre,
+            'edad', m.edad,
+            'peso', m.peso,
+            'cliente', json_build_object(
+                'id', c.id,
+                'nombre', c.nombre
+            ),
+            'raza', json_build_object(
+                'id', r.id,
+                'nombre', r.nombre
+            )
+        ) ORDER BY m.id
+    ), '[]'::json)
+    FROM (
+        SELECT * FROM mascotas WHERE id > COALESCE(p_id, 0) ORDER BY id LIMIT p_limite
+    ) m
+    LEFT JOIN clientes c ON c.id = m.cliente_id
+    LEFT JOIN razas r ON r.id = m.raza_id;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_listar_medicamentos_pagina(p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(m) ORDER BY m.id), '[]'::json)
+    FROM (
+        SELECT * FROM medicamentos WHERE id > COALESCE(p_id, 0) ORDER BY id LIMIT p_limite
+    ) m;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_listar_razas_pagina(p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(r) ORDER BY r.id), '[]'::json)
+    FROM (
+        SELECT * FROM razas WHERE id > COALESCE(p_id, 0) ORDER BY id LIMIT p_limite
+    ) r;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_listar_usuarios_pagina(p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(u) ORDER BY u.id), '[]'::json)
+    FROM (
+        SELECT * FROM usuarios WHERE id > COALESCE(p_id, 0) ORDER BY id LIMIT p_limite
+    ) u;
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_listar_citas_pagina(date, time without time zone, integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_citas_pagina(date, time without time zone, integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_citas_pagina(date, time without time zone, integer, integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_citas_pagina(date, time without time zone, integer, integer) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_listar_citas_por_veterinario_pagina(integer, date, time without time zone, integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_citas_por_veterinario_pagina(integer, date, time without time zone, integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_citas_por_veterinario_pagina(integer, date, time without time zone, integer, integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_citas_por_veterinario_pagina(integer, date, time without time zone, integer, integer) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_listar_clientes_pagina(integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_clientes_pagina(integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_clientes_pagina(integer, integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_clientes_pagina(integer, integer) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_listar_consultas_pagina(integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_consultas_pagina(integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_consultas_pagina(integer, integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_consultas_pagina(integer, integer) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_listar_facturas_pagina(integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_facturas_pagina(integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_facturas_pagina(integer, integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_facturas_pagina(integer, integer) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_listar_mascotas_pagina(integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_mascotas_pagina(integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_mascotas_pagina(integer, integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_mascotas_pagina(integer, integer) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_listar_medicamentos_pagina(integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_medicamentos_pagina(integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_medicamentos_pagina(integer, integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_medicamentos_pagina(integer, integer) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_listar_razas_pagina(integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_razas_pagina(integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_listar_razas_pagina(integer, integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_listar_razas_pagina(integer, integer) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_listar_usuarios_pagina(integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_listar_usuarios_pagina(integer, integer) TO administrador;
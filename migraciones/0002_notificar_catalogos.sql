@@ -0,0 +1,22 @@
+-- Aviso a los workers cuando cambian los catálogos (razas, medicamentos).
+-- El payload es el nombre de la tabla; la API hace LISTEN catalogos e invalida su caché.
+-- Un solo NOTIFY por sentencia, y PostgreSQL lo entrega recién al hacer COMMIT.
+
+CREATE OR REPLACE FUNCTION public.fn_notificar_catalogo() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    PERFORM pg_notify('catalogos', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_notificar_razas ON public.razas;
+CREATE TRIGGER trg_notificar_razas
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.razas
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notificar_catalogo();
+
+DROP TRIGGER IF EXISTS trg_notificar_medicamentos ON public.medicamentos;
+CREATE TRIGGER trg_notificar_medicamentos
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.medicamentos
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notificar_catalogo();
@@ -0,0 +1,55 @@
+-- Versión por tabla para los ETag de los listados.
+-- Cada sentencia que modifica una tabla suma 1 a su versión. El UPDATE es parte
+-- de la misma transacción, así que la nueva versión se ve recién con el COMMIT.
+-- Se usa un contador y no max(updated_at) porque ese no cambia con los DELETE.
+
+CREATE TABLE IF NOT EXISTS public.tabla_versiones (
+    tabla character varying(63) PRIMARY KEY,
+    version bigint DEFAULT 0 NOT NULL
+);
+
+INSERT INTO public.tabla_versiones (tabla)
+VALUES ('citas'), ('clientes'), ('mascotas'), ('razas'), ('usuarios')
+ON CONFLICT (tabla) DO NOTHING;
+
+-- SECURITY DEFINER: los roles de la API no necesitan UPDATE sobre tabla_versiones
+CREATE OR REPLACE FUNCTION public.fn_incrementar_version_tabla() RETURNS trigger
+    LANGUAGE plpgsql SECURITY DEFINER
+    SET search_path = public
+    AS $$
+BEGIN
+    UPDATE tabla_versiones SET version = version + 1 WHERE tabla = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_incrementar_version_tabla() FROM PUBLIC;
+
+DROP TRIGGER IF EXISTS trg_version_citas ON public.citas;
+CREATE TRIGGER trg_version_citas
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.citas
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_incrementar_version_tabla();
+
+DROP TRIGGER IF EXISTS trg_version_clientes ON public.clientes;
+CREATE TRIGGER trg_version_clientes
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.clientes
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_incrementar_version_tabla();
+
+DROP TRIGGER IF EXISTS trg_version_mascotas ON public.mascotas;
+CREATE TRIGGER trg_version_mascotas
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.mascotas
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_incrementar_version_tabla();
+
+DROP TRIGGER IF EXISTS trg_version_razas ON public.razas;
+CREATE TRIGGER trg_version_razas
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.razas
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_incrementar_version_tabla();
+
+DROP TRIGGER IF EXISTS trg_version_usuarios ON public.usuarios;
+CREATE TRIGGER trg_version_usuarios
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.usuarios
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_incrementar_version_tabla();
+
+GRANT SELECT ON TABLE public.tabla_versiones TO administrador;
+GRANT SELECT ON TABLE public.tabla_versiones TO secretaria;
+GRANT SELECT ON TABLE public.tabla_versiones TO veterinario;
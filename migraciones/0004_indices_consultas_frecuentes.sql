@@ -0,0 +1,22 @@
+-- migracion: sin-transaccion
+-- Índices para los filtros más usados, creados sin bloquear escrituras.
+--   citas(veterinario_id, fecha, hora): crear_cita, fn_prevenir_citas_duplicadas y listados por veterinario
+--   consultas(mascota_id, created_at): historial de una mascota / consultas del día
+--   clientes(nombre, telefono): verificación de cliente duplicado en crear_cliente
+--   mascotas(cliente_id): fn_mascotas_por_cliente y la FK desde mascotas
+--   consulta_medicamentos(medicamento_id): FK hacia medicamentos (borrados y búsquedas por medicamento)
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_citas_veterinario_fecha_hora
+    ON public.citas (veterinario_id, fecha, hora);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_consultas_mascota_created_at
+    ON public.consultas (mascota_id, created_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_clientes_nombre_telefono
+    ON public.clientes (nombre, telefono);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mascotas_cliente_id
+    ON public.mascotas (cliente_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_consulta_medicamentos_medicamento_id
+    ON public.consulta_medicamentos (medicamento_id);
@@ -0,0 +1,165 @@
+-- Citas con duración y sin solapamientos.
+-- Cada cita ocupa [fecha + hora, fecha + hora + duracion_minutos). Una restricción
+-- de exclusión impide que dos citas no canceladas del mismo veterinario se crucen.
+-- Reemplaza al trigger trg_cita_unica, que solo detectaba la misma hora exacta y
+-- hacía una búsqueda extra por cada INSERT/UPDATE.
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE public.citas
+    ADD COLUMN duracion_minutos integer DEFAULT 30 NOT NULL;
+
+ALTER TABLE public.citas
+    ADD CONSTRAINT citas_duracion_check CHECK (duracion_minutos BETWEEN 1 AND 480);
+
+-- Citas que empiezan a la misma hora (o con menos de un minuto de diferencia)
+-- que otra del mismo veterinario: ningún recorte las separa y la restricción no
+-- podría crearse. Se detiene la migración con la lista para resolverlas a mano
+-- (cancelar o mover una de cada par).
+DO $$
+DECLARE v_lista text;
+BEGIN
+    SELECT string_agg(format('citas %s y %s (veterinario %s, %s %s)', anterior, id, veterinario_id, fecha, hora), '; ')
+    INTO v_lista
+    FROM (
+        SELECT
+            id, veterinario_id, fecha, hora,
+            LAG(id) OVER w AS anterior,
+            (fecha + hora) - LAG(fecha + hora) OVER w AS hueco
+        FROM public.citas
+        WHERE estado IS DISTINCT FROM 'cancelada'
+        WINDOW w AS (PARTITION BY veterinario_id ORDER BY fecha, hora, id)
+    ) t
+    WHERE hueco < interval '1 minute';
+
+    IF v_lista IS NOT NULL THEN
+        RAISE EXCEPTION 'Citas no canceladas duplicadas para el mismo veterinario: %', v_lista
+            USING HINT = 'Cancele o mueva una cita de cada par y vuelva a ejecutar la migración.';
+    END IF;
+END;
+$$;
+
+-- Citas existentes: si la siguiente cita del veterinario empieza antes de 30 minutos,
+-- la duración se recorta hasta ese momento para que la restricción pueda crearse.
+WITH siguientes AS (
+    SELECT
+        id,
+        LEAD(fecha + hora) OVER (PARTITION BY veterinario_id ORDER BY fecha, hora) - (fecha + hora) AS hueco
+    FROM public.citas
+    WHERE estado IS DISTINCT FROM 'cancelada'
+)
+UPDATE public.citas c
+SET duracion_minutos = GREATEST(1, floor(EXTRACT(EPOCH FROM s.hueco) / 60)::integer)
+FROM siguientes s
+WHERE s.id = c.id
+  AND s.hueco < make_interval(mins => c.duracion_minutos);
+
+ALTER TABLE public.citas
+    ADD COLUMN horario tsrange GENERATED ALWAYS AS (
+        tsrange(fecha + hora, fecha + hora + make_interval(mins => duracion_minutos), '[)')
+    ) STORED;
+
+ALTER TABLE public.citas
+    ADD CONSTRAINT citas_sin_solapamiento
+    EXCLUDE USING gist (veterinario_id WITH =, horario WITH &&)
+    WHERE (estado IS DISTINCT FROM 'cancelada');
+
+DROP TRIGGER IF EXISTS trg_cita_unica ON public.citas;
+DROP FUNCTION IF EXISTS public.fn_prevenir_citas_duplicadas();
+
+-- fn_crear_cita / fn_actualizar_cita reciben la duración.
+-- Se eliminan antes para no dejar dos versiones con distinta cantidad de argumentos.
+DROP FUNCTION IF EXISTS public.fn_crear_cita(date, time without time zone, integer);
+
+CREATE FUNCTION public.fn_crear_cita(p_fecha date, p_hora time without time zone, p_veterinario_id integer, p_duracion_minutos integer DEFAULT 30) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE c_id INT;
+BEGIN
+    INSERT INTO citas (fecha, hora, veterinario_id, duracion_minutos)
+    VALUES (p_fecha, p_hora, p_veterinario_id, COALESCE(p_duracion_minutos, 30))
+    RETURNING id INTO c_id;
+
+    RETURN json_build_object('status','success','id',c_id);
+END;
+$$;
+
+DROP FUNCTION IF EXISTS public.fn_actualizar_cita(integer, date, time without time zone, integer, text);
+
+CREATE FUNCTION public.fn_actualizar_cita(p_id integer, p_fecha date, p_hora time without time zone, p_veterinario_id integer, p_estado text, p_duracion_minutos integer DEFAULT NULL) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE citas
+    SET fecha = COALESCE(p_fecha,fecha),
+        hora = COALESCE(p_hora,hora),
+        veterinario_id = COALESCE(p_veterinario_id,veterinario_id),
+        estado = COALESCE(p_estado,estado),
+        duracion_minutos = COALESCE(p_duracion_minutos,duracion_minutos),
+        updated_at = now()
+    WHERE id = p_id;
+
+    RETURN json_build_object('status','success','id',p_id);
+END;
+$$;
+
+-- Listados: se agrega la duración a la forma que ya devolvían
+CREATE OR REPLACE FUNCTION public.fn_listar_citas() RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    RETURN (
+        SELECT json_agg(
+            json_build_object(
+                'id', c.id,
+                'fecha', c.fecha,
+                'hora', c.hora,
+                'duracion_minutos', c.duracion_minutos,
+                'estado', c.estado,
+                'veterinario', json_build_object(
+                    'id', u.id,
+                    'nombre', u.nombre
+                )
+            )
+        )
+        FROM citas c
+        LEFT JOIN usuarios u ON u.id = c.veterinario_id
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_listar_citas_pagina(p_fecha date, p_hora time without time zone, p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(
+        json_build_object(
+            'id', c.id,
+            'fecha', c.fecha,
+            'hora', c.hora,
+            'duracion_minutos', c.duracion_minutos,
+            'estado', c.estado,
+            'veterinario', json_build_object(
+                'id', u.id,
+                'nombre', u.nombre
+            )
+        ) ORDER BY c.fecha, c.hora, c.id
+    ), '[]'::json)
+    FROM (
+        SELECT *
+        FROM citas
+        WHERE (fecha, hora, id) > (COALESCE(p_fecha, '-infinity'::date), COALESCE(p_hora, '00:00'::time), COALESCE(p_id, 0))
+        ORDER BY fecha, hora, id
+        LIMIT p_limite
+    ) c
+    LEFT JOIN usuarios u ON u.id = c.veterinario_id;
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_crear_cita(date, time without time zone, integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_cita(date, time without time zone, integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_cita(date, time without time zone, integer, integer) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_crear_cita(date, time without time zone, integer, integer) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_actualizar_cita(integer, date, time without time zone, integer, text, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_actualizar_cita(integer, date, time without time zone, integer, text, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_actualizar_cita(integer, date, time without time zone, integer, text, integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_actualizar_cita(integer, date, time without time zone, integer, text, integer) TO secretaria;
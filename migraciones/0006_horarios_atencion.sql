@@ -0,0 +1,67 @@
+-- Horarios de atención para calcular la disponibilidad de los veterinarios.
+-- Filas con veterinario_id NULL: horario general de la clínica.
+-- Si un veterinario tiene filas propias, se usan solo esas.
+-- dia_semana: 1 = lunes ... 7 = domingo (ISO, igual que EXTRACT(ISODOW ...)).
+
+CREATE TABLE public.horarios_atencion (
+    id serial PRIMARY KEY,
+    veterinario_id integer REFERENCES public.usuarios(id) ON DELETE CASCADE,
+    dia_semana smallint NOT NULL CHECK (dia_semana BETWEEN 1 AND 7),
+    hora_inicio time without time zone NOT NULL,
+    hora_fin time without time zone NOT NULL,
+    CONSTRAINT horarios_atencion_rango_check CHECK (hora_fin > hora_inicio)
+);
+
+CREATE INDEX idx_horarios_atencion_veterinario ON public.horarios_atencion (veterinario_id);
+
+INSERT INTO public.horarios_atencion (veterinario_id, dia_semana, hora_inicio, hora_fin)
+SELECT NULL, d, '08:00', '18:00' FROM generate_series(1, 5) AS d
+UNION ALL
+SELECT NULL, 6, '08:00', '13:00';
+
+-- Todo lo necesario para la agenda en una sola llamada. Las citas se buscan con
+-- el operador && sobre horario, que usa el índice GiST de citas_sin_solapamiento.
+CREATE OR REPLACE FUNCTION public.fn_agenda_veterinarios(p_desde timestamp without time zone, p_hasta timestamp without time zone, p_veterinario_id integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT json_build_object(
+        'veterinarios', (
+            SELECT COALESCE(json_agg(json_build_object('id', u.id, 'nombre', u.nombre) ORDER BY u.id), '[]'::json)
+            FROM usuarios u
+            WHERE u.rol = 'veterinario'
+              AND (p_veterinario_id IS NULL OR u.id = p_veterinario_id)
+        ),
+        'horarios', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'veterinario_id', h.veterinario_id,
+                'dia_semana', h.dia_semana,
+                'hora_inicio', h.hora_inicio,
+                'hora_fin', h.hora_fin
+            ) ORDER BY h.hora_inicio), '[]'::json)
+            FROM horarios_atencion h
+            WHERE h.veterinario_id IS NULL
+               OR p_veterinario_id IS NULL
+               OR h.veterinario_id = p_veterinario_id
+        ),
+        'citas', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'veterinario_id', c.veterinario_id,
+                'inicio', lower(c.horario),
+                'fin', upper(c.horario)
+            ) ORDER BY c.veterinario_id, lower(c.horario)), '[]'::json)
+            FROM citas c
+            WHERE c.horario && tsrange(p_desde, p_hasta, '[)')
+              AND c.estado IS DISTINCT FROM 'cancelada'
+              AND (p_veterinario_id IS NULL OR c.veterinario_id = p_veterinario_id)
+        )
+    );
+$$;
+
+GRANT ALL ON TABLE public.horarios_atencion TO administrador;
+GRANT SELECT ON TABLE public.horarios_atencion TO secretaria;
+GRANT SELECT ON TABLE public.horarios_atencion TO veterinario;
+GRANT ALL ON SEQUENCE public.horarios_atencion_id_seq TO administrador;
+
+REVOKE ALL ON FUNCTION public.fn_agenda_veterinarios(timestamp without time zone, timestamp without time zone, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_agenda_veterinarios(timestamp without time zone, timestamp without time zone, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_agenda_veterinarios(timestamp without time zone, timestamp without time zone, integer) TO secretaria;
@@ -0,0 +1,114 @@
+-- Carga diaria por veterinario (citas no canceladas y minutos agendados),
+-- mantenida por trigger para que la asignación automática no recorra citas.
+
+CREATE TABLE public.carga_veterinarios (
+    veterinario_id integer NOT NULL REFERENCES public.usuarios(id) ON DELETE CASCADE,
+    fecha date NOT NULL,
+    citas integer DEFAULT 0 NOT NULL,
+    minutos integer DEFAULT 0 NOT NULL,
+    PRIMARY KEY (veterinario_id, fecha)
+);
+
+CREATE INDEX idx_carga_veterinarios_fecha ON public.carga_veterinarios (fecha);
+
+INSERT INTO public.carga_veterinarios (veterinario_id, fecha, citas, minutos)
+SELECT veterinario_id, fecha, count(*), sum(duracion_minutos)
+FROM public.citas
+WHERE estado IS DISTINCT FROM 'cancelada'
+GROUP BY veterinario_id, fecha;
+
+-- SECURITY DEFINER: secretaria/veterinario modifican citas sin tener UPDATE sobre la carga
+CREATE OR REPLACE FUNCTION public.fn_actualizar_carga_veterinario() RETURNS trigger
+    LANGUAGE plpgsql SECURITY DEFINER
+    SET search_path = public
+    AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.estado IS DISTINCT FROM 'cancelada' THEN
+        UPDATE carga_veterinarios
+        SET citas = citas - 1,
+            minutos = minutos - OLD.duracion_minutos
+        WHERE veterinario_id = OLD.veterinario_id
+          AND fecha = OLD.fecha;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.estado IS DISTINCT FROM 'cancelada' THEN
+        INSERT INTO carga_veterinarios (veterinario_id, fecha, citas, minutos)
+        VALUES (NEW.veterinario_id, NEW.fecha, 1, NEW.duracion_minutos)
+        ON CONFLICT (veterinario_id, fecha) DO UPDATE
+        SET citas = carga_veterinarios.citas + 1,
+            minutos = carga_veterinarios.minutos + EXCLUDED.minutos;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_actualizar_carga_veterinario() FROM PUBLIC;
+
+CREATE TRIGGER trg_carga_veterinario
+    AFTER INSERT OR DELETE OR UPDATE OF veterinario_id, fecha, duracion_minutos, estado ON public.citas
+    FOR EACH ROW EXECUTE FUNCTION public.fn_actualizar_carga_veterinario();
+
+-- Crea la cita con el veterinario menos cargado ese día que atienda en ese
+-- horario y no tenga otra cita que se cruce. Si otra transacción toma el hueco
+-- entre la búsqueda y el INSERT, la restricción de exclusión lo rechaza y se
+-- prueba con el siguiente candidato.
+CREATE OR REPLACE FUNCTION public.fn_crear_cita_auto(p_fecha date, p_hora time without time zone, p_duracion_minutos integer DEFAULT 30) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_duracion interval := make_interval(mins => COALESCE(p_duracion_minutos, 30));
+    v_rango tsrange := tsrange(p_fecha + p_hora, p_fecha + p_hora + v_duracion, '[)');
+    v_vet INT;
+    c_id INT;
+BEGIN
+    FOR v_vet IN
+        SELECT u.id
+        FROM usuarios u
+        LEFT JOIN carga_veterinarios cv ON cv.veterinario_id = u.id AND cv.fecha = p_fecha
+        WHERE u.rol = 'veterinario'
+          AND EXISTS (
+              SELECT 1
+              FROM horarios_atencion h
+              WHERE h.dia_semana = EXTRACT(ISODOW FROM p_fecha)
+                AND h.hora_inicio <= p_hora
+                AND p_hora + v_duracion <= h.hora_fin
+                AND p_hora + v_duracion > p_hora
+                AND (
+                    h.veterinario_id = u.id
+                    OR (h.veterinario_id IS NULL AND NOT EXISTS (
+                        SELECT 1 FROM horarios_atencion p WHERE p.veterinario_id = u.id
+                    ))
+                )
+          )
+          AND NOT EXISTS (
+              SELECT 1
+              FROM citas c
+              WHERE c.veterinario_id = u.id
+                AND c.horario && v_rango
+                AND c.estado IS DISTINCT FROM 'cancelada'
+          )
+        ORDER BY COALESCE(cv.minutos, 0), COALESCE(cv.citas, 0), u.id
+    LOOP
+        BEGIN
+            INSERT INTO citas (fecha, hora, veterinario_id, duracion_minutos)
+            VALUES (p_fecha, p_hora, v_vet, COALESCE(p_duracion_minutos, 30))
+            RETURNING id INTO c_id;
+
+            RETURN json_build_object('status','success','id',c_id,'veterinario_id',v_vet);
+        EXCEPTION WHEN exclusion_violation THEN
+            -- Otro pedido ocupó ese horario: siguiente veterinario
+            NULL;
+        END;
+    END LOOP;
+
+    RETURN json_build_object('status','error','message','No hay veterinarios disponibles en ese horario');
+END;
+$$;
+
+GRANT ALL ON TABLE public.carga_veterinarios TO administrador;
+GRANT SELECT ON TABLE public.carga_veterinarios TO secretaria;
+
+REVOKE ALL ON FUNCTION public.fn_crear_cita_auto(date, time without time zone, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_crear_cita_auto(date, time without time zone, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_crear_cita_auto(date, time without time zone, integer) TO secretaria;
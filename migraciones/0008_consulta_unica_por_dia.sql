@@ -0,0 +1,9 @@
+-- migracion: sin-transaccion
+-- Una consulta por mascota por día, garantizada por índice único en vez de un
+-- SELECT previo con DATE(created_at) (que no podía usar índices).
+-- created_at es timestamp sin zona horaria, así que created_at::date es inmutable.
+-- Si ya hay mascotas con dos consultas el mismo día, el índice no se puede crear:
+-- hay que corregir esos registros y volver a ejecutar python -m app.migraciones.
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_consultas_mascota_dia
+    ON public.consultas (mascota_id, ((created_at)::date));
@@ -0,0 +1,88 @@
+-- Total de consultas recalculado una vez por sentencia.
+-- El trigger por fila trg_recalcular_total_consulta hacía un SUM y un UPDATE de
+-- consultas por cada fila de consulta_medicamentos: 20 medicamentos = 20 recálculos.
+-- Ahora tres triggers por sentencia (los de transición admiten un solo evento)
+-- juntan las consultas afectadas y las recalculan con un único UPDATE.
+
+CREATE OR REPLACE FUNCTION public.fn_recalcular_totales_consultas(p_consulta_ids integer[]) RETURNS void
+    LANGUAGE sql
+    AS $$
+    UPDATE consultas c
+    SET total = s.total,
+        updated_at = now()
+    FROM (
+        SELECT a.id, COALESCE(SUM(m.precio * cm.cantidad), 0) AS total
+        FROM unnest(p_consulta_ids) AS a(id)
+        LEFT JOIN consulta_medicamentos cm ON cm.consulta_id = a.id
+        LEFT JOIN medicamentos m ON m.id = cm.medicamento_id
+        GROUP BY a.id
+    ) s
+    WHERE c.id = s.id;
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_recalcular_totales_sentencia() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM fn_recalcular_totales_consultas(ARRAY(SELECT DISTINCT consulta_id FROM nuevas));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM fn_recalcular_totales_consultas(ARRAY(
+            SELECT consulta_id FROM nuevas
+            UNION
+            SELECT consulta_id FROM viejas
+        ));
+    ELSE
+        PERFORM fn_recalcular_totales_consultas(ARRAY(SELECT DISTINCT consulta_id FROM viejas));
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_recalcular_total_consulta ON public.consulta_medicamentos;
+DROP FUNCTION IF EXISTS public.fn_recalcular_total_consulta();
+
+CREATE TRIGGER trg_totales_insert
+    AFTER INSERT ON public.consulta_medicamentos
+    REFERENCING NEW TABLE AS nuevas
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_recalcular_totales_sentencia();
+
+CREATE TRIGGER trg_totales_update
+    AFTER UPDATE ON public.consulta_medicamentos
+    REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_recalcular_totales_sentencia();
+
+CREATE TRIGGER trg_totales_delete
+    AFTER DELETE ON public.consulta_medicamentos
+    REFERENCING OLD TABLE AS viejas
+    FOR EACH STATEMENT EXECUTE FUNCTION public.fn_recalcular_totales_sentencia();
+
+-- El trigger ya dejó el total al día: se lee en vez de recalcularlo otra vez
+CREATE OR REPLACE FUNCTION public.fn_agregar_medicamento_consulta(p_consulta_id integer, p_medicamento_id integer, p_cantidad integer) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_total NUMERIC;
+BEGIN
+    INSERT INTO consulta_medicamentos(consulta_id, medicamento_id, cantidad)
+    VALUES (p_consulta_id, p_medicamento_id, p_cantidad)
+    ON CONFLICT (consulta_id, medicamento_id)
+    DO UPDATE SET cantidad = p_cantidad, updated_at = NOW();
+
+    SELECT total INTO v_total FROM consultas WHERE id = p_consulta_id;
+
+    RETURN json_build_object(
+        'status', 'success',
+        'total', v_total
+    );
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_recalcular_totales_consultas(integer[]) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_recalcular_totales_consultas(integer[]) TO administrador;
+GRANT ALL ON FUNCTION public.fn_recalcular_totales_consultas(integer[]) TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_recalcular_totales_sentencia() FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_recalcular_totales_sentencia() TO administrador;
+GRANT ALL ON FUNCTION public.fn_recalcular_totales_sentencia() TO veterinario;
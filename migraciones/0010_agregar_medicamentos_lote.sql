@@ -0,0 +1,54 @@
+-- Receta completa en una sola llamada: valida todas las líneas con una consulta,
+-- las inserta con un único INSERT ... SELECT y devuelve el total una vez
+-- (los triggers por sentencia de 0009 recalculan el total una sola vez).
+
+CREATE OR REPLACE FUNCTION public.fn_agregar_medicamentos_consulta(p_consulta_id integer, p_medicamento_ids integer[], p_cantidades integer[]) RETURNS json
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_faltantes integer[];
+    v_lineas integer;
+    v_total NUMERIC;
+BEGIN
+    IF cardinality(p_medicamento_ids) IS DISTINCT FROM cardinality(p_cantidades) THEN
+        RETURN json_build_object('status','error','message','Cada medicamento debe tener su cantidad');
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM consultas WHERE id = p_consulta_id) THEN
+        RETURN json_build_object('status','error','message','La consulta no existe');
+    END IF;
+
+    SELECT array_agg(l.medicamento_id ORDER BY l.medicamento_id)
+    INTO v_faltantes
+    FROM unnest(p_medicamento_ids) AS l(medicamento_id)
+    LEFT JOIN medicamentos m ON m.id = l.medicamento_id
+    WHERE m.id IS NULL;
+
+    IF v_faltantes IS NOT NULL THEN
+        RETURN json_build_object(
+            'status', 'error',
+            'message', 'No existen los medicamentos: ' || array_to_string(v_faltantes, ', ')
+        );
+    END IF;
+
+    INSERT INTO consulta_medicamentos (consulta_id, medicamento_id, cantidad)
+    SELECT p_consulta_id, l.medicamento_id, l.cantidad
+    FROM unnest(p_medicamento_ids, p_cantidades) AS l(medicamento_id, cantidad)
+    ON CONFLICT (consulta_id, medicamento_id)
+    DO UPDATE SET cantidad = EXCLUDED.cantidad, updated_at = NOW();
+
+    GET DIAGNOSTICS v_lineas = ROW_COUNT;
+
+    SELECT total INTO v_total FROM consultas WHERE id = p_consulta_id;
+
+    RETURN json_build_object(
+        'status', 'success',
+        'lineas', v_lineas,
+        'total', v_total
+    );
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_agregar_medicamentos_consulta(integer, integer[], integer[]) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_agregar_medicamentos_consulta(integer, integer[], integer[]) TO administrador;
+GRANT ALL ON FUNCTION public.fn_agregar_medicamentos_consulta(integer, integer[], integer[]) TO veterinario;
@@ -0,0 +1,68 @@
+-- Detalle completo de una consulta en un solo documento JSON: consulta, cita,
+-- mascota (con su raza), cliente, medicamentos recetados con precio y subtotal,
+-- y factura (null si todavía no se factura). Reemplaza las cuatro llamadas que
+-- hacía la pantalla de consulta.
+-- No incluye el nombre del veterinario: el rol veterinario no tiene SELECT sobre usuarios.
+
+CREATE OR REPLACE FUNCTION public.fn_obtener_consulta_detalle(p_id integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT json_build_object(
+        'id', c.id,
+        'cita_id', c.cita_id,
+        'cliente_id', c.cliente_id,
+        'mascota_id', c.mascota_id,
+        'veterinario_id', c.veterinario_id,
+        'diagnostico', c.diagnostico,
+        'total', c.total,
+        'created_at', c.created_at,
+        'updated_at', c.updated_at,
+        'cita', json_build_object(
+            'id', ci.id,
+            'fecha', ci.fecha,
+            'hora', ci.hora,
+            'estado', ci.estado
+        ),
+        'mascota', json_build_object(
+            'id', m.id,
+            'nombre', m.nombre,
+            'edad', m.edad,
+            'peso', m.peso,
+            'raza', r.nombre
+        ),
+        'cliente', json_build_object(
+            'id', cl.id,
+            'nombre', cl.nombre,
+            'telefono', cl.telefono,
+            'direccion', cl.direccion
+        ),
+        'medicamentos', COALESCE((
+            SELECT json_agg(json_build_object(
+                'id', med.id,
+                'nombre', med.nombre,
+                'precio', med.precio,
+                'cantidad', cm.cantidad,
+                'subtotal', med.precio * cm.cantidad
+            ) ORDER BY med.nombre)
+            FROM consulta_medicamentos cm
+            JOIN medicamentos med ON med.id = cm.medicamento_id
+            WHERE cm.consulta_id = c.id
+        ), '[]'::json),
+        'factura', (
+            SELECT json_build_object('id', f.id, 'total', f.total, 'fecha', f.fecha)
+            FROM facturas f
+            WHERE f.consulta_id = c.id
+        )
+    )
+    FROM consultas c
+    JOIN citas ci ON ci.id = c.cita_id
+    JOIN mascotas m ON m.id = c.mascota_id
+    JOIN razas r ON r.id = m.raza_id
+    JOIN clientes cl ON cl.id = c.cliente_id
+    WHERE c.id = p_id;
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_obtener_consulta_detalle(integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_consulta_detalle(integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_consulta_detalle(integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_obtener_consulta_detalle(integer) TO secretaria;
@@ -0,0 +1,68 @@
+-- Ficha del cliente: sus datos, sus mascotas y, por mascota, la primera página
+-- del historial de consultas (con su factura) en una sola consulta. Las páginas
+-- siguientes salen de fn_historial_mascota_pagina. Ambas recorren el índice
+-- idx_consultas_mascota_created_at (migraciones/0004) en orden descendente.
+
+-- Historial de una mascota, más reciente primero, desde la clave (created_at, id)
+CREATE OR REPLACE FUNCTION public.fn_historial_mascota_pagina(p_cliente_id integer, p_mascota_id integer, p_created_at timestamp without time zone, p_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(
+        json_build_object(
+            'id', c.id,
+            'cita_id', c.cita_id,
+            'veterinario_id', c.veterinario_id,
+            'diagnostico', c.diagnostico,
+            'total', c.total,
+            'created_at', c.created_at,
+            'factura', (
+                SELECT json_build_object('id', f.id, 'total', f.total, 'fecha', f.fecha)
+                FROM facturas f
+                WHERE f.consulta_id = c.id
+            )
+        ) ORDER BY c.created_at DESC, c.id DESC
+    ), '[]'::json)
+    FROM (
+        SELECT co.*
+        FROM consultas co
+        JOIN mascotas m ON m.id = co.mascota_id AND m.cliente_id = p_cliente_id
+        WHERE co.mascota_id = p_mascota_id
+          AND (co.created_at, co.id) < (COALESCE(p_created_at, 'infinity'::timestamp), COALESCE(p_id, 2147483647))
+        ORDER BY co.created_at DESC, co.id DESC
+        LIMIT p_limite
+    ) c;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.fn_obtener_ficha_cliente(p_cliente_id integer, p_limite integer) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT json_build_object(
+        'cliente', row_to_json(cl),
+        'mascotas', COALESCE((
+            SELECT json_agg(json_build_object(
+                'id', m.id,
+                'nombre', m.nombre,
+                'edad', m.edad,
+                'peso', m.peso,
+                'raza', r.nombre,
+                'historial', fn_historial_mascota_pagina(p_cliente_id, m.id, NULL, NULL, p_limite)
+            ) ORDER BY m.nombre, m.id)
+            FROM mascotas m
+            JOIN razas r ON r.id = m.raza_id
+            WHERE m.cliente_id = cl.id
+        ), '[]'::json)
+    )
+    FROM clientes cl
+    WHERE cl.id = p_cliente_id;
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_historial_mascota_pagina(integer, integer, timestamp without time zone, integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_historial_mascota_pagina(integer, integer, timestamp without time zone, integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_historial_mascota_pagina(integer, integer, timestamp without time zone, integer, integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_historial_mascota_pagina(integer, integer, timestamp without time zone, integer, integer) TO secretaria;
+
+REVOKE ALL ON FUNCTION public.fn_obtener_ficha_cliente(integer, integer) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_ficha_cliente(integer, integer) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_ficha_cliente(integer, integer) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_obtener_ficha_cliente(integer, integer) TO secretaria;
@@ -0,0 +1,41 @@
+-- Varias filas por id en una sola consulta (id = ANY(p_ids)), con la misma
+-- forma que fn_obtener_mascota / fn_obtener_cliente / fn_obtener_medicamento.
+
+CREATE OR REPLACE FUNCTION public.fn_obtener_mascotas(p_ids integer[]) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(m) ORDER BY m.id), '[]'::json)
+    FROM mascotas m
+    WHERE m.id = ANY(p_ids);
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_obtener_clientes(p_ids integer[]) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(c) ORDER BY c.id), '[]'::json)
+    FROM clientes c
+    WHERE c.id = ANY(p_ids);
+$$;
+
+CREATE OR REPLACE FUNCTION public.fn_obtener_medicamentos(p_ids integer[]) RETURNS json
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE(json_agg(row_to_json(m) ORDER BY m.id), '[]'::json)
+    FROM medicamentos m
+    WHERE m.id = ANY(p_ids);
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_obtener_mascotas(integer[]) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_mascotas(integer[]) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_mascotas(integer[]) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_obtener_mascotas(integer[]) TO secretaria;
+
+REVOKE ALL ON FUNCTION public.fn_obtener_clientes(integer[]) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_clientes(integer[]) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_clientes(integer[]) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_obtener_clientes(integer[]) TO secretaria;
+
+REVOKE ALL ON FUNCTION public.fn_obtener_medicamentos(integer[]) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_obtener_medicamentos(integer[]) TO administrador;
+GRANT ALL ON FUNCTION public.fn_obtener_medicamentos(integer[]) TO veterinario;
+GRANT ALL ON FUNCTION public.fn_obtener_medicamentos(integer[]) TO secretaria;
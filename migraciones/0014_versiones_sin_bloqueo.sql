@@ -0,0 +1,76 @@
+-- Versiones de tabla sin serializar las escrituras.
+-- Con 0003 cada sentencia hacía UPDATE sobre la fila de su tabla en
+-- tabla_versiones y esa fila quedaba bloqueada hasta el COMMIT: todos los
+-- escritores de una tabla se encolaban entre sí.
+--
+-- Ahora cada sentencia INSERTA un delta y la versión es la suma de los deltas.
+-- Los INSERT no se bloquean entre sí y la suma es transaccional: se lee en el
+-- mismo snapshot que el listado, así que nunca se ve una versión nueva con los
+-- datos viejos. (Una secuencia no sirve: nextval se ve antes del COMMIT y un
+-- lector guardaría los datos viejos con la versión nueva.)
+-- De vez en cuando un escritor compacta los deltas de su tabla en una sola
+-- fila; la suma no cambia, así que los ETag tampoco.
+
+CREATE TABLE IF NOT EXISTS public.tabla_versiones_cambios (
+    id bigserial PRIMARY KEY,
+    tabla character varying(63) NOT NULL,
+    delta bigint DEFAULT 1 NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_tabla_versiones_cambios_tabla
+    ON public.tabla_versiones_cambios (tabla);
+
+-- Se conserva la versión actual de cada tabla como delta inicial
+INSERT INTO public.tabla_versiones_cambios (tabla, delta)
+SELECT tabla, version FROM public.tabla_versiones WHERE version > 0;
+
+DROP TABLE public.tabla_versiones;
+
+-- Los triggers de 0003 siguen apuntando a esta función; solo cambia el cuerpo
+CREATE OR REPLACE FUNCTION public.fn_incrementar_version_tabla() RETURNS trigger
+    LANGUAGE plpgsql SECURITY DEFINER
+    SET search_path = public
+    AS $$
+BEGIN
+    INSERT INTO tabla_versiones_cambios (tabla) VALUES (TG_TABLE_NAME);
+
+    -- Compactación: ~1 de cada 100 sentencias, y solo un escritor por tabla a la vez
+    IF random() < 0.01 AND pg_try_advisory_xact_lock(7310, hashtext(TG_TABLE_NAME)) THEN
+        WITH borrados AS (
+            DELETE FROM tabla_versiones_cambios
+            WHERE tabla = TG_TABLE_NAME
+            RETURNING delta
+        )
+        INSERT INTO tabla_versiones_cambios (tabla, delta)
+        SELECT TG_TABLE_NAME, sum(delta) FROM borrados;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.fn_incrementar_version_tabla() FROM PUBLIC;
+
+-- "12-3": versión de cada tabla en el orden recibido (0 si nunca cambió).
+-- Va dentro del ETag; ver app/etag.py y sql_fn_versionada en app/database.py.
+CREATE OR REPLACE FUNCTION public.fn_version_tablas(p_tablas text[]) RETURNS text
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT string_agg(COALESCE(s.version, 0)::text, '-' ORDER BY t.orden)
+    FROM unnest(p_tablas) WITH ORDINALITY AS t(tabla, orden)
+    LEFT JOIN (
+        SELECT c.tabla, sum(c.delta) AS version
+        FROM tabla_versiones_cambios c
+        WHERE c.tabla = ANY(p_tablas)
+        GROUP BY c.tabla
+    ) s ON s.tabla = t.tabla;
+$$;
+
+GRANT SELECT ON TABLE public.tabla_versiones_cambios TO administrador;
+GRANT SELECT ON TABLE public.tabla_versiones_cambios TO secretaria;
+GRANT SELECT ON TABLE public.tabla_versiones_cambios TO veterinario;
+
+REVOKE ALL ON FUNCTION public.fn_version_tablas(text[]) FROM PUBLIC;
+GRANT ALL ON FUNCTION public.fn_version_tablas(text[]) TO administrador;
+GRANT ALL ON FUNCTION public.fn_version_tablas(text[]) TO secretaria;
+GRANT ALL ON FUNCTION public.fn_version_tablas(text[]) TO veterinario;
@@ -0,0 +1,4 @@
+import os
+
+# app.auth exige JWT_SECRET al importarse; las pruebas no usan PostgreSQL
+os.environ.setdefault("JWT_SECRET", "secreto-de-pruebas")
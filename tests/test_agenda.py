@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.agenda import calcular_disponibilidad
+from app.auth import get_current_user
+from app.routers import citas
+
+# 2026-03-02 es lunes (dia_semana 1)
+LUNES = "2026-03-02"
+HORARIO = [{"veterinario_id": None, "dia_semana": 1, "hora_inicio": "09:00", "hora_fin": "13:00"}]
+VET = {"id": 7, "nombre": "Ana"}
+
+
+def _dt(hora: str, dia: str = LUNES) -> datetime:
+    return datetime.fromisoformat(f"{dia}T{hora}")
+
+
+def _libres(citas_ocupadas, duracion=30, horarios=HORARIO, desde=None, hasta=None):
+    agenda = {
+        "veterinarios": [VET],
+        "horarios": horarios,
+        "citas": [{"veterinario_id": VET["id"], "inicio": f"{LUNES}T{i}", "fin": f"{LUNES}T{f}"}
+                  for i, f in citas_ocupadas],
+    }
+    desde = desde or _dt("00:00")
+    hasta = hasta or desde + timedelta(days=1)
+    resultado = calcular_disponibilidad(agenda, desde, hasta, duracion)
+    return [(l["inicio"].strftime("%H:%M"), l["fin"].strftime("%H:%M")) for l in resultado[0]["libres"]]
+
+
+@pytest.mark.parametrize("caso,ocupadas,duracion,esperado", [
+    ("sin citas", [], 30, [("09:00", "13:00")]),
+    ("cita en medio", [("10:00", "10:30")], 30, [("09:00", "10:00"), ("10:30", "13:00")]),
+    ("cita al abrir", [("09:00", "09:30")], 30, [("09:30", "13:00")]),
+    ("cita al cerrar", [("12:30", "13:00")], 30, [("09:00", "12:30")]),
+    ("citas pegadas", [("10:00", "10:30"), ("10:30", "11:00")], 30, [("09:00", "10:00"), ("11:00", "13:00")]),
+    ("citas solapadas", [("10:00", "11:00"), ("10:30", "10:45")], 30, [("09:00", "10:00"), ("11:00", "13:00")]),
+    ("una contiene a otra más larga", [("10:00", "10:15"), ("10:05", "12:00")], 30, [("09:00", "10:00"), ("12:00", "13:00")]),
+    ("hueco justo del mínimo", [("09:00", "10:00"), ("10:30", "13:00")], 30, [("10:00", "10:30")]),
+    ("hueco menor al mínimo", [("09:00", "10:00"), ("10:20", "13:00")], 30, []),
+    ("cita antes de abrir y que termina adentro", [("08:00", "09:30")], 30, [("09:30", "13:00")]),
+    ("cita que termina justo al abrir", [("08:00", "09:00")], 30, [("09:00", "13:00")]),
+    ("cita que empieza justo al cerrar", [("13:00", "14:00")], 30, [("09:00", "13:00")]),
+    ("cita que cubre todo el horario", [("08:00", "14:00")], 30, []),
+    ("duración mayor a la ventana", [], 300, []),
+])
+def test_barrido(caso, ocupadas, duracion, esperado):
+    assert _libres(ocupadas, duracion) == esperado
+
+
+def test_varias_ventanas_en_el_dia():
+    horarios = HORARIO + [{"veterinario_id": None, "dia_semana": 1, "hora_inicio": "15:00", "hora_fin": "18:00"}]
+    # Una cita fuera de horario (13:00-15:00) no parte ninguna ventana
+    assert _libres([("13:30", "14:00"), ("16:00", "17:00")], horarios=horarios) == [
+        ("09:00", "13:00"), ("15:00", "16:00"), ("17:00", "18:00"),
+    ]
+
+
+def test_horario_propio_reemplaza_al_general():
+    propio = [{"veterinario_id": VET["id"], "dia_semana": 1, "hora_inicio": "14:00", "hora_fin": "16:00"}]
+    assert _libres([], horarios=HORARIO + propio) == [("14:00", "16:00")]
+
+
+def test_dia_sin_horario():
+    # Martes: no hay ventanas
+    assert _libres([], desde=_dt("00:00", "2026-03-03")) == []
+
+
+def test_rango_recorta_las_ventanas():
+    assert _libres([], desde=_dt("10:00"), hasta=_dt("11:30")) == [("10:00", "11:30")]
+
+
+# Validación del rango en GET /citas/disponibilidad
+app = FastAPI()
+app.include_router(citas.router)
+app.dependency_overrides[get_current_user] = lambda: {"id": 1, "email": "a@a.com", "role": "secretaria"}
+cliente = TestClient(app)
+
+
+@pytest.fixture
+def agenda_vacia(monkeypatch):
+    async def llamar_fn(role, nombre, *params):
+        assert nombre == "fn_agenda_veterinarios"
+        return {"veterinarios": [VET], "horarios": HORARIO, "citas": []}
+
+    monkeypatch.setattr(citas, "llamar_fn", llamar_fn)
+
+
+@pytest.mark.parametrize("desde,hasta,estado", [
+    ("2026-03-01", "2026-03-31", 200),   # 31 días
+    ("2026-03-01", "2026-04-01", 400),   # 32 días
+    ("2026-03-02", "2026-03-02", 200),
+    ("2026-03-02", "2026-03-01", 400),   # hasta antes de desde
+])
+def test_limite_de_dias(agenda_vacia, desde, hasta, estado):
+    respuesta = cliente.get("/citas/disponibilidad", params={"desde": desde, "hasta": hasta})
+    assert respuesta.status_code == estado
+
+
+def test_respuesta_de_disponibilidad(agenda_vacia):
+    respuesta = cliente.get("/citas/disponibilidad", params={"desde": LUNES, "hasta": LUNES})
+    assert respuesta.json() == [{
+        "veterinario": VET,
+        "libres": [{"inicio": f"{LUNES}T09:00:00", "fin": f"{LUNES}T13:00:00"}],
+    }]
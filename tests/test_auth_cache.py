@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.requests import Request
+
+from app import auth
+
+
+@pytest.fixture(autouse=True)
+def cache_vacia(monkeypatch):
+    monkeypatch.setattr(auth, "_cache_tokens", auth.OrderedDict())
+    monkeypatch.setattr(auth, "_cache_estadisticas", {"aciertos": 0, "fallos": 0, "expulsados": 0})
+
+
+@pytest.fixture
+def decodificaciones(monkeypatch):
+    # Cuenta cuántas veces se verifica la firma (cada fallo de la caché)
+    llamadas = []
+    original = auth.jwt.decode
+
+    def decode(token, *args, **kwargs):
+        llamadas.append(token)
+        return original(token, *args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", decode)
+    return llamadas
+
+
+def _token(usuario_id: int) -> str:
+    return auth.crear_token({"id": usuario_id, "email": f"u{usuario_id}@correo.com", "role": "veterinario"})
+
+
+def _usuario(token: str) -> dict:
+    request = Request({"type": "http", "headers": []})
+    credenciales = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    return asyncio.run(auth.get_current_user(request, credenciales))
+
+
+def test_segunda_llamada_sale_de_la_cache(decodificaciones):
+    token = _token(1)
+
+    assert _usuario(token)["id"] == 1
+    assert _usuario(token)["id"] == 1
+
+    assert len(decodificaciones) == 1
+    assert auth._cache_estadisticas["aciertos"] == 1
+
+
+def test_token_expirado_no_se_sirve_desde_la_cache(decodificaciones, monkeypatch):
+    token = _token(1)
+    _usuario(token)
+    exp, _ = next(iter(auth._cache_tokens.values()))
+
+    # El reloj pasa el "exp": se descarta la entrada y se vuelve a verificar
+    monkeypatch.setattr(auth.time, "time", lambda: exp + 1)
+    _usuario(token)
+
+    assert len(decodificaciones) == 2
+    assert auth._cache_estadisticas["fallos"] == 2
+
+
+def test_expulsa_el_menos_usado_al_superar_el_maximo(decodificaciones, monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_CACHE_MAX", 2)
+    a, b, c = _token(1), _token(2), _token(3)
+
+    _usuario(a)
+    _usuario(b)
+    _usuario(a)   # a pasa a ser el más reciente
+    _usuario(c)   # expulsa a b
+
+    assert len(auth._cache_tokens) == 2
+    assert auth._cache_estadisticas["expulsados"] == 1
+
+    decodificaciones.clear()
+    _usuario(a)
+    _usuario(b)
+    assert decodificaciones == [b]
+
+
+def test_maximo_cero_desactiva_la_cache(decodificaciones, monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_CACHE_MAX", 0)
+    token = _token(1)
+
+    _usuario(token)
+    _usuario(token)
+
+    assert len(decodificaciones) == 2
+    assert len(auth._cache_tokens) == 0
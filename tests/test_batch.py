@@ -0,0 +1,165 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.database import ErrorBD
+from app.routers import batch
+
+USUARIO = {"id": 1, "email": "usuario@correo.com", "role": "veterinario"}
+
+
+class TxFalsa:
+    """
+    Responde a tx.llamar_fn / tx.fila como lo harían las funciones fn_crear_*
+    y registra lo que se ejecutó y si hubo COMMIT o ROLLBACK.
+    """
+
+    def __init__(self, errores=None):
+        self.llamadas = []
+        self.errores = errores or {}
+        self.confirmada = None
+        self._ids = iter(range(100, 200))
+
+    async def fila(self, consulta, *params):
+        return None
+
+    async def llamar_fn(self, nombre, *params):
+        self.llamadas.append((nombre, params))
+        if nombre in self.errores:
+            raise self.errores[nombre]
+        return {"status": "success", "id": next(self._ids)}
+
+
+@pytest.fixture
+def tx(monkeypatch):
+    falsa = TxFalsa()
+
+    @asynccontextmanager
+    async def transaccion(role):
+        falsa.rol = role
+        try:
+            yield falsa
+            falsa.confirmada = True
+        except BaseException:
+            falsa.confirmada = False
+            raise
+
+    monkeypatch.setattr(batch, "transaccion", transaccion)
+    return falsa
+
+
+app = FastAPI()
+app.include_router(batch.router, prefix="/api")
+app.dependency_overrides[get_current_user] = lambda: dict(USUARIO)
+cliente = TestClient(app)
+
+
+@pytest.fixture
+def rol(monkeypatch):
+    def cambiar(nombre):
+        monkeypatch.setitem(USUARIO, "role", nombre)
+    return cambiar
+
+
+def _post(*operaciones):
+    return cliente.post("/api/batch", json={"operaciones": list(operaciones)})
+
+
+CLIENTE = {"op": "crear_cliente", "ref": "cliente", "datos": {"nombre": "Ana", "telefono": "555", "direccion": "Calle 1"}}
+MASCOTA = {"op": "crear_mascota", "ref": "mascota",
+           "datos": {"cliente_id": {"$ref": "cliente.id"}, "raza_id": 1, "nombre": "Luna", "edad": 2, "peso": 8.5}}
+
+
+@pytest.mark.parametrize("sqlstate,estado", [("23503", 422), ("23505", 409)])
+def test_error_de_bd_indica_la_operacion_sin_el_mensaje_crudo(tx, sqlstate, estado):
+    tx.errores["fn_crear_mascota"] = ErrorBD('insert or update on table "mascotas" violates foreign key', sqlstate)
+
+    respuesta = _post(CLIENTE, MASCOTA)
+
+    assert respuesta.status_code == estado
+    detalle = respuesta.json()["detail"]
+    assert detalle.startswith("Operación 1 (crear_mascota): ")
+    assert "mascotas" not in detalle
+    assert tx.confirmada is False
+
+
+def test_error_con_mensaje_propio_del_endpoint(tx, rol):
+    rol("secretaria")
+    tx.errores["fn_crear_cita"] = ErrorBD("conflicting key value violates exclusion constraint", "23P01")
+    cita = {"op": "crear_cita", "datos": {"fecha": "2026-03-02", "hora": "10:00", "veterinario_id": 7}}
+
+    respuesta = _post(cita)
+
+    assert respuesta.status_code == 400
+    assert respuesta.json()["detail"] == (
+        "Operación 0 (crear_cita): El veterinario ya tiene una cita programada en esa fecha y hora."
+    )
+
+
+CITA = {"op": "crear_cita", "ref": "cita", "datos": {"fecha": "2026-03-02", "hora": "10:00", "veterinario_id": 7}}
+
+
+def test_flujo_de_recepcion_en_un_solo_batch(tx, rol):
+    # veterinario es el único rol que puede crear clientes (y también mascotas)
+    rol("veterinario")
+
+    respuesta = _post(CLIENTE, MASCOTA)
+
+    assert respuesta.status_code == 200
+    assert [r["id"] for r in respuesta.json()["resultados"]] == [100, 101]
+
+    # Una transacción con el rol del usuario y el cliente_id tomado de {"$ref": "cliente.id"}
+    assert tx.rol == "veterinario"
+    assert tx.confirmada is True
+    assert tx.llamadas == [
+        ("fn_crear_cliente", ("Ana", "555", "Calle 1")),
+        ("fn_crear_mascota", (100, 1, "Luna", 2, 8.5)),
+    ]
+
+
+@pytest.mark.parametrize("rol_usuario,operacion", [
+    # El batch no amplía los permisos de los endpoints
+    ("secretaria", "0 (crear_cliente)"),
+    ("administrador", "0 (crear_cliente)"),
+    ("veterinario", "2 (crear_cita)"),
+])
+def test_batch_solo_con_operaciones_del_rol(tx, rol, rol_usuario, operacion):
+    rol(rol_usuario)
+
+    respuesta = _post(CLIENTE, MASCOTA, CITA)
+
+    assert respuesta.status_code == 403
+    assert respuesta.json()["detail"] == f"Operación {operacion}: No autorizado"
+    assert tx.llamadas == []
+
+
+def test_referencia_por_posicion_y_campo(tx):
+    mascota = dict(MASCOTA, datos=dict(MASCOTA["datos"], cliente_id={"$ref": "0.id"}))
+
+    assert _post(CLIENTE, mascota).status_code == 200
+    assert tx.llamadas[1][1][0] == 100
+
+
+@pytest.mark.parametrize("referencia,detalle", [
+    ({"$ref": "otro.id"}, "otro.id"),
+    ({"$ref": "cliente.telefono"}, "cliente.telefono"),
+    ({"$ref": "cliente.id", "x": 1}, "{'$ref': 'cliente.id', 'x': 1}"),
+])
+def test_referencia_inexistente(tx, referencia, detalle):
+    mascota = dict(MASCOTA, datos=dict(MASCOTA["datos"], cliente_id=referencia))
+
+    respuesta = _post(CLIENTE, mascota)
+
+    assert respuesta.status_code == 400
+    assert respuesta.json()["detail"] == f"Operación 1 (crear_mascota): Referencia inválida: {detalle}"
+    assert tx.confirmada is False
+
+
+def test_texto_que_empieza_con_pesos_no_es_referencia(tx):
+    cliente = dict(CLIENTE, datos=dict(CLIENTE["datos"], nombre="$cliente.id", direccion="$0 Calle 1"))
+
+    assert _post(cliente, MASCOTA).status_code == 200
+    assert tx.llamadas[0] == ("fn_crear_cliente", ("$cliente.id", "555", "$0 Calle 1"))
@@ -0,0 +1,28 @@
+import pytest
+
+from app.database import ErrorBD, error_http
+
+
+@pytest.mark.parametrize("sqlstate,estado", [
+    ("23505", 409),   # unique_violation
+    ("23P01", 409),   # exclusion_violation
+    ("23503", 422),   # foreign_key_violation
+    ("23502", 422),   # not_null_violation
+    ("23514", 422),   # check_violation
+    ("22P02", 422),   # invalid_text_representation
+    ("42501", 403),
+    ("40001", 503),
+    ("40P01", 503),
+    ("57014", 503),
+    ("XX000", 500),
+    (None, 500),
+])
+def test_error_http(sqlstate, estado):
+    error = error_http(ErrorBD('duplicate key value violates unique constraint "x"', sqlstate))
+    assert error.status_code == estado
+    # El mensaje de PostgreSQL nunca llega al cliente
+    assert "constraint" not in error.detail
+
+
+def test_reintento_con_retry_after():
+    assert error_http(ErrorBD("deadlock detected", "40P01")).headers == {"Retry-After": "1"}
@@ -0,0 +1,50 @@
+import pytest
+from starlette.requests import Request
+
+from app.database import sql_fn_versionada
+from app.etag import etag_version, no_modificado, version_conocida
+
+VET = {"id": 3, "role": "veterinario"}
+ADMIN = {"id": 1, "role": "administrador"}
+
+
+def _request(query="", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/api/citas/listar-citas",
+                    "query_string": query.encode(), "headers": headers})
+
+
+def test_la_version_vuelve_desde_el_etag():
+    etag = etag_version(_request(), VET, "12-3")
+    assert version_conocida(_request(if_none_match=etag), VET) == "12-3"
+    assert version_conocida(_request(if_none_match="W/" + etag), VET) == "12-3"
+    assert version_conocida(_request(if_none_match=f'"otro", {etag}'), VET) == "12-3"
+
+
+@pytest.mark.parametrize("usuario,query", [(ADMIN, ""), (VET, "limit=10")])
+def test_etag_de_otro_usuario_o_url_no_se_usa(usuario, query):
+    # Mismo ETag, pero la respuesta depende del rol/usuario y de los parámetros
+    etag = etag_version(_request(), VET, "12-3")
+    assert version_conocida(_request(query, if_none_match=etag), usuario) is None
+
+
+@pytest.mark.parametrize("cabecera", [None, "*", '"12-3"', '"basura"', '"' + "9" * 500 + '.x"'])
+def test_sin_version_conocida(cabecera):
+    assert version_conocida(_request(if_none_match=cabecera), VET) is None
+
+
+def test_no_modificado():
+    etag = etag_version(_request(), VET, "12-3")
+    assert no_modificado(_request(if_none_match=etag), etag)
+    assert no_modificado(_request(if_none_match="*"), etag)
+    assert not no_modificado(_request(if_none_match=etag_version(_request(), VET, "13-3")), etag)
+    assert not no_modificado(_request(), etag)
+
+
+def test_sql_fn_versionada_orden_de_parametros():
+    consulta = sql_fn_versionada("fn_listar_citas_pagina", 2, texto=True)
+    # Primero los de la función, después la versión conocida y las tablas
+    assert consulta.index("fn_listar_citas_pagina(%s, %s)::text") < consulta.index("version = %s")
+    assert consulta.index("version = %s") < consulta.index("fn_version_tablas(%s)")
+    assert consulta.count("%s") == 4
+    assert "CASE WHEN v.sin_cambios THEN NULL" in consulta
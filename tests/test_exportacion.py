@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app.database import Flujo
+from app.exportacion import RespuestaNDJSON
+
+
+def _flujo(lotes, cerrados):
+    lotes = list(lotes)
+
+    async def leer():
+        return lotes.pop(0) if lotes else []
+
+    async def cerrar(error):
+        cerrados.append(error)
+
+    return Flujo(leer, cerrar)
+
+
+def test_flujo_recorre_los_lotes_y_libera_al_final():
+    cerrados = []
+    flujo = _flujo([[("a",), ("b",)], [("c",)]], cerrados)
+
+    async def leer_todo():
+        return [fila async for fila in flujo]
+
+    assert asyncio.run(leer_todo()) == ["a", "b", "c"]
+    assert cerrados == [None]
+
+
+def test_flujo_con_error_libera_con_el_error():
+    cerrados = []
+
+    async def leer():
+        raise RuntimeError("fallo al leer")
+
+    async def cerrar(error):
+        cerrados.append(error)
+
+    async def leer_todo():
+        return [fila async for fila in Flujo(leer, cerrar)]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(leer_todo())
+    assert isinstance(cerrados[0], RuntimeError)
+
+
+def test_respuesta_libera_si_el_cliente_se_va_antes_del_primer_byte():
+    cerrados = []
+    respuesta = RespuestaNDJSON(_flujo([[("a",)]], cerrados))
+
+    async def send(mensaje):
+        raise OSError("cliente desconectado")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    with pytest.raises(ClientDisconnect):
+        asyncio.run(respuesta(scope, receive, send))
+
+    # El iterador nunca arrancó y aun así la conexión se devolvió una sola vez
+    assert cerrados == [None]
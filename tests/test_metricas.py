@@ -0,0 +1,115 @@
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import metricas
+from app.metricas import Contador, Histograma, exponer
+from app.routers import metricas as router_metricas
+
+# nombre{etiquetas} valor
+_MUESTRA = re.compile(r'^([a-z_]+)(?:\{(.*)\})? (\S+)$')
+_ETIQUETA = re.compile(r'([a-z_]+)="((?:[^"\\]|\\.)*)"')
+
+
+def _parsear(texto):
+    """
+    [(nombre, {etiqueta: valor sin escapar}, valor)] de las muestras; valida HELP/TYPE
+    """
+    muestras = []
+    for linea in texto.splitlines():
+        if linea.startswith("#"):
+            assert re.match(r"^# (HELP|TYPE) [a-z_]+ ", linea), linea
+            continue
+        m = _MUESTRA.match(linea)
+        assert m, linea
+        etiquetas = {}
+        if m.group(2):
+            assert _ETIQUETA.sub("", m.group(2)).replace(",", "") == "", linea
+            for clave, valor in _ETIQUETA.findall(m.group(2)):
+                etiquetas[clave] = re.sub(r"\\(.)", lambda x: "\n" if x.group(1) == "n" else x.group(1), valor)
+        muestras.append((m.group(1), etiquetas, float(m.group(3))))
+    return muestras
+
+
+@pytest.fixture
+def solo(monkeypatch):
+    """Deja en METRICAS solo las métricas del test"""
+    def usar(*lista):
+        monkeypatch.setattr(metricas, "METRICAS", lista)
+    return usar
+
+
+def test_histograma_acumulado_con_inf_sum_y_count(solo):
+    h = Histograma("prueba_segundos", "Prueba", ("ruta",), buckets=(0.1, 1.0))
+    solo(h)
+    for valor in (0.05, 0.1, 0.5, 3.0):
+        h.observar(valor, "/a")
+
+    muestras = _parsear(exponer())
+    buckets = [(e["le"], v) for n, e, v in muestras if n == "prueba_segundos_bucket"]
+    # le es inclusivo y acumulado; +Inf cuenta todas las observaciones
+    assert buckets == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert ("prueba_segundos_sum", {"ruta": "/a"}, pytest.approx(3.65)) in muestras
+    assert ("prueba_segundos_count", {"ruta": "/a"}, 4) in muestras
+    assert all(e["ruta"] == "/a" for n, e, _ in muestras)
+
+
+def test_etiquetas_escapadas(solo):
+    c = Contador("prueba_total", "Prueba", ("ruta",))
+    solo(c)
+    raro = 'a\\b"c\nd'
+    c.inc(raro)
+
+    texto = exponer()
+    assert 'ruta="a\\\\b\\"c\\nd"' in texto
+    assert _parsear(texto) == [("prueba_total", {"ruta": raro}, 1)]
+
+
+def test_medidores(solo):
+    solo()
+    texto = exponer({"bd_pool_libres": ("Estado del pool", [({"pool": "admin"}, 3)])})
+    assert "# TYPE bd_pool_libres gauge" in texto
+    assert _parsear(texto) == [("bd_pool_libres", {"pool": "admin"}, 3)]
+
+
+# ---------------------------------------
+#      ACCESO A /metrics
+# ---------------------------------------
+@pytest.fixture
+def cliente(monkeypatch):
+    monkeypatch.setattr(router_metricas, "_medidores", lambda: {})
+    app = FastAPI()
+    app.include_router(router_metricas.router)
+    return TestClient(app)
+
+
+def _configurar(monkeypatch, token=None, publicas=False):
+    monkeypatch.setattr(router_metricas, "METRICAS_TOKEN", token)
+    monkeypatch.setattr(router_metricas, "METRICAS_PUBLICAS", publicas)
+
+
+def test_cerrado_por_defecto(cliente, monkeypatch):
+    _configurar(monkeypatch)
+    assert cliente.get("/metrics").status_code == 404
+
+
+def test_publicas_explicito(cliente, monkeypatch):
+    _configurar(monkeypatch, publicas=True)
+    respuesta = cliente.get("/metrics")
+    assert respuesta.status_code == 200
+    assert "# TYPE http_peticiones_total counter" in respuesta.text
+
+
+@pytest.mark.parametrize("cabecera,estado", [
+    (b"Bearer secreto", 200),
+    (b"Bearer otro", 401),
+    (None, 401),
+    # No ASCII: antes compare_digest lanzaba TypeError (500)
+    ("Bearer señal".encode("latin-1"), 401),
+])
+def test_token(cliente, monkeypatch, cabecera, estado):
+    _configurar(monkeypatch, token="secreto")
+    headers = [(b"authorization", cabecera)] if cabecera else []
+    assert cliente.get("/metrics", headers=headers).status_code == estado
@@ -0,0 +1,124 @@
+import base64
+from datetime import date, datetime, time
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.paginacion import LIMITE_MAXIMO, LIMITE_POR_DEFECTO, Paginacion, codificar_cursor, decodificar_cursor, pagina
+
+
+def _b64(texto: bytes) -> str:
+    return base64.urlsafe_b64encode(texto).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("clave", [
+    {"id": 42},
+    {"fecha": "2026-03-01", "hora": "09:30:00", "id": 7},
+    {"created_at": "2026-03-01T09:30:00.123456", "id": 7},
+])
+def test_cursor_ida_y_vuelta(clave):
+    cursor = codificar_cursor(clave)
+    assert "=" not in cursor
+    assert decodificar_cursor(cursor) == clave
+
+
+def test_cursor_con_fechas_python():
+    # pagina() recibe date/time/datetime desde la BD y los guarda en ISO
+    cursor = codificar_cursor({"fecha": date(2026, 3, 1), "hora": time(9, 30), "id": 7})
+    assert decodificar_cursor(cursor) == {"fecha": "2026-03-01", "hora": "09:30:00", "id": 7}
+
+
+@pytest.mark.parametrize("cursor", [
+    "%%%",                 # no es base64
+    "abcde",               # base64 con largo imposible
+    "ñandú",               # no ASCII
+    _b64(b"no es json"),
+    _b64(b"\xff\xfe"),     # no es UTF-8
+    _b64(b"[1, 2]"),       # JSON pero no objeto
+    _b64(b"42"),
+])
+def test_cursor_malformado_es_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decodificar_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("clave", [{"id": "1"}, {"id": 1.5}, {"id": True}, {"id": [1]}])
+def test_id_alterado_es_400(clave):
+    pag = Paginacion(limit=10, cursor=codificar_cursor(clave))
+    with pytest.raises(HTTPException) as error:
+        pag.id()
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("clave", [{"fecha": "2026-03-01", "hora": "09:30"}, {"fecha": "ayer", "hora": "09:30", "id": 1}])
+def test_fecha_hora_id_alterado_es_400(clave):
+    with pytest.raises(HTTPException) as error:
+        Paginacion(limit=10, cursor=codificar_cursor(clave)).fecha_hora_id()
+    assert error.value.status_code == 400
+
+
+def test_fecha_hora_id_sin_cursor():
+    assert Paginacion(limit=10, cursor=None).fecha_hora_id() == (None, None, None)
+
+
+def test_created_at_id():
+    pag = Paginacion(limit=10, cursor=codificar_cursor({"created_at": "2026-03-01T09:30:00", "id": "5"}))
+    assert pag.created_at_id() == (datetime(2026, 3, 1, 9, 30), 5)
+
+
+def test_sin_parametros_no_pagina():
+    pag = Paginacion(limit=None, cursor=None)
+    assert not pag.activa
+    assert pag.limite == LIMITE_POR_DEFECTO
+    assert pag.id() is None
+
+
+def test_pagina_intermedia_tiene_next_cursor():
+    filas = [{"id": i} for i in range(1, 5)]   # limite + 1 filas
+    resultado = pagina(filas, 3)
+
+    assert resultado["data"] == filas[:3]
+    assert decodificar_cursor(resultado["next_cursor"]) == {"id": 3}
+
+
+@pytest.mark.parametrize("filas", [None, [], [{"id": 1}], [{"id": 1}, {"id": 2}, {"id": 3}]])
+def test_ultima_pagina_sin_next_cursor(filas):
+    resultado = pagina(filas, 3)
+    assert resultado["data"] == (filas or [])
+    assert resultado["next_cursor"] is None
+
+
+def test_pagina_con_campos_compuestos():
+    filas = [{"created_at": datetime(2026, 3, 1, 9, 30), "id": 9, "diagnostico": "x"}] * 2
+    resultado = pagina(filas, 1, campos=("created_at", "id"))
+    assert decodificar_cursor(resultado["next_cursor"]) == {"created_at": "2026-03-01 09:30:00", "id": 9}
+
+
+# Límites de ?limit= y errores de cursor a través de FastAPI
+app = FastAPI()
+
+
+@app.get("/listar")
+def listar(pag: Paginacion = Depends()):
+    return {"activa": pag.activa, "limite": pag.limite, "id": pag.id()}
+
+
+cliente = TestClient(app)
+
+
+@pytest.mark.parametrize("limit,estado", [(0, 422), (1, 200), (LIMITE_MAXIMO, 200), (LIMITE_MAXIMO + 1, 422), ("x", 422)])
+def test_limites_de_limit(limit, estado):
+    assert cliente.get("/listar", params={"limit": limit}).status_code == estado
+
+
+def test_cursor_malformado_por_http_es_400():
+    respuesta = cliente.get("/listar", params={"cursor": "%%%"})
+    assert respuesta.status_code == 400
+    assert respuesta.json() == {"detail": "Cursor inválido"}
+
+
+def test_solo_cursor_activa_la_paginacion():
+    respuesta = cliente.get("/listar", params={"cursor": codificar_cursor({"id": 10})})
+    assert respuesta.json() == {"activa": True, "limite": LIMITE_POR_DEFECTO, "id": 10}
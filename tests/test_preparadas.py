@@ -0,0 +1,129 @@
+import asyncio
+
+import psycopg2
+import pytest
+
+from app import database
+from app.database import ErrorBD, _TransaccionSync
+
+
+class ErrorPG(psycopg2.Error):
+    # psycopg2.Error no deja asignar pgcode; se expone como propiedad
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self._pgcode = pgcode
+
+    @property
+    def pgcode(self):
+        return self._pgcode
+
+
+class ConexionFalsa:
+    """
+    Registra el SQL enviado. fallar: {prefijo del SQL: sqlstate}
+    """
+
+    def __init__(self, filas=(), descripcion=(), fallar=None):
+        self.sql = []
+        self.filas = list(filas)
+        self.descripcion = [(c,) for c in descripcion]
+        self.fallar = dict(fallar or {})
+
+    def _conexion(self):
+        return self
+
+    def cursor(self, **kwargs):
+        assert not kwargs, "sin cursor_factory: las filas llegan como tupla"
+        return CursorFalso(self)
+
+
+class CursorFalso:
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = conn.descripcion
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.sql.append(sql)
+        for prefijo, codigo in self.conn.fallar.items():
+            if sql.startswith(prefijo):
+                raise ErrorPG(codigo)
+
+    def fetchone(self):
+        return self.conn.filas[0] if self.conn.filas else None
+
+    def fetchall(self):
+        return self.conn.filas
+
+
+@pytest.fixture(autouse=True)
+def preparar(monkeypatch):
+    monkeypatch.setattr(database, "PREPARAR", True)
+
+
+def test_fila_y_filas_arman_dict_desde_description():
+    conn = ConexionFalsa(filas=[(1, "Ana"), (2, "Luis")], descripcion=["id", "nombre"])
+    tx = _TransaccionSync(conn)
+    assert asyncio.run(tx.fila("SELECT id, nombre FROM clientes")) == {"id": 1, "nombre": "Ana"}
+    assert asyncio.run(tx.filas("SELECT id, nombre FROM clientes")) == [
+        {"id": 1, "nombre": "Ana"}, {"id": 2, "nombre": "Luis"}]
+    assert asyncio.run(tx.valor("SELECT count(*) FROM clientes")) == 1
+
+
+def test_fila_sin_resultado():
+    tx = _TransaccionSync(ConexionFalsa(descripcion=["id"]))
+    assert asyncio.run(tx.fila("SELECT id FROM usuarios WHERE email = %s", "x")) is None
+    assert asyncio.run(tx.filas("SELECT id FROM usuarios")) == []
+
+
+def test_tx_llamar_fn_prepara_una_vez():
+    conn = ConexionFalsa(filas=[({"id": 7},)])
+    tx = _TransaccionSync(conn)
+    assert asyncio.run(tx.llamar_fn("fn_crear_cliente", "Ana", "555", "Calle 1")) == {"id": 7}
+    asyncio.run(tx.llamar_fn("fn_crear_cliente", "Luis", "556", "Calle 2"))
+
+    preparaciones = [s for s in conn.sql if s.startswith("PREPARE")]
+    assert preparaciones == ["PREPARE fn_crear_cliente_3 AS SELECT fn_crear_cliente($1, $2, $3)"]
+    assert conn.sql.count("EXECUTE fn_crear_cliente_3(%s, %s, %s)") == 2
+
+
+def test_prepare_fallido_no_aborta_la_transaccion():
+    # Con un ROLLBACK común se perdería lo hecho antes en la transacción
+    conn = ConexionFalsa(filas=[(1,)], fallar={"PREPARE": "42725"})
+    tx = _TransaccionSync(conn)
+    assert asyncio.run(tx.llamar_fn("fn_ambigua", 1)) == 1
+    assert "ROLLBACK TO SAVEPOINT preparar" in conn.sql
+    assert conn.sql[-1] == "SELECT fn_ambigua(%s)"
+
+
+def test_preparada_invalida_en_transaccion_se_descarta_despues():
+    conn = ConexionFalsa(filas=[(1,)])
+    tx = _TransaccionSync(conn)
+    asyncio.run(tx.llamar_fn("fn_x", 1))
+
+    conn.fallar = {"EXECUTE": "0A000"}
+    with pytest.raises(ErrorBD):
+        asyncio.run(tx.llamar_fn("fn_x", 1))
+    assert "DEALLOCATE ALL" not in conn.sql
+
+    # Próxima transacción de la misma conexión
+    conn.fallar = {}
+    asyncio.run(_TransaccionSync(conn).llamar_fn("fn_x", 1))
+    assert conn.sql.count("DEALLOCATE ALL") == 1
+    assert conn.sql.count("PREPARE fn_x_1 AS SELECT fn_x($1)") == 2
+
+
+def test_sql_versionada_se_prepara_con_todos_los_parametros():
+    consulta = database.sql_fn_versionada("fn_listar_citas", 1)
+    conn = ConexionFalsa(filas=[("3-1", True, None)])
+    row = database._ejecutar_sentencia(conn, "v_fn_listar_citas_1", consulta, (5, "3-1", ["citas"]), True)
+    assert row == ("3-1", True, None)
+    prepare = next(s for s in conn.sql if s.startswith("PREPARE"))
+    assert "fn_listar_citas($1)" in prepare and "version = $2" in prepare and "fn_version_tablas($3)" in prepare
+    assert conn.sql[-1] == "EXECUTE v_fn_listar_citas_1(%s, %s, %s)"
@@ -0,0 +1,100 @@
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import fastapi.routing as fastapi_routing
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.respuestas import RespuestaORJSON, a_json
+from app.routers import facturas
+
+
+@pytest.mark.parametrize("valor,esperado", [
+    # Mismas reglas que jsonable_encoder
+    (Decimal("10"), 10),
+    (Decimal("10.50"), 10.5),
+    (Decimal("1250.5"), 1250.5),
+    (Decimal("1E+2"), 100),
+    (timedelta(minutes=30), 1800.0),
+    ({"a"}, ["a"]),
+    (frozenset([1]), [1]),
+])
+def test_tipos_fuera_de_orjson(valor, esperado):
+    assert json.loads(a_json({"v": valor})) == {"v": esperado}
+
+
+def test_decimal_entero_sale_sin_punto():
+    assert a_json([Decimal("10"), Decimal("10.50")]) == b"[10,10.5]"
+
+
+def test_fechas_y_claves_no_texto():
+    contenido = {1: {"fecha": date(2026, 1, 5), "hora": time(8, 30),
+                     "creada": datetime(2026, 1, 5, 8, 30, 0, 123456)}}
+    assert json.loads(a_json(contenido)) == {"1": {
+        "fecha": "2026-01-05", "hora": "08:30:00", "creada": "2026-01-05T08:30:00.123456"}}
+
+
+def test_tipo_desconocido_falla():
+    with pytest.raises(TypeError):
+        a_json({"v": object()})
+
+
+def test_respuesta_usa_las_mismas_reglas():
+    respuesta = RespuestaORJSON({"total": Decimal("350.00"), "ids": {7}})
+    assert json.loads(respuesta.body) == {"total": 350.0, "ids": [7]}
+    assert respuesta.headers["content-type"] == "application/json"
+
+
+# ---------------------------------------
+#      RUTAS REALES (app.main)
+# ---------------------------------------
+@pytest.fixture
+def app_real():
+    from app.main import app
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1, "email": "a@b.c", "role": "administrador"}
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def _factura(i):
+    return {"id": i, "consulta_id": 3, "total": Decimal("350.50"), "fecha": datetime(2026, 1, 5, 10, 30)}
+
+
+def test_obtener_factura_total_como_numero(app_real, monkeypatch):
+    async def llamar_fn(role, nombre, *params):
+        return _factura(params[0])
+
+    monkeypatch.setattr(facturas, "llamar_fn", llamar_fn)
+
+    respuesta = app_real.get("/api/facturas/obtener-factura/7")
+
+    assert respuesta.status_code == 200
+    # Con response_model=dict pydantic lo convertía en "350.50"
+    assert respuesta.json()["total"] == 350.5
+    assert b'"total":350.5' in respuesta.content
+
+
+def test_listado_paginado_pasa_solo_por_orjson(app_real, monkeypatch):
+    async def llamar_fn(role, nombre, *params):
+        return [_factura(i) for i in range(1, 4)]
+
+    monkeypatch.setattr(facturas, "llamar_fn", llamar_fn)
+    # Devuelve un Response propio: ni pydantic ni jsonable_encoder recorren las filas
+    monkeypatch.setattr(fastapi_routing, "jsonable_encoder", None)
+
+    respuesta = app_real.get("/api/facturas/listar-facturas?limit=2")
+
+    assert respuesta.status_code == 200
+    assert [f["total"] for f in respuesta.json()["data"]] == [350.5, 350.5]
+    assert respuesta.json()["data"][0]["fecha"] == "2026-01-05T10:30:00"
+
+
+def test_benchmark_recorre_todas_las_formas():
+    from app.benchmark_serializacion import medir
+
+    resultados = dict(medir(filas=3, repeticiones=1))
+    assert set(resultados) == {"listar-citas", "filas con Decimal/fechas", "ficha del cliente"}
+    assert resultados["listar-citas"]["texto"] is not None
+    assert all(t["directa"] > 0 for t in resultados.values())
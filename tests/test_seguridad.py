@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import seguridad
+
+
+@pytest.fixture
+def pool_hilos(monkeypatch):
+    # Hilos en lugar de procesos: las funciones de prueba no necesitan pickle
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(seguridad, "_pool", lambda: executor)
+    monkeypatch.setattr(seguridad, "_pendientes", 0)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def _lento(liberar: threading.Event):
+    inicio = time.time()
+    liberar.wait(5)
+    return True, inicio, time.time() - inicio
+
+
+def test_cancelar_la_espera_no_libera_el_lugar_en_la_cola(pool_hilos):
+    liberar = threading.Event()
+
+    async def cliente_que_se_va():
+        tarea = asyncio.ensure_future(seguridad._ejecutar(_lento, liberar))
+        await asyncio.sleep(0.05)
+        tarea.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarea
+
+    asyncio.run(cliente_que_se_va())
+
+    # El trabajo sigue corriendo en el worker: sigue contando contra HASH_MAX_COLA
+    assert seguridad._pendientes == 1
+
+    liberar.set()
+    pool_hilos.shutdown(wait=True)
+    assert seguridad._pendientes == 0
+
+
+def test_cola_llena_responde_503(pool_hilos, monkeypatch):
+    monkeypatch.setattr(seguridad, "HASH_MAX_COLA", 1)
+    liberar = threading.Event()
+    futuro = seguridad._enviar(_lento, liberar)
+
+    with pytest.raises(seguridad.HTTPException) as error:
+        seguridad._enviar(_lento, liberar)
+    assert error.value.status_code == 503
+
+    liberar.set()
+    assert futuro.result()[0] is True
+    pool_hilos.shutdown(wait=True)
+    assert seguridad._pendientes == 0